@@ -0,0 +1,72 @@
+from time import perf_counter
+from typing import Callable, List
+import ctypes
+
+from rlbot.utils.structures.game_data_struct import GameTickPacket
+
+from rlbottraining.grading.event_detector import PlayerEventDetector
+from rlbottraining.grading.packet_arrays import PacketArrays
+from rlbottraining.grading.tick_history import TickHistory
+
+from tests.test_tick_history import score_changing_packets
+from tests.utils.reference_event_detector import ReferencePlayerEventDetector
+
+"""
+Measures the per-tick cost of PlayerEventDetector.detect_events() at 8 cars,
+compared to the straightforward ReferencePlayerEventDetector.
+
+Usage (from the repository root):
+  python -m benchmarks.event_detector
+"""
+
+NUM_CARS = 8
+NUM_TICKS = 3000
+
+
+def seconds_per_tick(make_detect: Callable[[GameTickPacket], Callable[[GameTickPacket], object]], ticks: List[GameTickPacket]) -> float:
+    best = float('inf')
+    for _ in range(5):
+        packet = GameTickPacket()  # Reused for every tick, like rlbot does.
+        detect = make_detect(packet)
+        start = perf_counter()
+        for tick in ticks:
+            ctypes.pointer(packet)[0] = tick
+            detect(packet)
+        best = min(best, perf_counter() - start)
+    return best / len(ticks)
+
+
+def with_shared_history(packet: GameTickPacket, detect_events=True) -> Callable[[GameTickPacket], object]:
+    # Like TrainingTickPacket, which records each tick for all graders.
+    arrays = PacketArrays(packet)
+    history = TickHistory()
+    detector = PlayerEventDetector(history)
+    def detect(packet):
+        history.record(arrays)
+        if detect_events:
+            return detector.detect_events(packet)
+    return detect
+
+
+def main():
+    with_events = [GameTickPacket.from_buffer_copy(packet) for packet in score_changing_packets(NUM_TICKS, NUM_CARS)]
+    without_events = [with_events[0]] * NUM_TICKS
+    variants = {
+        'reference': lambda packet: ReferencePlayerEventDetector().detect_events,
+        'standalone': lambda packet: PlayerEventDetector().detect_events,
+        'shared history': with_shared_history,  # Excluding the recording, which is done for all graders.
+    }
+    baselines = {
+        'reference': lambda packet: lambda packet: None,
+        'standalone': lambda packet: lambda packet: None,
+        'shared history': lambda packet: with_shared_history(packet, detect_events=False),
+    }
+    for name, ticks in [('without score changes', without_events), ('with score changes', with_events)]:
+        print(f'Per tick at {NUM_CARS} cars, {name}:')
+        for variant_name, make_detect in variants.items():
+            seconds = seconds_per_tick(make_detect, ticks) - seconds_per_tick(baselines[variant_name], ticks)
+            print(f'  {variant_name:>14}: {seconds * 1e6:6.2f} us')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+from dataclasses import dataclass, field
+from typing import List
+import json
+import timeit
+
+from rlbot.training.training import Fail
+from rlbot.utils.structures.game_data_struct import GameTickPacket
+
+from rlbottraining.common_graders.compound_grader import CompoundGrader
+from rlbottraining.common_graders.rl_graders import FailOnBallOnGround
+from rlbottraining.common_graders.timeout import FailOnTimeout
+from rlbottraining.grading.grader import Grader
+from rlbottraining.history.metric_json_encoder import MetricJsonEncoder
+
+from tests.test_metric_json_encoder import make_game_tick_packet
+from tests.test_result_log import make_result, start_time
+from tests.utils.reference_metric_json_encoder import ReferenceMetricJsonEncoder
+
+"""
+Compares the time it takes to encode an ExerciseResult which embeds GameTickPackets
+with MetricJsonEncoder and the straightforward ReferenceMetricJsonEncoder.
+
+Usage (from the repository root):
+  python -m benchmarks.metric_json_encoder
+"""
+
+@dataclass
+class RecordLastPackets(Grader):
+    packets: List[GameTickPacket] = field(default_factory=lambda: [make_game_tick_packet() for _ in range(4)])
+
+class FailWithPacket(Fail):
+    def __init__(self):
+        self.packet = make_game_tick_packet()
+
+
+def make_benchmark_result():
+    result = make_result('benchmark', start_time)
+    result.grade = FailWithPacket()
+    grader = CompoundGrader([RecordLastPackets(), FailOnBallOnGround(), FailOnTimeout(3)])
+    result.exercise.grader = grader
+    return result
+
+
+def main():
+    result = make_benchmark_result()
+    encoded = json.dumps(result, cls=MetricJsonEncoder, sort_keys=True)
+    assert encoded == json.dumps(result, cls=ReferenceMetricJsonEncoder, sort_keys=True)
+    print(f'Encoding a result of {len(encoded) / 1024:.0f} KiB:')
+
+    seconds = {}
+    for encoder in [ReferenceMetricJsonEncoder, MetricJsonEncoder]:
+        number = 20
+        best = min(timeit.repeat(lambda: json.dumps(result, cls=encoder, sort_keys=True), number=number, repeat=5))
+        seconds[encoder] = best / number
+        print(f'  {encoder.__name__:>27}: {seconds[encoder] * 1000:7.2f} ms')
+    print(f'  speedup: {seconds[ReferenceMetricJsonEncoder] / seconds[MetricJsonEncoder]:.1f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,37 @@
+from copy import deepcopy
+import timeit
+
+from rlbottraining.grading.snapshot import SnapshotPool
+
+from tests.test_tick_history import make_packet
+
+"""
+Compares copying a GameTickPacket and a Touch with copy.deepcopy() and with a SnapshotPool.
+
+Usage (from the repository root):
+  python -m benchmarks.snapshot
+"""
+
+
+def microseconds(function, number: int = 2000) -> float:
+    return min(timeit.repeat(function, number=number, repeat=5)) / number * 1e6
+
+
+def main():
+    packets = [(f'GameTickPacket with {num_cars} cars', make_packet(1.0, num_cars=num_cars)) for num_cars in [2, 8]]
+    for name, struct in packets + [('Touch', packets[0][1].game_ball.latest_touch)]:
+        pool = SnapshotPool(type(struct))
+        def snapshot_and_release():
+            pool.release(pool.snapshot(struct))
+        seconds = {
+            'deepcopy': microseconds(lambda: deepcopy(struct)),
+            'snapshot': microseconds(lambda: pool.snapshot(struct), number=200),  # Allocates new chunks.
+            'snapshot + release': microseconds(snapshot_and_release),
+        }
+        print(f'{name}:')
+        for variant, us in seconds.items():
+            print(f'  {variant:>18}: {us:7.2f} us')
+        print(f'  speedup: {seconds["deepcopy"] / seconds["snapshot"]:.1f}x')
+
+if __name__ == '__main__':
+    main()
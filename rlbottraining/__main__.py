@@ -3,14 +3,31 @@ Runs the training exercise playlist in the given python file.
 The playlist has to be provided via a make_default_playlist() function.
 
 Usage:
-  rlbottraining run_module <python_file> [--history_dir=<path>]
+  rlbottraining run_module <python_file> [--history_dir=<path>] [--record_ticks] [--profile_graders] [--storage_mode=<mode>] [--reload_policy=<p>] [--prefetch=<n>]
   rlbottraining history_dev_server <history_dir> [--host=<host>] [--port=<port>]
   rlbottraining history_render_static <history_dir>
+  rlbottraining history_migrate_to_log <history_dir> [--keep_json_files]
+  rlbottraining history_migrate_to_sqlite <history_dir>
+  rlbottraining history_query <history_dir> [--exercise=<name>] [--exercise_class=<class>] [--grader_class=<class>] [--passed | --failed] [--seed=<seed>] [--limit=<n>] [--full_json]
   rlbottraining (-h | --help)
   rlbottraining --version
 
 Options:
   -H --history_dir=<path>  Where to persist results of the exercises.
+  --record_ticks           Also persist every tick of the exercises to the history_dir.
+  --profile_graders        Measure how long each grader takes per tick and add the stats to the results.
+  --storage_mode=<mode>    How results are stored: json_files, result_log or sqlite [default: json_files].
+  --reload_policy=<p>      When to reload the module: never, each_exercise or on_file_change [default: each_exercise].
+  --prefetch=<n>           Make the game states of the next n exercises in the background [default: 0].
+  --keep_json_files        Don't delete the per-result json files after copying them into the result log.
+  --exercise=<name>        Only show results of exercises with this name.
+  --exercise_class=<class> Only show results of exercises of this class. e.g. rlbottraining.common_exercises.bronze_striker.BallInFrontOfGoal
+  --grader_class=<class>   Only show results of exercises with this type of grader.
+  --passed                 Only show passes.
+  --failed                 Only show fails.
+  --seed=<seed>            Only show results of exercises run with this seed.
+  --limit=<n>              Show at most this many of the most recent results [default: 1000].
+  --full_json              Print the whole result as JSON, one per line.
   --host=<host>            [default: localhost].
   --port=<port>            [default: 8878]
   -h --help                Show this screen.
@@ -18,11 +35,16 @@ Options:
 """
 
 from pathlib import Path
+import json
 
 from docopt import docopt
 
 from rlbottraining.version import __version__
-from rlbottraining.exercise_runner import run_module
+from rlbottraining.exercise_runner import ReloadPolicy, run_module
+from rlbottraining.history.exercise_result import StorageMode
+from rlbottraining.history.result_log import migrate_result_files_to_log
+from rlbottraining.history.sqlite_store import SqliteHistoryStore, migrate_to_sqlite_store
+from rlbottraining.paths import HistoryPaths
 from rlbottraining.history.website.server import Server
 from rlbottraining.history.website.dev_server_restarter import restart_devserver_on_source_change
 
@@ -31,11 +53,46 @@ def main():
     if arguments['run_module']:
         run_module(
             Path(arguments['<python_file>']),
-            history_dir=arguments['--history_dir']
+            history_dir=arguments['--history_dir'],
+            record_ticks=arguments['--record_ticks'],
+            profile_graders=arguments['--profile_graders'],
+            storage_mode=StorageMode(arguments['--storage_mode']),
+            reload_policy=ReloadPolicy(arguments['--reload_policy']),
+            prefetch_depth=int(arguments['--prefetch']),
         )
     if arguments['history_render_static']:
         server = Server(history_dir=Path(arguments['<history_dir>']))
         server.render_static_website()
+    elif arguments['history_migrate_to_log']:
+        num_migrated = migrate_result_files_to_log(
+            Path(arguments['<history_dir>']),
+            delete_result_files=not arguments['--keep_json_files'],
+        )
+        print(f'Moved {num_migrated} results into the result log.')
+    elif arguments['history_migrate_to_sqlite']:
+        num_migrated = migrate_to_sqlite_store(Path(arguments['<history_dir>']))
+        print(f'Moved {num_migrated} results into the database.')
+    elif arguments['history_query']:
+        history_dir = Path(arguments['<history_dir>'])
+        if not (history_dir / HistoryPaths.sqlite_store).exists():
+            raise FileNotFoundError(f'No database in {history_dir}. See history_migrate_to_sqlite.')
+        store = SqliteHistoryStore(history_dir / HistoryPaths.sqlite_store)
+        filters = dict(
+            exercise_name=arguments['--exercise'],
+            exercise_class=arguments['--exercise_class'],
+            grader_class=arguments['--grader_class'],
+            passed=True if arguments['--passed'] else False if arguments['--failed'] else None,
+            seed=None if arguments['--seed'] is None else int(arguments['--seed']),
+            limit=int(arguments['--limit']),
+        )
+        if arguments['--full_json']:
+            for result_json in store.query_json(**filters):
+                print(json.dumps(result_json))
+        else:
+            for result in store.query(**filters):
+                grade = {True: 'PASS', False: 'FAIL', None: '?'}[result.passed]
+                print(f'{result.create_time} {result.run_id} {result.exercise_name}: {grade}')
+        store.close()
     elif arguments['history_dev_server']:
         restart_devserver_on_source_change(
             arguments['<history_dir>'],
@@ -0,0 +1,384 @@
+from typing import List, Mapping, Optional, Sequence
+import math
+
+from rlbot.agents.base_agent import SimpleControllerState
+from rlbot.matchconfig.match_config import MatchConfig
+from rlbot.utils.game_state_util import GameState, Physics
+from rlbot.utils.structures.game_data_struct import GameTickPacket
+
+from rlbottraining.backends.simulation_backend import SteppedSimulationBackend, BotController
+
+"""
+A headless stand-in for Rocket League.
+It is a simple kinematics model of the ball and cars which is good enough
+to run exercises and graders quickly (e.g. on CI machines without the game)
+but it does not try to match the game's physics closely.
+Boost pads and dropshot are not simulated.
+"""
+
+BALL_RADIUS = 92.75
+CAR_RADIUS = 60  # Cars are approximated as spheres when touching the ball.
+CAR_REST_HEIGHT = 17.
+GRAVITY_Z = -650.
+
+ARENA_HALF_WIDTH = 4096.
+ARENA_HALF_LENGTH = 5120.
+ARENA_HEIGHT = 2044.
+GOAL_HALF_WIDTH = 892.755
+GOAL_HEIGHT = 642.775
+
+BALL_MAX_SPEED = 6000.
+BALL_MAX_ANGULAR_SPEED = 6.
+BALL_DRAG = .0305  # fraction of velocity lost per second
+BALL_RESTITUTION = .6
+BALL_ROLLING_FRICTION = 230.  # uu/s^2
+BALL_REST_SPEED = 10.  # Bounces slower than this come to rest.
+
+CAR_MAX_SPEED = 2300.
+CAR_MAX_THROTTLE_SPEED = 1410.
+CAR_THROTTLE_ACCELERATION = 1600.
+CAR_BRAKE_ACCELERATION = 3500.
+CAR_COAST_ACCELERATION = 525.
+CAR_BOOST_ACCELERATION = 991.667
+CAR_BOOST_CONSUMPTION = 33.3  # boost per second
+CAR_JUMP_SPEED = 450.
+CAR_DOUBLE_JUMP_SPEED = 292.
+CAR_HITBOX = (118.0, 84.2, 36.2)  # Octane
+
+# Turning curvature (1/radius) at different speeds, linearly interpolated.
+_curvature_speeds = (0., 500., 1000., 1500., 1750., 2300.)
+_curvatures = (.0069, .00398, .00235, .001375, .0011, .00088)
+
+
+class HeadlessBackend(SteppedSimulationBackend):
+    """
+    Runs exercises against a local ball-and-car kinematics simulation.
+    """
+
+    def __init__(self, bot_controllers: Optional[Mapping[int, BotController]] = None):
+        super().__init__(bot_controllers)
+        self.seconds_elapsed = 0.
+        self.world_gravity_z = GRAVITY_Z
+        self.scores = [0, 0]
+        self.cars: List[SimulatedCar] = []
+        self._init_ball()
+
+    def setup_match(self, match_config: MatchConfig):
+        self.scores = [0, 0]
+        self._init_ball()
+        self._init_cars(
+            teams=[player.team for player in match_config.player_configs],
+            names=[player.name or f'Player {i}' for i, player in enumerate(match_config.player_configs)],
+        )
+
+    def set_game_state(self, game_state: GameState):
+        if game_state.ball and game_state.ball.physics:
+            physics = game_state.ball.physics
+            _set_vector(self.ball_location, physics.location)
+            _set_vector(self.ball_velocity, physics.velocity)
+            _set_vector(self.ball_angular_velocity, physics.angular_velocity)
+        for car_index, car_state in (game_state.cars or {}).items():
+            if car_index >= len(self.cars):
+                continue
+            car = self.cars[car_index]
+            physics: Physics = car_state.physics
+            if physics:
+                _set_vector(car.location, physics.location)
+                _set_vector(car.velocity, physics.velocity)
+                _set_vector(car.angular_velocity, physics.angular_velocity)
+                _set_vector(car.rotation, physics.rotation, ('pitch', 'yaw', 'roll'))
+                car.location[2] = max(car.location[2], CAR_REST_HEIGHT)
+                car.on_ground = car.location[2] <= CAR_REST_HEIGHT
+            if car_state.boost_amount is not None:
+                car.boost = car_state.boost_amount
+            if car_state.jumped is not None:
+                car.jumped = car_state.jumped
+            if car_state.double_jumped is not None:
+                car.double_jumped = car_state.double_jumped
+        if game_state.game_info and game_state.game_info.world_gravity_z is not None:
+            self.world_gravity_z = game_state.game_info.world_gravity_z
+
+    def set_bot_input(self, car_index: int, controls: SimpleControllerState):
+        car = self.cars[car_index]
+        car.throttle = _clamp(controls.throttle, -1, 1)
+        car.steer = _clamp(controls.steer, -1, 1)
+        car.boost_pressed = bool(controls.boost)
+        car.jump_pressed = bool(controls.jump)
+
+    def step(self, game_tick_packet: GameTickPacket):
+        dt = 1 / self.ticks_per_second
+        self.seconds_elapsed += dt
+        for car in self.cars:
+            self._step_car(car, dt)
+        self._step_ball(dt)
+        self._collide_cars_with_ball()
+        self._write_packet(game_tick_packet)
+
+    def _init_ball(self):
+        self.ball_location = [0., 0., BALL_RADIUS]
+        self.ball_velocity = [0., 0., 0.]
+        self.ball_angular_velocity = [0., 0., 0.]
+        self.latest_touch_player_index = -1
+        self.latest_touch_time = 0.
+        self.latest_touch_location = [0., 0., 0.]
+        self.latest_touch_normal = [0., 0., 0.]
+
+    def _init_cars(self, teams: List[int], names: List[str]):
+        n = len(teams)
+        self.cars = []
+        # Kickoff-like spawn positions.
+        for i, (team, name) in enumerate(zip(teams, names)):
+            side = -1 if team == 0 else 1
+            car = SimulatedCar(name, team)
+            car.location = [(i // 2 - (n - 1) / 4) * 512, side * 4608, CAR_REST_HEIGHT]
+            car.rotation[1] = -side * math.pi / 2
+            self.cars.append(car)
+
+    def _step_car(self, car: 'SimulatedCar', dt: float):
+        pitch, yaw, _ = car.rotation
+        cos_pitch = math.cos(pitch)
+        forward = (math.cos(yaw) * cos_pitch, math.sin(yaw) * cos_pitch, math.sin(pitch))
+        jump_edge = car.jump_pressed and not car.jump_was_pressed
+        car.jump_was_pressed = car.jump_pressed
+        boosting = car.boost_pressed and car.boost > 0
+        if boosting:
+            car.boost = max(car.boost - CAR_BOOST_CONSUMPTION * dt, 0)
+        location = car.location
+        velocity = car.velocity
+
+        if car.on_ground:
+            # Driving on the ground: velocity follows the heading.
+            speed = velocity[0] * forward[0] + velocity[1] * forward[1] + velocity[2] * forward[2]
+            throttle = car.throttle
+            if throttle == 0:
+                acceleration = -_sign(speed) * CAR_COAST_ACCELERATION
+            elif throttle * speed >= 0:
+                acceleration = throttle * CAR_THROTTLE_ACCELERATION * _clamp(1 - abs(speed) / CAR_MAX_THROTTLE_SPEED, 0, 1)
+            else:
+                acceleration = -_sign(speed) * CAR_BRAKE_ACCELERATION
+            if boosting:
+                acceleration += CAR_BOOST_ACCELERATION
+            new_speed = speed + acceleration * dt
+            if throttle == 0 and new_speed * speed < 0:
+                new_speed = 0.  # Coasting does not reverse.
+            new_speed = _clamp(new_speed, -CAR_MAX_SPEED, CAR_MAX_SPEED)
+            yaw_rate = car.steer * _interpolate(abs(new_speed), _curvature_speeds, _curvatures) * new_speed
+            yaw += yaw_rate * dt
+            car.rotation[1] = yaw
+            velocity[0] = math.cos(yaw) * new_speed
+            velocity[1] = math.sin(yaw) * new_speed
+            velocity[2] = CAR_JUMP_SPEED if jump_edge else 0.
+            car.angular_velocity = [0., 0., yaw_rate]
+            if jump_edge:
+                car.jumped = True
+                car.on_ground = False
+        else:
+            # Flying: ballistic, plus boost and a double jump.
+            if boosting:
+                for i in range(3):
+                    velocity[i] += forward[i] * CAR_BOOST_ACCELERATION * dt
+            velocity[2] += self.world_gravity_z * dt
+            if jump_edge and car.jumped and not car.double_jumped:
+                velocity[2] += CAR_DOUBLE_JUMP_SPEED
+                car.double_jumped = True
+
+        _limit_length(velocity, CAR_MAX_SPEED)
+        for i in range(3):
+            location[i] += velocity[i] * dt
+
+        # Stay inside the arena.
+        for axis, limit in ((0, ARENA_HALF_WIDTH - CAR_RADIUS), (1, ARENA_HALF_LENGTH - CAR_RADIUS)):
+            if abs(location[axis]) > limit:
+                location[axis] = math.copysign(limit, location[axis])
+                velocity[axis] = 0.
+        if location[2] <= CAR_REST_HEIGHT and velocity[2] <= 0:
+            location[2] = CAR_REST_HEIGHT
+            velocity[2] = 0.
+            car.rotation[0] = 0.
+            car.rotation[2] = 0.
+            car.on_ground = True
+            car.jumped = False
+            car.double_jumped = False
+
+    def _step_ball(self, dt: float):
+        location = self.ball_location
+        velocity = self.ball_velocity
+        velocity[2] += self.world_gravity_z * dt
+        drag = 1 - BALL_DRAG * dt
+        for i in range(3):
+            velocity[i] *= drag
+            location[i] += velocity[i] * dt
+
+        # Ground
+        if location[2] < BALL_RADIUS:
+            location[2] = BALL_RADIUS
+            velocity[2] = -velocity[2] * BALL_RESTITUTION if velocity[2] < -BALL_REST_SPEED else 0.
+            ground_speed = math.hypot(velocity[0], velocity[1])
+            if ground_speed > 0:
+                friction = max(0, ground_speed - BALL_ROLLING_FRICTION * dt) / ground_speed
+                velocity[0] *= friction
+                velocity[1] *= friction
+            # Rolling: spin around the horizontal axis perpendicular to the velocity.
+            self.ball_angular_velocity[0] = -velocity[1] / BALL_RADIUS
+            self.ball_angular_velocity[1] = velocity[0] / BALL_RADIUS
+
+        # Ceiling and side walls
+        if location[2] > ARENA_HEIGHT - BALL_RADIUS:
+            location[2] = ARENA_HEIGHT - BALL_RADIUS
+            velocity[2] = -abs(velocity[2]) * BALL_RESTITUTION
+        if abs(location[0]) > ARENA_HALF_WIDTH - BALL_RADIUS:
+            location[0] = math.copysign(ARENA_HALF_WIDTH - BALL_RADIUS, location[0])
+            velocity[0] = -velocity[0] * BALL_RESTITUTION
+
+        # Back walls and goals
+        in_goal_mouth = abs(location[0]) < GOAL_HALF_WIDTH - BALL_RADIUS and location[2] < GOAL_HEIGHT - BALL_RADIUS
+        if abs(location[1]) > ARENA_HALF_LENGTH + BALL_RADIUS and in_goal_mouth:
+            scoring_team = 0 if location[1] > 0 else 1
+            self.scores[scoring_team] += 1
+            self._init_ball()
+            return
+        if abs(location[1]) > ARENA_HALF_LENGTH - BALL_RADIUS and not in_goal_mouth:
+            location[1] = math.copysign(ARENA_HALF_LENGTH - BALL_RADIUS, location[1])
+            velocity[1] = -velocity[1] * BALL_RESTITUTION
+
+        _limit_length(velocity, BALL_MAX_SPEED)
+        _limit_length(self.ball_angular_velocity, BALL_MAX_ANGULAR_SPEED)
+
+    def _collide_cars_with_ball(self):
+        ball_location = self.ball_location
+        ball_velocity = self.ball_velocity
+        contact_distance = BALL_RADIUS + CAR_RADIUS
+        for car_index, car in enumerate(self.cars):
+            offset = [ball_location[i] - car.location[i] for i in range(3)]
+            distance = math.sqrt(offset[0] ** 2 + offset[1] ** 2 + offset[2] ** 2)
+            if distance >= contact_distance:
+                continue
+            normal = [component / max(distance, 1e-9) for component in offset]
+            relative_velocity = [ball_velocity[i] - car.velocity[i] for i in range(3)]
+            normal_speed = sum(relative_velocity[i] * normal[i] for i in range(3))
+            if normal_speed < 0:
+                for i in range(3):
+                    ball_velocity[i] -= (1 + BALL_RESTITUTION) * normal_speed * normal[i]
+                self.ball_angular_velocity = [component / BALL_RADIUS for component in _cross(normal, relative_velocity)]
+            for i in range(3):
+                ball_location[i] = car.location[i] + normal[i] * contact_distance
+            self.latest_touch_player_index = car_index
+            self.latest_touch_time = self.seconds_elapsed
+            self.latest_touch_location = [car.location[i] + normal[i] * CAR_RADIUS for i in range(3)]
+            self.latest_touch_normal = normal
+
+    def _write_packet(self, packet: GameTickPacket):
+        packet.game_info.seconds_elapsed = self.seconds_elapsed
+        packet.game_info.is_round_active = True
+        packet.game_info.is_unlimited_time = True
+        packet.game_info.world_gravity_z = self.world_gravity_z
+        packet.game_info.game_speed = 1
+
+        ball = packet.game_ball
+        _write_vector(ball.physics.location, self.ball_location)
+        _write_vector(ball.physics.velocity, self.ball_velocity)
+        _write_vector(ball.physics.angular_velocity, self.ball_angular_velocity)
+        if self.latest_touch_player_index >= 0:
+            toucher = self.cars[self.latest_touch_player_index]
+            touch = ball.latest_touch
+            touch.player_name = toucher.name
+            touch.time_seconds = self.latest_touch_time
+            _write_vector(touch.hit_location, self.latest_touch_location)
+            _write_vector(touch.hit_normal, self.latest_touch_normal)
+            touch.team = toucher.team
+            touch.player_index = self.latest_touch_player_index
+
+        packet.num_cars = len(self.cars)
+        for car, packet_car in zip(self.cars, packet.game_cars):
+            physics = packet_car.physics
+            _write_vector(physics.location, car.location)
+            _write_vector(physics.velocity, car.velocity)
+            _write_vector(physics.angular_velocity, car.angular_velocity)
+            physics.rotation.pitch, physics.rotation.yaw, physics.rotation.roll = car.rotation
+            packet_car.has_wheel_contact = car.on_ground
+            packet_car.jumped = car.jumped
+            packet_car.double_jumped = car.double_jumped
+            packet_car.is_super_sonic = sum(component ** 2 for component in car.velocity) > 2200 ** 2
+            packet_car.is_bot = True
+            packet_car.name = car.name
+            packet_car.team = car.team
+            packet_car.boost = int(car.boost)
+            packet_car.hitbox.length, packet_car.hitbox.width, packet_car.hitbox.height = CAR_HITBOX
+
+        packet.num_teams = 2
+        for team_index, score in enumerate(self.scores):
+            packet.teams[team_index].team_index = team_index
+            packet.teams[team_index].score = score
+
+
+class SimulatedCar:
+    """
+    The state of one car in the HeadlessBackend.
+    Vectors are plain lists: with only a handful of cars per exercise,
+    scalar math is cheaper than the per-call overhead of NumPy.
+    """
+    __slots__ = (
+        'name', 'team', 'location', 'velocity', 'angular_velocity', 'rotation', 'boost',
+        'on_ground', 'jumped', 'double_jumped',
+        'throttle', 'steer', 'boost_pressed', 'jump_pressed', 'jump_was_pressed',
+    )
+
+    def __init__(self, name: str, team: int):
+        self.name = name
+        self.team = team
+        self.location = [0., 0., CAR_REST_HEIGHT]
+        self.velocity = [0., 0., 0.]
+        self.angular_velocity = [0., 0., 0.]
+        self.rotation = [0., 0., 0.]  # pitch, yaw, roll
+        self.boost = 33.
+        self.on_ground = True
+        self.jumped = False
+        self.double_jumped = False
+        self.throttle = 0.
+        self.steer = 0.
+        self.boost_pressed = False
+        self.jump_pressed = False
+        self.jump_was_pressed = False
+
+
+def _set_vector(destination: List[float], source, attribute_names=('x', 'y', 'z')):
+    """ Copies the components from the game_state_util object, ignoring the unset (None) ones. """
+    if source is None:
+        return
+    for i, name in enumerate(attribute_names):
+        value = getattr(source, name)
+        if value is not None:
+            destination[i] = value
+
+def _write_vector(destination, source: List[float]):
+    destination.x, destination.y, destination.z = source
+
+def _clamp(value: float, low: float, high: float) -> float:
+    return low if value < low else high if value > high else value
+
+def _sign(value: float) -> float:
+    return (value > 0) - (value < 0)
+
+def _limit_length(vector: List[float], max_length: float):
+    length_squared = vector[0] ** 2 + vector[1] ** 2 + vector[2] ** 2
+    if length_squared > max_length ** 2:
+        scale = max_length / math.sqrt(length_squared)
+        for i in range(3):
+            vector[i] *= scale
+
+def _cross(a: List[float], b: List[float]) -> List[float]:
+    return [
+        a[1] * b[2] - a[2] * b[1],
+        a[2] * b[0] - a[0] * b[2],
+        a[0] * b[1] - a[1] * b[0],
+    ]
+
+def _interpolate(x: float, xs: Sequence[float], ys: Sequence[float]) -> float:
+    """ Piecewise linear interpolation, clamped at the ends like numpy.interp(). """
+    if x <= xs[0]:
+        return ys[0]
+    for i in range(1, len(xs)):
+        if x <= xs[i]:
+            t = (x - xs[i - 1]) / (xs[i] - xs[i - 1])
+            return ys[i - 1] + t * (ys[i] - ys[i - 1])
+    return ys[-1]
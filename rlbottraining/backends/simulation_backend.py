@@ -0,0 +1,135 @@
+from random import Random
+from typing import Callable, Iterator, Mapping, Optional, Sequence
+import traceback
+
+from rlbot.agents.base_agent import SimpleControllerState
+from rlbot.matchcomms.client import MatchcommsClient
+from rlbot.matchconfig.match_config import MatchConfig
+from rlbot.setup_manager import SetupManager
+from rlbot.training.training import Exercise as RLBotExercise, Fail, FailDueToExerciseException, Result, run_exercises as rlbot_run_exercises
+from rlbot.utils.game_state_util import GameState
+from rlbot.utils.structures.game_data_struct import GameTickPacket
+
+"""
+This file describes the interface to whatever runs the exercises and produces the ticks for them.
+Usually this is Rocket League via RLBot but it can also be a local simulation
+(see headless_backend.py) which allows exercises to be run without the game.
+"""
+
+# Something which drives a car: it gets the current packet and returns the inputs for the next tick.
+BotController = Callable[[GameTickPacket], SimpleControllerState]
+
+
+class SimulationBackend:
+    """
+    Runs exercises and grades them.
+    """
+
+    def run_exercises(self, exercises: Sequence[RLBotExercise], seed: int, reload_agent: bool = True) -> Iterator[Result]:
+        """
+        Has the same contract as rlbot.training.training.run_exercises().
+        """
+        raise NotImplementedError()
+
+
+class RLBotBackend(SimulationBackend):
+    """
+    Runs the exercises in Rocket League.
+    """
+
+    def __init__(self, setup_manager: SetupManager):
+        self.setup_manager = setup_manager
+
+    def run_exercises(self, exercises: Sequence[RLBotExercise], seed: int, reload_agent: bool = True) -> Iterator[Result]:
+        return rlbot_run_exercises(self.setup_manager, exercises, seed, reload_agent=reload_agent)
+
+
+class FailDueToSimulationLimit(Fail):
+    """ Indicates that the exercise did not finish within the maximum simulated duration. """
+
+    def __init__(self, max_simulated_seconds: float):
+        self.max_simulated_seconds = max_simulated_seconds
+
+    def __repr__(self):
+        return f'{super().__repr__()}: Exercise did not finish within {self.max_simulated_seconds} simulated seconds.'
+
+
+class SteppedSimulationBackend(SimulationBackend):
+    """
+    A backend where we are in control of time.
+    run_exercises() is implemented here in terms of the abstract methods below,
+    following what rlbot's run_exercises() does minus the waiting.
+    Note: exercises are not rendered as there is nothing to render to.
+    """
+
+    ticks_per_second = 120
+    max_simulated_seconds_per_exercise = 600.
+
+    def __init__(self, bot_controllers: Optional[Mapping[int, BotController]] = None):
+        """
+        :param bot_controllers: Maps the car index to what drives the car.
+            Cars without a controller get no input.
+        """
+        self.bot_controllers = {} if bot_controllers is None else dict(bot_controllers)
+        self.match_config: Optional[MatchConfig] = None
+
+    def setup_match(self, match_config: MatchConfig):
+        raise NotImplementedError()
+
+    def set_game_state(self, game_state: GameState):
+        raise NotImplementedError()
+
+    def set_bot_input(self, car_index: int, controls: SimpleControllerState):
+        raise NotImplementedError()
+
+    def step(self, game_tick_packet: GameTickPacket):
+        """
+        Advances the simulation by one tick and writes the new state into game_tick_packet.
+        """
+        raise NotImplementedError()
+
+    def run_exercises(self, exercises: Sequence[RLBotExercise], seed: int, reload_agent: bool = True) -> Iterator[Result]:
+        for exercise in exercises:
+            new_match_config = exercise.get_match_config()
+            if new_match_config != self.match_config:
+                self.setup_match(new_match_config)
+                self.match_config = new_match_config
+
+            try:
+                exercise.set_matchcomms_factory(_no_matchcomms_factory)
+                early_grade = exercise.on_briefing()
+            except Exception as e:
+                yield Result(exercise, seed, FailDueToExerciseException(e, traceback.format_exc()))
+                continue
+            if early_grade is not None:
+                yield Result(exercise, seed, early_grade)
+                continue
+
+            rng = Random()
+            rng.seed(seed)
+            try:
+                game_state = exercise.setup(rng)
+            except Exception as e:
+                yield Result(exercise, seed, FailDueToExerciseException(e, traceback.format_exc()))
+                continue
+            self.set_game_state(game_state)
+
+            yield Result(exercise, seed, self._grade_exercise(exercise))
+
+    def _grade_exercise(self, exercise: RLBotExercise):
+        game_tick_packet = GameTickPacket()
+        for _ in range(int(self.max_simulated_seconds_per_exercise * self.ticks_per_second)):
+            self.step(game_tick_packet)
+            try:
+                grade = exercise.on_tick(game_tick_packet)
+            except Exception as e:
+                return FailDueToExerciseException(e, traceback.format_exc())
+            if grade is not None:
+                return grade
+            for car_index, controller in self.bot_controllers.items():
+                self.set_bot_input(car_index, controller(game_tick_packet))
+        return FailDueToSimulationLimit(self.max_simulated_seconds_per_exercise)
+
+
+def _no_matchcomms_factory() -> MatchcommsClient:
+    raise NotImplementedError('Matchcomms are not available in this simulation backend.')
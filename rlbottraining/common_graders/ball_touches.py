@@ -1,28 +1,110 @@
-import copy
-from typing import List, Optional, Mapping, Any
+from collections import deque
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Deque, Dict, List, Mapping, Optional
+import json
+import uuid
 
 from rlbot.training.training import Grade
 from rlbot.utils.structures.game_data_struct import Touch
 
-from . import Grader, TrainingTickPacket
+from rlbottraining.grading.event_detector import PlayerEventType
+from rlbottraining.grading.grader import Grader, TrainingTickPacket
+from rlbottraining.grading.snapshot import snapshot, snapshot_pool
+from rlbottraining.history.metric import Metric
+from rlbottraining.history.metric_json_encoder import MetricJsonEncoder
+
+SPILL_FILE_SUFFIX = '.touches.jsonl'
+
+
+@dataclass
+class TouchSummary(Metric):
+    """
+    Statistics over all touches recorded by a RecordBallTouches,
+    including the ones which were not kept.
+    """
+    count: int = 0
+    first_seconds: Optional[float] = None
+    last_seconds: Optional[float] = None
+    touches_per_player: Dict[int, int] = field(default_factory=dict)  # By player_index.
+
+    def add(self, touch: Touch):
+        if self.first_seconds is None:
+            self.first_seconds = touch.time_seconds
+        self.last_seconds = touch.time_seconds
+        self.count += 1
+        self.touches_per_player[touch.player_index] = self.touches_per_player.get(touch.player_index, 0) + 1
 
 
 class RecordBallTouches(Grader):
+    """
+    Records the touches of the ball which happen while grading.
+    By default all of them are kept and serialized into the result.
+    For long exercises (e.g. survival-style ones) there are two ways to keep the memory and result size flat:
+    - max_touches: Keep only the latest max_touches touches.
+    - spill_dir: Append each touch to a <uuid>.touches.jsonl file in spill_dir rather than keeping it.
+      The result only references the file (spill_path). See read_spilled_touches().
+    Either way, summary covers all touches.
+    """
 
-    def __init__(self):
-        self.touches: List[Touch] = []
+    def __init__(self, max_touches: Optional[int] = None, spill_dir: Optional[Path] = None):
+        assert max_touches is None or max_touches >= 0
+        self.max_touches = max_touches
+        self.spill_path: Optional[Path] = None
+        if spill_dir is not None:
+            self.spill_path = Path(spill_dir) / (uuid.uuid4().hex + SPILL_FILE_SUFFIX)
+        self.touches: Deque[Touch] = deque()
+        self.summary = TouchSummary()
         self.initial_seconds_elapsed: float = None
 
     def on_tick(self, tick: TrainingTickPacket) -> Optional[Grade]:
+        latest_touch = tick.game_tick_packet.game_ball.latest_touch
         if self.initial_seconds_elapsed is None:
             self.initial_seconds_elapsed = tick.game_tick_packet.game_info.seconds_elapsed
+            # There is no touch event for the first tick, as there is nothing to compare it to.
+            is_new_touch = latest_touch.time_seconds >= self.initial_seconds_elapsed
+        else:
+            is_new_touch = bool(tick.player_events_of_type(PlayerEventType.BALL_TOUCH))
 
         # Record the touch only if it is new and happened while we were grading.
-        latest_touch = tick.game_tick_packet.game_ball.latest_touch
-        if latest_touch.time_seconds < self.initial_seconds_elapsed:
-            return
-        if self.touches and latest_touch.time_seconds == self.touches[-1]:
-            return
-        self.touches.append(copy.deepcopy(latest_touch))
-        # TODO: maybe impose a limit on the number of touches recorded? To prevent OOM and unnecessarily big datasets.
+        if is_new_touch and latest_touch.time_seconds >= self.initial_seconds_elapsed:
+            self._record(latest_touch)
         return  # This grader never terminates the exercise.
+
+    def _record(self, touch: Touch):
+        self.summary.add(touch)
+        if self.spill_path is not None:
+            self._spill(touch)
+            return
+        if self.max_touches is not None:
+            if self.max_touches == 0:
+                return
+            if len(self.touches) >= self.max_touches:
+                # Nothing else references the evicted touch, so its memory can be reused.
+                snapshot_pool(Touch).release(self.touches.popleft())
+        self.touches.append(snapshot(touch))
+
+    def _spill(self, touch: Touch):
+        # Touches are rare compared to ticks, so opening the file each time is affordable
+        # and keeps an open file handle out of this (serialized) grader.
+        self.spill_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.spill_path, 'a') as f:
+            f.write(json.dumps(touch, cls=MetricJsonEncoder, sort_keys=True) + '\n')
+
+    def to_json(self) -> Dict[str, Any]:
+        return {
+            'max_touches': self.max_touches,
+            'spill_path': None if self.spill_path is None else str(self.spill_path),
+            'touches': list(self.touches),
+            'summary': self.summary,
+            'initial_seconds_elapsed': self.initial_seconds_elapsed,
+        }
+
+
+def read_spilled_touches(spill_path: Path) -> List[Mapping[str, Any]]:
+    """ Returns the touches written by RecordBallTouches(spill_dir=...) as JSON objects, in order. """
+    spill_path = Path(spill_path)
+    if not spill_path.exists():
+        return []  # There were no touches.
+    with open(spill_path) as f:
+        return [json.loads(line) for line in f if line.strip()]
@@ -13,19 +13,48 @@ class CompoundGrader(Grader):
     """
     Combines a bunch of named Graders into one Grader which
     forwards calls to them.
+
+    By default, every grader sees every tick and the most significant grade wins.
+    With short_circuit, the graders are evaluated by descending priority, then ascending evaluation_cost
+    and evaluation stops at the first Fail. Graders which require every tick (the default) are still called after that,
+    so only the ones which opt out via requires_every_tick are ever skipped, e.g. FailOnTimeout and PassOnGoalForAllyTeam.
+    In both modes, the first of equally significant grades in the order of evaluation wins.
     """
 
-    def __init__(self, graders: List[Grader]):
+    def __init__(self, graders: List[Grader], short_circuit: bool = False):
         self.graders = graders
+        self.short_circuit = short_circuit
+        self.evaluation_order = evaluation_order(graders) if short_circuit else None  # Indices into graders.
+
+    @property
+    def requires_every_tick(self) -> bool:
+        return any(grader.requires_every_tick for grader in self.graders)
 
     def on_tick(self, tick: TrainingTickPacket) -> Optional[Grade]:
+        if self.short_circuit:
+            return self._on_tick_short_circuit(tick)
         grades = [grader.on_tick(tick) for grader in self.graders]
         return reduce(pick_more_significant_grade, grades, None)
 
+    def _on_tick_short_circuit(self, tick: TrainingTickPacket) -> Optional[Grade]:
+        grade = None
+        for i in self.evaluation_order:
+            grader = self.graders[i]
+            if isinstance(grade, Fail):
+                if grader.requires_every_tick:
+                    grader.on_tick(tick)
+            else:
+                grade = pick_more_significant_grade(grade, grader.on_tick(tick))
+        return grade
+
     def render(self, renderer: RenderingManager):
         for grader in self.graders:
             grader.render(renderer)
 
+def evaluation_order(graders: List[Grader]) -> List[int]:
+    """ Stable, such that graders with the same hints are evaluated in the given order. """
+    return sorted(range(len(graders)), key=lambda i: (-graders[i].priority, graders[i].evaluation_cost))
+
 def pick_more_significant_grade(a: Optional[Grade], b: Optional[Grade]) -> Optional[Grade]:
     """
     Chooses to return @a or @b based on some measure of sigificance.
@@ -48,6 +48,8 @@ class PassOnGoalForAllyTeam(Grader):
     otherwise returns a Fail.
     """
 
+    requires_every_tick = False  # Scores are compared to the initial ones, so a goal is noticed on any later tick.
+
     ally_team: int  # The team ID, as in game_datastruct.PlayerInfo.team
     init_score: Optional[Mapping[int, int]] = None  # team_id -> score
 
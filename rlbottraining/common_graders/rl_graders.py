@@ -17,7 +17,6 @@ from rlbottraining.common_graders.compound_grader import CompoundGrader
 from rlbottraining.common_graders.timeout import FailOnTimeout, PassOnTimeout
 from rlbottraining.common_graders.goal_grader import PassOnGoalForAllyTeam
 from rlbot.training.training import Pass, Fail, Grade
-import copy
 
 
 class RocketLeagueStrikerGrader(CompoundGrader):
@@ -35,28 +34,33 @@ class RocketLeagueStrikerGrader(CompoundGrader):
         ])
 
     def on_tick(self, tick: TrainingTickPacket) -> Optional[Grade]:
-        grades = [grader.on_tick(tick) for grader in self.graders]
+        goal_grader, ground_grader, timeout_grader = self.graders
         # Choose the importance of the grades.
-
-        timeout = isinstance(grades[2], Fail)  # True if timed out, false otherwise
-        ball_on_ground = isinstance(grades[1], Fail)  # True if ball touched the ground, false otherwise
-        goal = isinstance(grades[0], Pass)  # True if ball there was a goal, false otherwise
-
-        if goal:  # scoring and touching the ground on the same tick prefer scoring
-            return grades[0]
-        elif timeout:
-            if self.timeout_override:
-                return grades[2]
-            elif ball_on_ground:
-                return grades[1]
-        elif self.ground_override and ball_on_ground:
-            return grades[1]
+        # The goal and timeout graders keep state, so they see every tick.
+        goal_grade = goal_grader.on_tick(tick)
+        timeout_grade = timeout_grader.on_tick(tick)
+        if isinstance(goal_grade, Pass):  # scoring and touching the ground on the same tick prefer scoring
+            return goal_grade
+
+        timeout = isinstance(timeout_grade, Fail)
+        if timeout and self.timeout_override:
+            return timeout_grade
+        if not timeout and not self.ground_override:
+            return None  # The ball touching the ground would not change the grade.
+        # Only evaluated when it matters, which is fine as it keeps no state (see requires_every_tick).
+        ground_grade = ground_grader.on_tick(tick)
+        if isinstance(ground_grade, Fail):
+            return ground_grade
         return None
 
 
 class FailOnBallOnGround(Grader):
-    def __init__(self):
-        self.previous_ball = None
+    """
+    Compares the ball to the previous tick, see TrainingTickPacket.history.
+    """
+
+    evaluation_cost = 5.0
+    requires_every_tick = False  # The history is recorded regardless.
 
     class FailDueToGroundHit(Fail):
         def __init__(self):
@@ -65,23 +69,21 @@ class FailOnBallOnGround(Grader):
         def __repr__(self):
             return f'{super().__repr__()}: Ball hit the ground'
 
-
-    def set_previous_info(self, ball):
-        self.previous_ball = copy.deepcopy(ball)
-
     def on_tick(self, tick: TrainingTickPacket) -> Optional[Grade]:
         packet = tick.game_tick_packet
         ball = packet.game_ball.physics
         hit_ground = False
 
-        if self.previous_ball is None:
-            self.set_previous_info(ball)
-            return None
+        if len(tick.history) < 2:
+            return None  # Nothing to compare to yet.
+        previous_ball = tick.history.ball(2)[0]['physics']
+        # As python floats, like the values read from the packet.
+        previous_angular_velocity_x, previous_angular_velocity_y, previous_angular_velocity_z = previous_ball['angular_velocity'].tolist()
 
         max_ang_vel = 5.9999601985025075  #Max angular velocity possible
-        previous_angular_velocity_norm = math.sqrt(self.previous_ball.angular_velocity.x**2 +
-                                                   self.previous_ball.angular_velocity.y**2 +
-                                                   self.previous_ball.angular_velocity.z**2 )
+        previous_angular_velocity_norm = math.sqrt(previous_angular_velocity_x**2 +
+                                                   previous_angular_velocity_y**2 +
+                                                   previous_angular_velocity_z**2 )
 
         angular_velocity_norm = math.sqrt(ball.angular_velocity.x**2 +
                                           ball.angular_velocity.y**2 +
@@ -89,9 +91,9 @@ class FailOnBallOnGround(Grader):
 
         if ball.location.z <= 1900:  #Making sure it doesnt count the ceiling
 
-            if ball.angular_velocity.x != self.previous_ball.angular_velocity.x or \
-               ball.angular_velocity.y != self.previous_ball.angular_velocity.y or \
-               ball.angular_velocity.z != self.previous_ball.angular_velocity.z:
+            if ball.angular_velocity.x != previous_angular_velocity_x or \
+               ball.angular_velocity.y != previous_angular_velocity_y or \
+               ball.angular_velocity.z != previous_angular_velocity_z:
                 # If the ball hit anything its angular velocity will change in at least one axis
                 if (previous_angular_velocity_norm or angular_velocity_norm) == max_ang_vel:
                     '''
@@ -99,10 +101,9 @@ class FailOnBallOnGround(Grader):
                     angular velocity gets rescaled which may change an axis that truly did not change, only got rescaled
                     '''
                     #Todo: implement detection for this case
-                    self.set_previous_info(ball)
                     return None
 
-                elif self.previous_ball.angular_velocity.z == ball.angular_velocity.z:
+                elif previous_angular_velocity_z == ball.angular_velocity.z:
                     '''
                     Ball hit a flat horizontal surface
                     this only changes angular velocity z 
@@ -117,7 +118,6 @@ class FailOnBallOnGround(Grader):
                         '''
                         #Todo: distinguish dribble from pushing on ground.
                         #Todo: write tests to test pushing.
-                        self.set_previous_info(ball)
                         return None
                     else:
                         hit_ground = True
@@ -129,7 +129,6 @@ class FailOnBallOnGround(Grader):
                         '''
                         ball not hit by a bot on this tick
                         '''
-                        self.set_previous_info(ball)
                         return None
                     else:
                         '''
@@ -143,14 +142,14 @@ class FailOnBallOnGround(Grader):
                                       ball.velocity.z**2)
 
 
-            previous_velocity_norm = math.sqrt(self.previous_ball.velocity.x ** 2 +
-                                               self.previous_ball.velocity.y ** 2 +
-                                               self.previous_ball.velocity.z ** 2 )
+            previous_velocity_x, previous_velocity_y, previous_velocity_z = previous_ball['velocity'].tolist()
+            previous_velocity_norm = math.sqrt(previous_velocity_x ** 2 +
+                                               previous_velocity_y ** 2 +
+                                               previous_velocity_z ** 2 )
             if previous_velocity_norm == velocity_norm == 0:
                 '''
                 ball is stopped on ground
                 '''
                 hit_ground = True
-        self.set_previous_info(ball)
         if hit_ground:
             return self.FailDueToGroundHit()
@@ -0,0 +1,170 @@
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+from rlbot.training.training import Pass, Fail, Grade
+
+from rlbottraining.grading.grader import Grader, TrainingTickPacket
+from rlbottraining.grading.grader_dsl import Rule, compile_rules
+
+
+class RuleGrader(Grader):
+    """
+    Grades with rules in the condition language of grading/grader_dsl.py, e.g.
+
+        RuleGrader('''
+            ball.z < 100 for 20 ticks -> Fail: The ball stayed low.
+            game.seconds_elapsed - initial(game.seconds_elapsed) > 5 -> Pass
+        ''')
+
+    All rules are evaluated by a single generated function, which is cheaper than
+    a CompoundGrader of one Grader per rule. The rules can also be evaluated for all
+    ticks of a tick capture at once, see grade_batch().
+    The functions below make rules which behave like the graders in goal_grader.py, kickoff_grader.py and rl_graders.py.
+    """
+
+    class PassDueToRule(Pass):
+        def __init__(self, rule: str, message: Optional[str]):
+            self.rule = rule
+            self.message = message
+
+        def __repr__(self):
+            return f'{super().__repr__()}: {self.message or self.rule}'
+
+    class FailDueToRule(Fail):
+        def __init__(self, rule: str, message: Optional[str]):
+            self.rule = rule
+            self.message = message
+
+        def __repr__(self):
+            return f'{super().__repr__()}: {self.message or self.rule}'
+
+    def __init__(self, rules: str):
+        self.rules = rules
+        self._state = compile_rules(rules).make_state()
+
+    def on_tick(self, tick: TrainingTickPacket) -> Optional[Grade]:
+        compiled = compile_rules(self.rules)
+        fired = compiled.tick_function(tick.game_tick_packet, self._state)
+        if fired is not None:
+            return self.make_grade(compiled.rules[fired])
+
+    @property
+    def requires_every_tick(self) -> bool:
+        """ Only if the rules use previous(), ever() or `for N ticks`. """
+        return compile_rules(self.rules).needs_every_tick
+
+    def has_initial_state(self) -> bool:
+        """ Whether the rules are in the state they start grading with, e.g. because on_tick() was not called yet. """
+        return self._state == compile_rules(self.rules).make_state()
+
+    def to_json(self) -> Dict[str, Any]:
+        # The state of the rules is an implementation detail of the generated function.
+        return {'rules': self.rules}
+
+    def grade_batch(self, packets: np.ndarray) -> Optional[Tuple[int, Grade]]:
+        """
+        Grades the packets (an array with the dtype of packet_arrays.dtype_from_ctypes(GameTickPacket))
+        as if each of them was passed to on_tick(), without changing the state of this grader.
+        Returns the index of the packet which got graded and its grade, or None if no rule held.
+        """
+        compiled = compile_rules(self.rules)
+        fired = compiled.evaluate_batch(packets)
+        graded = np.flatnonzero(fired >= 0)
+        if len(graded) == 0:
+            return None
+        tick_index = int(graded[0])
+        return tick_index, self.make_grade(compiled.rules[fired[tick_index]])
+
+    def make_grade(self, rule: Rule) -> Grade:
+        grade_class = self.PassDueToRule if rule.outcome == 'Pass' else self.FailDueToRule
+        return grade_class(rule.text, rule.message)
+
+
+# Definitions and rules which behave like the graders in goal_grader.py, kickoff_grader.py and rl_graders.py.
+# Teams are referred to by their position in GameTickPacket.teams, which matches their team_index.
+
+def goal_definitions(ally_team: int = 0) -> str:
+    """ Defines ally_goal and wrong_goal, like PassOnGoalForAllyTeam. """
+    return f'''
+        ally_goal = team{ally_team}.score > initial(team{ally_team}.score)
+        wrong_goal = team{1 - ally_team}.score > initial(team{1 - ally_team}.score)
+    '''
+
+def timeout_definition(max_duration_seconds: float) -> str:
+    """ Defines timed_out, like FailOnTimeout. """
+    return f'''
+        timed_out = game.seconds_elapsed - initial(game.seconds_elapsed) > {float(max_duration_seconds)!r}
+    '''
+
+def ball_going_away_from_goal_definition(ally_team: int = 0) -> str:
+    """ Defines ball_going_away_from_goal, which PassOnBallGoingAwayFromGoal requires for 20 ticks in a row. """
+    return f'''
+        ball_going_away_from_goal = ball.vy * {1 if ally_team == 0 else -1} > 0
+    '''
+
+# Defines ball_on_ground, like FailOnBallOnGround.
+ball_on_ground_definition = '''
+    angular_speed = sqrt(ball.avx**2 + ball.avy**2 + ball.avz**2)
+    speed = sqrt(ball.vx**2 + ball.vy**2 + ball.vz**2)
+    spin_changed = ball.avx != previous(ball.avx) or ball.avy != previous(ball.avy) or ball.avz != previous(ball.avz)
+    # The angular velocity gets rescaled at its maximum, which changes it without a hit.
+    spin_at_max = (previous(angular_speed) if previous(angular_speed) else angular_speed) == 5.9999601985025075
+    # Hitting a flat horizontal surface only changes the spin around z, unless a bot is touching it.
+    bounced = (spin_changed and not spin_at_max and ball.avz == previous(ball.avz)
+        and not ball.touch_time >= game.seconds_elapsed - 2 / 60)
+    pushed_by_bot = (spin_changed and not spin_at_max and ball.avz != previous(ball.avz)
+        and ball.touch_time == game.seconds_elapsed)
+    stopped = previous(speed) == speed == 0
+    ball_on_ground = ball.z <= 1900 and (bounced or (not spin_changed or pushed_by_bot) and stopped)
+'''
+
+def kickoff_definition(min_exercise_duration=4, min_ball_displacement=100) -> str:
+    """ Defines ball_moved_after_duration, like PassOnBallMoveFromKickoff. """
+    return f'''
+        ball_moved = sqrt(ball.x**2 + ball.y**2 + (ball.z - 93)**2) >= {min_ball_displacement!r}
+        duration_reached = game.seconds_elapsed >= initial(game.seconds_elapsed) + {min_exercise_duration!r}
+        ball_moved_after_duration = ever(ball_moved) and duration_reached
+    '''
+
+def striker_rules(timeout_seconds: float = 4.0, ally_team: int = 0) -> str:
+    """ Like goal_grader.StrikerGrader """
+    return goal_definitions(ally_team) + timeout_definition(timeout_seconds) + f'''
+        wrong_goal -> Fail: Ball went into the wrong goal.
+        timed_out -> Fail: Timeout: Took longer than {timeout_seconds} seconds.
+        ally_goal -> Pass
+    '''
+
+def goalie_rules(timeout_seconds: float = 10.0, ally_team: int = 0) -> str:
+    """ Like goal_grader.GoalieGrader """
+    return goal_definitions(ally_team) + timeout_definition(timeout_seconds) + ball_going_away_from_goal_definition(ally_team) + f'''
+        wrong_goal -> Fail: Ball went into the wrong goal.
+        ball_going_away_from_goal for 20 ticks -> Pass
+        ally_goal -> Pass
+        timed_out -> Pass: Timeout: Survived {timeout_seconds} seconds.
+    '''
+
+def kickoff_rules(timeout_seconds=4.5, min_exercise_duration=4, min_ball_displacement=100) -> str:
+    """ Like kickoff_grader.KickoffGrader """
+    return kickoff_definition(min_exercise_duration, min_ball_displacement) + timeout_definition(timeout_seconds) + f'''
+        timed_out -> Fail: Timeout: Took longer than {timeout_seconds} seconds.
+        ball_moved_after_duration -> Pass
+    '''
+
+def rocket_league_striker_rules(timeout_seconds=4.0, ally_team=0, timeout_override=False, ground_override=False) -> str:
+    """ Like rl_graders.RocketLeagueStrikerGrader """
+    rules = goal_definitions(ally_team) + timeout_definition(timeout_seconds) + ball_on_ground_definition + '''
+        ally_goal -> Pass
+    '''
+    if timeout_override:
+        rules += f'''
+        timed_out -> Fail: Timeout: Took longer than {timeout_seconds} seconds.
+        '''
+    rules += '''
+        timed_out and ball_on_ground -> Fail: Ball hit the ground
+    '''
+    if ground_override:
+        rules += '''
+        ball_on_ground -> Fail: Ball hit the ground
+        '''
+    return rules
@@ -1,4 +1,3 @@
-from copy import deepcopy
 from typing import Optional, Union
 from dataclasses import dataclass
 
@@ -7,6 +6,7 @@ from rlbot.utils.rendering.rendering_manager import RenderingManager
 from rlbot.utils.structures.game_data_struct import GameTickPacket
 
 from rlbottraining.grading.grader import Grader, TrainingTickPacket
+from rlbottraining.grading.snapshot import snapshot
 from rlbottraining.history.metric import Metric
 
 
@@ -38,13 +38,13 @@ class GameTickPacketWrapperGrader(Grader):
 
     def on_tick(self, tick: TrainingTickPacket) -> Optional[Union[WrappedPass, WrappedFail]]:
         if self.first_tick is None:
-            self.first_tick = deepcopy(tick.game_tick_packet)
+            self.first_tick = snapshot(tick.game_tick_packet)
 
         inner_grade = self.inner_grader.on_tick(tick)
         if inner_grade is None:
             return None
-        if isinstance(inner_grade, Pass): return self.WrappedPass(first_tick=self.first_tick, last_tick=deepcopy(tick.game_tick_packet), inner_grade=inner_grade)
-        if isinstance(inner_grade, Fail): return self.WrappedFail(first_tick=self.first_tick, last_tick=deepcopy(tick.game_tick_packet), inner_grade=inner_grade)
+        if isinstance(inner_grade, Pass): return self.WrappedPass(first_tick=self.first_tick, last_tick=snapshot(tick.game_tick_packet), inner_grade=inner_grade)
+        if isinstance(inner_grade, Fail): return self.WrappedFail(first_tick=self.first_tick, last_tick=snapshot(tick.game_tick_packet), inner_grade=inner_grade)
         assert False, f'Expected {self.inner_grader.on_tick} to return either None or a Pass/Fail. {inner_grade} was returned'
 
     def render(self, renderer: RenderingManager):
@@ -1,8 +1,6 @@
-import ctypes
 from typing import Tuple
 from enum import Enum
 from collections import deque, Counter
-from contextlib import contextmanager
 from math import pi
 
 
@@ -10,6 +8,9 @@ from rlbot.agents.base_agent import BaseAgent, SimpleControllerState
 from rlbot.utils.structures.ball_prediction_struct import BallPrediction, Slice as BallPredictionSlice
 from rlbot.utils.structures.game_data_struct import GameTickPacket, Vector3
 
+from rlbottraining.grading.packet_arrays import PacketArrays
+from rlbottraining.grading.tick_history import TickHistory
+
 from math import tau, sin, cos, tan, copysign, sqrt
 
 
@@ -45,29 +46,26 @@ class StateDiscontinuityDetector:
     MAX_PLAUSIBLE_BALL_SPEED = 15000 # uu/s
 
     def __init__(self):
-        self.prev_tick_packet = None
+        self.history = TickHistory(capacity=2)
     def is_discontinuous(self, game_tick_packet: GameTickPacket) -> bool:
         """
         Returns true iff it is implausible that we arrived at the current
         game_tick_packet by just waiting.
         Compares to the last time this function has been called.
         """
-        with self._update_prev_on_return(game_tick_packet):
-            if self.prev_tick_packet is None:
-                self.prev_tick_packet = GameTickPacket()
-                return False # Be on the safe side - On the first tick things are ok.
-            dt = game_tick_packet.game_info.seconds_elapsed - self.prev_tick_packet.game_info.seconds_elapsed
-            if dt == 0:
-                return False
-            ball_dist = obj_distance(game_tick_packet.game_ball, self.prev_tick_packet.game_ball)
-            ball_speed = ball_dist / dt
-            # TODO: detect it on other things as well. e.g. cars, gametime.
-            return ball_speed > self.MAX_PLAUSIBLE_BALL_SPEED
-
-    @contextmanager
-    def _update_prev_on_return(self, game_tick_packet: GameTickPacket):
-        yield  # body of `with` statement
-        ctypes.pointer(self.prev_tick_packet)[0] = game_tick_packet  # make a copy with memcpy
+        self.history.record(PacketArrays(game_tick_packet))
+        if len(self.history) < 2:
+            return False # Be on the safe side - On the first tick things are ok.
+        prev_seconds_elapsed = self.history.game_info(2)[0]['seconds_elapsed'].item()
+        dt = game_tick_packet.game_info.seconds_elapsed - prev_seconds_elapsed
+        if dt == 0:
+            return False
+        prev_x, prev_y, prev_z = self.history.ball(2)[0]['physics']['location'].tolist()
+        ball = game_tick_packet.game_ball.physics.location
+        ball_dist = sqrt((ball.x - prev_x)**2 + (ball.y - prev_y)**2 + (ball.z - prev_z)**2)
+        ball_speed = ball_dist / dt
+        # TODO: detect it on other things as well. e.g. cars, gametime.
+        return ball_speed > self.MAX_PLAUSIBLE_BALL_SPEED
 
 
 class LineGoalie(BaseAgent):
@@ -8,14 +8,21 @@ from contextlib import contextmanager
 from enum import Enum
 
 from rlbot.setup_manager import SetupManager, setup_manager_context
-from rlbot.training.training import run_exercises as rlbot_run_exercises
 from rlbot.utils.class_importer import load_external_module
 from rlbot.utils.logging_utils import get_logger
 from rlbot.utils.rendering.rendering_manager import DummyRenderer
 
+from rlbottraining.backends.simulation_backend import RLBotBackend, SimulationBackend
+from rlbottraining.grading.grader_profiler import GraderProfiler
+from rlbottraining.grading.tick_history import TickHistory
 from rlbottraining.training_exercise import TrainingExercise, Playlist
 from rlbottraining.training_exercise_adapter import TrainingExerciseAdapter
-from rlbottraining.history.exercise_result import ExerciseResult, ReproductionInfo, log_result, store_result
+from rlbottraining.hot_swap import hot_swap
+from rlbottraining.history.exercise_result import ExerciseResult, ReproductionInfo, StorageMode, log_result, store_result
+from rlbottraining.paths import HistoryPaths
+from rlbottraining.prefetch import game_state_prefetcher
+from rlbottraining.replay.tick_capture import TickRecorder, CAPTURE_FILE_SUFFIX
+from rlbottraining.source_watcher import SourceChangeWatcher
 
 LOGGER_ID = 'training'
 
@@ -34,23 +41,44 @@ def apply_render_policy(render_policy: RenderPolicy, setup_manager: SetupManager
 
 
 def run_playlist(playlist: Playlist, seed: int = 4, setup_manager: Optional[SetupManager]=None,
-    render_policy=RenderPolicy.DEFAULT) -> Iterator[ExerciseResult]:
+    render_policy=RenderPolicy.DEFAULT, backend: Optional[SimulationBackend]=None,
+    profile_graders=False, prefetch_depth: int = 0) -> Iterator[ExerciseResult]:
     """
     This function runs the given exercises in the playlist once and returns the result for each.
+    The exercises are run in Rocket League unless a different backend is given.
+    If profile_graders is set, each result has the timings of its graders. See grader_profiler.py
+    If prefetch_depth is set, the game states of that many upcoming exercises are made in the background. See prefetch.py
     """
+    with backend_or_rlbot(backend, setup_manager, render_policy) as backend:
+        tick_history = TickHistory()  # Shared, as the exercises run one after another.
+        wrapped_exercises = [
+            TrainingExerciseAdapter(ex, grader_profiler=GraderProfiler() if profile_graders else None, tick_history=tick_history)
+            for ex in playlist
+        ]
+
+        with game_state_prefetcher(wrapped_exercises, seed, prefetch_depth):
+            for i, rlbot_result in enumerate(backend.run_exercises(wrapped_exercises, seed)):
+                yield ExerciseResult(
+                    grade=rlbot_result.grade,
+                    exercise=rlbot_result.exercise.exercise,  # unwrap the TrainingExerciseAdapter.
+                    reproduction_info=ReproductionInfo(
+                        seed=seed,
+                        playlist_index=i,
+                    ),
+                    grader_profile=rlbot_result.exercise.finish_grader_profile(),
+                )
+
+@contextmanager
+def backend_or_rlbot(backend: Optional[SimulationBackend], setup_manager: Optional[SetupManager], render_policy: RenderPolicy) -> Iterator[SimulationBackend]:
+    """
+    Provides the given backend, or an RLBotBackend which runs the exercises in Rocket League if there is none.
+    """
+    if backend:
+        yield backend
+        return
     with use_or_create(setup_manager, setup_manager_context) as setup_manager:
         apply_render_policy(render_policy, setup_manager)
-        wrapped_exercises = [TrainingExerciseAdapter(ex) for ex in playlist]
-
-        for i, rlbot_result in enumerate(rlbot_run_exercises(setup_manager, wrapped_exercises, seed)):
-            yield ExerciseResult(
-                grade=rlbot_result.grade,
-                exercise=rlbot_result.exercise.exercise,  # unwrap the TrainingExerciseAdapter.
-                reproduction_info=ReproductionInfo(
-                    seed=seed,
-                    playlist_index=i,
-                )
-            )
+        yield RLBotBackend(setup_manager)
 
 @contextmanager
 def use_or_create(existing_context, default_contextmanager):
@@ -60,19 +88,39 @@ def use_or_create(existing_context, default_contextmanager):
     with default_contextmanager() as context:
         yield context
 
-class ReloadPolicy:
-    NEVER = 1
-    EACH_EXERCISE = 2
-    # TODO: on .py file change in (sub-) directory
+class ReloadPolicy(Enum):
+    NEVER = 'never'
+    EACH_EXERCISE = 'each_exercise'
+    ON_FILE_CHANGE = 'on_file_change'  # When a .py file in the directory of the module (or a subdirectory) changes.
+
+@contextmanager
+def source_watcher_for(reload_policy: ReloadPolicy, python_file_with_playlist: Path) -> Iterator[Optional[SourceChangeWatcher]]:
+    """
+    Provides a SourceChangeWatcher for the directory of the module if the reload_policy needs one, None otherwise.
+    """
+    if reload_policy != ReloadPolicy.ON_FILE_CHANGE:
+        yield None
+        return
+    with SourceChangeWatcher(Path(python_file_with_playlist).absolute().parent) as watcher:
+        yield watcher
 
 def run_module(python_file_with_playlist: Path, history_dir: Optional[Path] = None,
-    reload_policy=ReloadPolicy.EACH_EXERCISE, render_policy=RenderPolicy.DEFAULT):
+    reload_policy=ReloadPolicy.EACH_EXERCISE, render_policy=RenderPolicy.DEFAULT, record_ticks=False,
+    backend: Optional[SimulationBackend]=None, storage_mode=StorageMode.JSON_FILES, profile_graders=False,
+    prefetch_depth: int = 0):
     """
     This function repeatedly runs exercises in the module and reloads the module and the agent to pick up
     any new changes. e.g. make_game_state() can be updated or
     you could implement a new Grader without needing to terminate the training.
     If the reload_policy is set to ReloadPolicy.NEVER, exercise and the agent will stop reloading on each exercise.
+    With ReloadPolicy.ON_FILE_CHANGE, the module is only reloaded after one of the .py files next to it changed,
+    which avoids the cost of re-running make_default_playlist() when there is nothing new.
+    If record_ticks is set, every tick of each exercise is saved next to its result in the history_dir.
+    If profile_graders is set, each result has the timings of its graders. See grader_profiler.py
+    If prefetch_depth is set, the game states of that many upcoming exercises are made in the background. See prefetch.py
+    The storage_mode decides how results are written to the history_dir.
     """
+    assert history_dir or not record_ticks, 'record_ticks requires a history_dir to save the ticks to.'
 
     # load the playlist initially, keep trying if we fail
     playlist_factory = None
@@ -85,45 +133,76 @@ def run_module(python_file_with_playlist: Path, history_dir: Optional[Path] = No
             traceback.print_exc()
             time.sleep(1.0)
 
+    # The definitions which the running exercises were made from. These are never run, unlike the playlist.
+    reference_playlist = playlist
     log = get_logger(LOGGER_ID)
-    with setup_manager_context() as setup_manager:
-        apply_render_policy(render_policy, setup_manager)
+    tick_history = TickHistory()  # Shared by all exercises, as they run one after another.
+    with source_watcher_for(reload_policy, python_file_with_playlist) as watcher, \
+            backend_or_rlbot(backend, None, render_policy) as backend:
         for seed in infinite_seed_generator():
             playlist = playlist_factory()
-            wrapped_exercises = [TrainingExerciseAdapter(ex) for ex in playlist]
-            reload_agent = reload_policy != ReloadPolicy.NEVER
-            result_iter = rlbot_run_exercises(setup_manager, wrapped_exercises, seed, reload_agent=reload_agent)
-
-            for i, rlbot_result in enumerate(result_iter):
-                result = ExerciseResult(
-                    grade=rlbot_result.grade,
-                    exercise=rlbot_result.exercise.exercise,  # unwrap the TrainingExerciseAdapter.
-                    reproduction_info=ReproductionInfo(
-                        seed=seed,
-                        python_file_with_playlist=str(python_file_with_playlist.absolute()),
-                        playlist_index=i,
-                    )
+            wrapped_exercises = [
+                TrainingExerciseAdapter(
+                    ex,
+                    tick_recorder=make_tick_recorder(history_dir) if record_ticks else None,
+                    grader_profiler=GraderProfiler() if profile_graders else None,
+                    tick_history=tick_history,
                 )
+                for ex in playlist
+            ]
+            with game_state_prefetcher(wrapped_exercises, seed, prefetch_depth) as prefetcher:
+                reload_agent = reload_policy != ReloadPolicy.NEVER
+                result_iter = backend.run_exercises(wrapped_exercises, seed, reload_agent=reload_agent)
+
+                for i, rlbot_result in enumerate(result_iter):
+                    result = ExerciseResult(
+                        grade=rlbot_result.grade,
+                        exercise=rlbot_result.exercise.exercise,  # unwrap the TrainingExerciseAdapter.
+                        reproduction_info=ReproductionInfo(
+                            seed=seed,
+                            python_file_with_playlist=str(python_file_with_playlist.absolute()),
+                            playlist_index=i,
+                        ),
+                        grader_profile=rlbot_result.exercise.finish_grader_profile(),
+                    )
 
-                log_result(result, log)
-                if history_dir:
-                    store_result(result, history_dir)
-
-                # Reload the module and apply the new exercises
-                if reload_policy == ReloadPolicy.EACH_EXERCISE:
-                    try:
-                        new_playlist_factory = load_default_playlist(python_file_with_playlist)
-                        new_playlist = new_playlist_factory()
-                    except Exception:
-                        traceback.print_exc()
-                        continue  # keep running previous exercises until new ones are fixed.
-                    playlist_factory = new_playlist_factory
-                    if len(new_playlist) != len(playlist) or any(e1.name != e2.name for e1,e2 in zip(new_playlist, playlist)):
-                        log.warning(f'Need to restart to pick up new exercises.')
-                        playlist = new_playlist
-                        break  # different set of exercises. Can't monkeypatch.
-                    for new_exercise, old_exercise in zip(new_playlist, playlist):
-                        _monkeypatch_copy(new_exercise, old_exercise)
+                    log_result(result, log)
+                    if history_dir:
+                        store_result(result, history_dir, storage_mode)
+                        tick_recorder = rlbot_result.exercise.tick_recorder
+                        if tick_recorder:
+                            tick_recorder.save(tick_capture_path(history_dir, result.run_id))
+
+                    # Reload the module and apply the new exercises
+                    if reload_policy == ReloadPolicy.EACH_EXERCISE or (watcher and watcher.take_changes()):
+                        try:
+                            new_playlist_factory = load_default_playlist(python_file_with_playlist)
+                            new_playlist = new_playlist_factory()
+                        except Exception:
+                            traceback.print_exc()
+                            continue  # keep running previous exercises until new ones are fixed.
+                        playlist_factory = new_playlist_factory
+                        if len(new_playlist) != len(playlist) or any(e1.name != e2.name for e1,e2 in zip(new_playlist, playlist)):
+                            log.warning(f'Need to restart to pick up new exercises.')
+                            reference_playlist = new_playlist
+                            break  # different set of exercises. Can't monkeypatch.
+                        any_swapped = False
+                        for new_exercise, reference_exercise, old_exercise in zip(new_playlist, reference_playlist, playlist):
+                            swapped = hot_swap(new_exercise, old_exercise, reference_exercise)
+                            if swapped:
+                                any_swapped = True
+                                log.info(f'{old_exercise.name}: hot swapped {", ".join(swapped)}')
+                                if prefetcher:
+                                    prefetcher.invalidate(old_exercise)
+                        # The running exercises share the swapped objects (e.g. graders) with new_playlist now.
+                        reference_playlist = new_playlist_factory() if any_swapped else new_playlist
+
+
+def make_tick_recorder(history_dir: Path) -> TickRecorder:
+    return TickRecorder(Path(history_dir) / HistoryPaths.tick_captures)
+
+def tick_capture_path(history_dir: Path, run_id: str) -> Path:
+    return Path(history_dir) / HistoryPaths.tick_captures / (run_id + CAPTURE_FILE_SUFFIX)
 
 
 def infinite_seed_generator():
@@ -137,17 +216,3 @@ def load_default_playlist(python_file_with_playlist: Path) -> Callable[[], Playl
     assert hasattr(module, 'make_default_playlist'), f'module "{python_file_with_playlist}" must provide a make_default_playlist() function to be able to used in run_module().'
     assert callable(module.make_default_playlist), 'make_default_playlist must be a function that returns TrainingExercise\'s'
     return module.make_default_playlist
-
-def _monkeypatch_copy(source, destination):
-    """
-    Mutates the destination object to behave like the source object.
-    """
-    for attr_name in dir(destination):
-        if not hasattr(source, attr_name):
-            delattr(destination, attr_name)
-    for attr_name in dir(source):
-        attr = getattr(source, attr_name)
-        try:
-            setattr(destination, attr_name, attr)
-        except AttributeError:
-            continue  # ignore non-writable attributes like __weakref__.
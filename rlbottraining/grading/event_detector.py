@@ -1,14 +1,19 @@
-import ctypes
 from collections import namedtuple
 from enum import Enum
-from typing import List
+from typing import List, Optional, Tuple
 
-from rlbot.utils.structures.game_data_struct import GameTickPacket
+import numpy as np
+
+from rlbot.utils.structures.game_data_struct import GameTickPacket, ScoreInfo
+
+from rlbottraining.grading.packet_arrays import car_flag_names, car_score_matrix
+from rlbottraining.grading.tick_history import TickHistory
 
 PlayerEvent = namedtuple('Event', 'type player seconds_elapsed')
 
 
 class PlayerEventType(Enum):
+    # A ScoreInfo counter of the player changed.
     SCORE = 1
     GOALS = 2
     OWN_GOALS = 3
@@ -16,6 +21,14 @@ class PlayerEventType(Enum):
     SAVES = 5
     SHOTS = 6
     DEMOLITIONS = 7
+    # Changes to the state of the player's car, see detect_car_and_ball_events().
+    BALL_TOUCH = 8
+    WHEEL_CONTACT_GAINED = 9
+    WHEEL_CONTACT_LOST = 10
+    JUMP = 11
+    DOUBLE_JUMP = 12
+    BOOST_PICKUP = 13
+    DEMOLISHED = 14
 
 
 class PlayerEventDetector:
@@ -23,40 +36,119 @@ class PlayerEventDetector:
     Makes a queue of dicrete things which change between on_tick() calls.
     """
 
-    def __init__(self):
-        self.prev_tick_packet = None
+    def __init__(self, history: TickHistory = None):
+        """
+        :param history: A history which the owner records each game_tick_packet into before calling detect_events().
+            If not given, the detector keeps a copy of just the scores of the previous tick,
+            which only allows detect_events().
+        """
+        assert history is None or history.capacity >= 2
+        self.history = history
+        self._previous_scores: Optional[np.ndarray] = None
+        self._viewed_packet: Optional[GameTickPacket] = None
+        self._scores_view: Optional[np.ndarray] = None  # car_score_matrix() of _viewed_packet.
 
     def detect_events(self, game_tick_packet) -> List[PlayerEvent]:
         """
         Detects any PlayerEvents which happened since the last call.
         """
-        events = []
-        if not self.prev_tick_packet:
-            self.prev_tick_packet = GameTickPacket()
-        else:  # compate to prev_tick_packet
-            seconds_elapsed = game_tick_packet.game_info.seconds_elapsed
-            for i, player, prev_player in zip(
-                    range(game_tick_packet.num_cars),
-                    game_tick_packet.game_cars,
-                    self.prev_tick_packet.game_cars
-            ):
-                score = player.score_info
-                prev_score = prev_player.score_info
-                if score.score != prev_score.score:
-                    events.append(PlayerEvent(PlayerEventType.SCORE, player, seconds_elapsed))
-                if score.goals != prev_score.goals:
-                    events.append(PlayerEvent(PlayerEventType.GOALS, player, seconds_elapsed))
-                if score.own_goals != prev_score.own_goals:
-                    events.append(PlayerEvent(PlayerEventType.OWN_GOALS, player, seconds_elapsed))
-                if score.assists != prev_score.assists:
-                    events.append(PlayerEvent(PlayerEventType.ASSISTS, player, seconds_elapsed))
-                if score.saves != prev_score.saves:
-                    events.append(PlayerEvent(PlayerEventType.SAVES, player, seconds_elapsed))
-                if score.shots != prev_score.shots:
-                    events.append(PlayerEvent(PlayerEventType.SHOTS, player, seconds_elapsed))
-                if score.demolitions != prev_score.demolitions:
-                    events.append(PlayerEvent(PlayerEventType.DEMOLITIONS, player, seconds_elapsed))
-
-        ctypes.pointer(self.prev_tick_packet)[0] = game_tick_packet  # memcpy
+        if self.history is None:
+            changed = self._compare_to_previous_scores(game_tick_packet)
+        else:
+            changed = self._compare_to_history(game_tick_packet)
+        if changed is None:
+            return []
+        seconds_elapsed = game_tick_packet.game_info.seconds_elapsed
+        # In the order of players, then score fields.
+        return [
+            PlayerEvent(score_event_types[field_index], game_tick_packet.game_cars[player_index], seconds_elapsed)
+            for player_index, field_index in zip(*np.nonzero(changed))
+        ]
+
+    def detect_car_and_ball_events(self, game_tick_packet: GameTickPacket) -> List[PlayerEvent]:
+        """
+        Detects which cars touched the ball, gained or lost wheel contact, jumped, double jumped,
+        picked up boost (their boost increased without them being demolished) or got demolished since the previous tick.
+        Requires the history.
+        """
+        if self.history.num_recorded < 2:
+            return []
+        num_cars = game_tick_packet.num_cars
+        touch_keys = self.history.latest_touch_keys(2).tolist()
+        touched = touch_keys[0] != touch_keys[1]
+        state_words = self.history.car_state_words(2)[:, :num_cars]
+        if not touched and not np.count_nonzero(state_words[0] != state_words[1]):
+            return []
 
+        flags = self.history.car_flags(2)[:, :num_cars]
+        previous_flags, flags = flags[0], flags[1]
+        boosts = self.history.car_boosts(2)[:, :num_cars]
+        flag_changes = previous_flags != flags
+        boost_gains = boosts[1] > boosts[0]
+
+        seconds_elapsed = game_tick_packet.game_info.seconds_elapsed
+        events = []
+        # In the order of players, then flags.
+        for player_index, flag_index in zip(*np.nonzero(flag_changes)):
+            event_type = flag_event_types[flag_index][int(flags[player_index, flag_index] != 0)]
+            if event_type is not None:
+                events.append(PlayerEvent(event_type, game_tick_packet.game_cars[player_index], seconds_elapsed))
+        was_demolished = previous_flags[:, demolished_flag_index] | flags[:, demolished_flag_index]
+        for player_index in np.flatnonzero(boost_gains & (was_demolished == 0)):
+            events.append(PlayerEvent(PlayerEventType.BOOST_PICKUP, game_tick_packet.game_cars[player_index], seconds_elapsed))
+        touch_player = game_tick_packet.game_ball.latest_touch.player_index
+        if touched and 0 <= touch_player < num_cars:
+            events.append(PlayerEvent(PlayerEventType.BALL_TOUCH, game_tick_packet.game_cars[touch_player], seconds_elapsed))
         return events
+
+    def _compare_to_history(self, game_tick_packet: GameTickPacket) -> Optional[np.ndarray]:
+        """ Returns which scores changed per car, or None if nothing changed. """
+        if self.history.num_recorded < 2:
+            return None
+        scores = self.history.car_scores(2)[:, :game_tick_packet.num_cars]
+        changed = scores[0] != scores[1]  # Cheaper than unpacking the rows.
+        return changed if np.count_nonzero(changed) else None  # count_nonzero() is cheaper than any() on small arrays.
+
+    def _compare_to_previous_scores(self, game_tick_packet: GameTickPacket) -> Optional[np.ndarray]:
+        scores = self._view_scores(game_tick_packet)
+        if self._previous_scores is None:
+            self._previous_scores = scores.copy()
+            return None
+        # All car slots are compared, such that the copy is only needed if something changed.
+        changed = self._previous_scores != scores
+        if not np.count_nonzero(changed):
+            return None
+        np.copyto(self._previous_scores, scores)
+        return changed[:game_tick_packet.num_cars]
+
+    def _view_scores(self, game_tick_packet: GameTickPacket) -> np.ndarray:
+        # rlbot reuses the same packet for every tick, so the view usually stays valid.
+        if game_tick_packet is not self._viewed_packet:
+            self._scores_view = car_score_matrix(np.frombuffer(game_tick_packet, dtype=np.uint8))
+            self._viewed_packet = game_tick_packet
+        return self._scores_view
+
+
+# The events that a change in each of the ScoreInfo fields triggers.
+score_event_types = [
+    PlayerEventType.SCORE,
+    PlayerEventType.GOALS,
+    PlayerEventType.OWN_GOALS,
+    PlayerEventType.ASSISTS,
+    PlayerEventType.SAVES,
+    PlayerEventType.SHOTS,
+    PlayerEventType.DEMOLITIONS,
+]
+assert [name for name, *_ in ScoreInfo._fields_] == ['score', 'goals', 'own_goals', 'assists', 'saves', 'shots', 'demolitions']
+
+# The events that a change of each of the car_flag_names to (False, True) triggers.
+flag_event_types: List[Tuple[Optional[PlayerEventType], Optional[PlayerEventType]]] = [
+    (None, PlayerEventType.DEMOLISHED),
+    (PlayerEventType.WHEEL_CONTACT_LOST, PlayerEventType.WHEEL_CONTACT_GAINED),
+    (None, None),
+    (None, None),
+    (None, PlayerEventType.JUMP),
+    (None, PlayerEventType.DOUBLE_JUMP),
+]
+assert car_flag_names == ['is_demolished', 'has_wheel_contact', 'is_super_sonic', 'is_bot', 'jumped', 'double_jumped']
+demolished_flag_index = car_flag_names.index('is_demolished')
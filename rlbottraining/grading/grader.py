@@ -14,6 +14,12 @@ class Grader(Metric):
     Fields of a Grader will be serialized via the Metrics.
     """
 
+    # Hints for CompoundGrader(short_circuit=True), which may skip graders once the grade is decided.
+    # Overriding them as class attributes keeps them out of the serialized fields.
+    evaluation_cost: float = 1.0  # Relative cost of on_tick(). Cheaper graders are evaluated first.
+    priority: int = 0  # Graders with a higher priority are evaluated first, regardless of cost.
+    requires_every_tick: bool = True  # False if on_tick() has no state or side effects which need every tick.
+
     def on_tick(self, tick: TrainingTickPacket) -> Optional[Grade]:
         """ Similar to Exercise.on_tick() but takes a preprocessed data structure. """
         pass  # Continue by default
@@ -0,0 +1,459 @@
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple, Union
+import ast
+import math
+import re
+
+import numpy as np
+
+from rlbot.utils.structures.game_data_struct import GameTickPacket
+
+from rlbottraining.grading.tick_batch import TickBatch
+from rlbottraining.grading.tick_fields import TickField, read_column, tick_fields
+
+"""
+A small condition language for graders, which compiles into one Python function per set of rules.
+
+Each line is either a definition or a rule:
+
+    # Comments start with a hash.
+    speed = sqrt(ball.vx**2 + ball.vy**2 + ball.vz**2)
+    ball.z < 100 for 20 ticks -> Fail: The ball stayed low.
+    speed > 2000 and ball.y > 0 -> Pass
+
+Expressions use Python syntax: arithmetic, comparisons, and/or/not (on conditions) and `a if c else b`.
+Names are either definitions from earlier lines or fields from tick_fields.py (e.g. ball.z, car0.boost, team1.score).
+Functions:
+    abs(x), sqrt(x), min(a, b), max(a, b)
+    previous(x)  The value of x on the previous tick. Rules which use it can not hold on the first tick.
+    initial(x)   The value of x on the first tick.
+    ever(x)      Whether x was true on any tick so far, including this one.
+A rule holds if its condition is true, or with `for N ticks`, if it was true for the last N ticks in a row.
+The first rule which holds (in the order they are written) decides the grade.
+Anything within parentheses may span several lines.
+The message of a rule is the rest of its line, which may contain anything including `#`.
+
+compile_rules() generates two functions from the rules:
+- tick_function(packet, state) is called once per tick. It reads each field once, even if several rules use it.
+- batch_function(packets) evaluates the rules for every tick of an array of packets
+  (with the dtype of packet_arrays.dtype_from_ctypes(GameTickPacket)), e.g. from a tick capture.
+  The ticks are along the last axis, so a (runs, ticks) array or a TickBatch evaluates many runs at once.
+They agree with each other, except that division by zero raises in the former and gives inf/nan in the latter.
+"""
+
+
+class Rule(NamedTuple):
+    text: str
+    condition: str
+    ticks: int  # How many ticks in a row the condition has to be true.
+    outcome: str  # 'Pass' or 'Fail'
+    message: Optional[str]
+
+
+class _Code(NamedTuple):
+    scalar: str  # Python source operating on floats.
+    vector: str  # Python source operating on numpy arrays with one value per tick.
+    uses_previous: bool  # Undefined on the first tick.
+    stateful: bool  # Uses previous(), initial() or ever().
+
+
+class _Slot:
+    """ The value of the argument of previous()/initial()/ever() which has to be remembered between ticks. """
+
+    def __init__(self, index: int, code: _Code):
+        self.index = index
+        self.code = code
+        self.needs_previous = False
+        self.needs_initial = False
+        self.needs_ever = False
+
+
+_outcomes = ('Pass', 'Fail')
+_rule_pattern = re.compile(r'^(?P<condition>.*?)(\s+for\s+(?P<ticks>\d+)\s+ticks?)?\s*->\s*(?P<outcome>\w+)\s*(:\s*(?P<message>.*?))?\s*$', re.DOTALL)
+_definition_pattern = re.compile(r'^(?P<name>[A-Za-z_]\w*)\s*=(?!=)\s*(?P<expression>.*)$', re.DOTALL)
+
+# name -> (scalar, vector, number of arguments)
+_stateful_functions = ('previous', 'initial', 'ever')
+_functions = {
+    'abs': ('abs', 'np.abs', 1),
+    'sqrt': ('sqrt', 'np.sqrt', 1),
+    'min': ('min', 'np.minimum', 2),
+    'max': ('max', 'np.maximum', 2),
+}
+_binary_operators = {ast.Add: '+', ast.Sub: '-', ast.Mult: '*', ast.Div: '/', ast.Pow: '**', ast.Mod: '%'}
+_comparison_operators = {ast.Lt: '<', ast.LtE: '<=', ast.Gt: '>', ast.GtE: '>=', ast.Eq: '==', ast.NotEq: '!='}
+
+
+class CompiledRules:
+    """
+    The generated functions for a set of rules. Use compile_rules() to get one.
+    """
+
+    def __init__(self, text: str):
+        self.text = text
+        self.rules: List[Rule] = []
+        self._fields: Dict[str, TickField] = {}
+        self._definitions: Dict[str, _Code] = {}
+        self._definition_order: List[str] = []
+        self._slots: Dict[str, _Slot] = {}
+        self._conditions: List[_Code] = []
+        self.field_names: List[str] = []  # The tick_fields which the rules read.
+
+        for statement in _split_statements(text):
+            self._add_statement(statement)
+        if not self.rules:
+            raise ValueError(f'There needs to be at least one rule in: {text}')
+        self.field_names = list(self._fields)
+
+        self._state_names = ['first'] + [
+            name
+            for slot in self._slots.values()
+            for name, needed in [
+                (f'p{slot.index}', slot.needs_previous),
+                (f'i{slot.index}', slot.needs_initial),
+                (f'e{slot.index}', slot.needs_ever),
+            ]
+            if needed
+        ] + [f'c{i}' for i, rule in enumerate(self.rules) if rule.ticks > 1]
+        # initial() alone does not: the first tick is only skipped when grading ends with a Fail right away.
+        self.needs_every_tick = any(slot.needs_previous or slot.needs_ever for slot in self._slots.values()) or \
+            any(rule.ticks > 1 for rule in self.rules)
+
+        namespace = {'np': np, 'sqrt': math.sqrt, 'column': _column, 'per_tick': _per_tick, 'first_ticks': _first_ticks,
+            'previous_values': _previous_values, 'run_lengths': _run_lengths, 'first_rules': _first_rules}
+        self.tick_source = self._generate_tick_function()
+        self.batch_source = self._generate_batch_function()
+        exec(compile(self.tick_source, '<grader_dsl tick_function>', 'exec'), namespace)
+        exec(compile(self.batch_source, '<grader_dsl batch_function>', 'exec'), namespace)
+        # Returns the index of the first rule which holds, if any.
+        self.tick_function: Callable[[GameTickPacket, list], Optional[int]] = namespace['tick_function']
+        self.batch_function: Callable[[Union[np.ndarray, TickBatch]], np.ndarray] = namespace['batch_function']
+
+    def make_state(self) -> list:
+        """ The state which the tick_function expects on the first tick. It is updated in place. """
+        return [True] + [0] * (len(self._state_names) - 1)
+
+    def evaluate_batch(self, packets: Union[np.ndarray, TickBatch]) -> np.ndarray:
+        """
+        Returns the index of the first rule which holds for each of the packets (-1 if none),
+        as if the packets along the last axis were passed to the tick_function one after another.
+        """
+        with np.errstate(all='ignore'):
+            return self.batch_function(packets)
+
+    def _add_statement(self, statement: str):
+        if '->' in statement:
+            match = _rule_pattern.match(statement)
+            if not match or match.group('outcome') not in _outcomes:
+                raise ValueError(f'Expected "<condition> [for <N> ticks] -> Pass|Fail [: <message>]" but got: {statement}')
+            ticks = int(match.group('ticks') or 1)
+            if ticks < 1:
+                raise ValueError(f'A condition needs to hold for at least one tick: {statement}')
+            self._conditions.append(self._compile_expression(match.group('condition'), statement))
+            self.rules.append(Rule(statement, match.group('condition').strip(), ticks, match.group('outcome'), match.group('message')))
+            return
+        match = _definition_pattern.match(statement)
+        if not match:
+            raise ValueError(f'Expected a rule or a definition like "<name> = <expression>" but got: {statement}')
+        name = match.group('name')
+        if name in self._definitions or name in tick_fields or name in _functions or name in _stateful_functions:
+            raise ValueError(f'{name} is already defined: {statement}')
+        self._definitions[name] = self._compile_expression(match.group('expression'), statement)
+        self._definition_order.append(name)
+
+    def _compile_expression(self, source: str, statement: str) -> _Code:
+        try:
+            tree = ast.parse(source.strip(), mode='eval')
+        except SyntaxError as e:
+            raise ValueError(f'Invalid expression in: {statement}') from e
+        return self._compile_node(tree.body, statement)
+
+    def _compile_node(self, node: ast.AST, statement: str) -> _Code:
+        compile_node = lambda child: self._compile_node(child, statement)
+
+        if isinstance(node, (ast.Num, ast.NameConstant, ast.Constant)):  # ast.Constant since python 3.8
+            value = node.n if isinstance(node, ast.Num) else node.value
+            if not isinstance(value, (int, float)):
+                raise ValueError(f'Unsupported constant {value!r} in: {statement}')
+            return _Code(repr(value), repr(value), False, False)
+
+        if isinstance(node, (ast.Name, ast.Attribute)):
+            name = _dotted_name(node)
+            if name in self._definitions:
+                definition = self._definitions[name]
+                return _Code(f'd_{name}', f'd_{name}', definition.uses_previous, definition.stateful)
+            if name in tick_fields:
+                self._fields[name] = tick_fields[name]
+                variable = _field_variable(name)
+                return _Code(variable, variable, False, False)
+            raise ValueError(f'Unknown name {name} in: {statement}')
+
+        if isinstance(node, ast.BinOp) and type(node.op) in _binary_operators:
+            left, right = compile_node(node.left), compile_node(node.right)
+            operator = _binary_operators[type(node.op)]
+            return _combine(f'({left.scalar} {operator} {right.scalar})', f'({left.vector} {operator} {right.vector})', left, right)
+
+        if isinstance(node, ast.UnaryOp):
+            operand = compile_node(node.operand)
+            if isinstance(node.op, ast.USub):
+                return _combine(f'(-{operand.scalar})', f'(-{operand.vector})', operand)
+            if isinstance(node.op, ast.UAdd):
+                return operand
+            if isinstance(node.op, ast.Not):
+                return _combine(f'(not {operand.scalar})', f'np.logical_not({operand.vector})', operand)
+
+        if isinstance(node, ast.BoolOp):
+            operands = [compile_node(value) for value in node.values]
+            scalar_operator, vector_function = (' and ', 'np.logical_and') if isinstance(node.op, ast.And) else (' or ', 'np.logical_or')
+            vector = operands[0].vector
+            for operand in operands[1:]:
+                vector = f'{vector_function}({vector}, {operand.vector})'
+            return _combine('(' + scalar_operator.join(operand.scalar for operand in operands) + ')', vector, *operands)
+
+        if isinstance(node, ast.Compare) and all(type(op) in _comparison_operators for op in node.ops):
+            operands = [compile_node(node.left)] + [compile_node(comparator) for comparator in node.comparators]
+            operators = [_comparison_operators[type(op)] for op in node.ops]
+            scalar = operands[0].scalar + ''.join(f' {operator} {operand.scalar}' for operator, operand in zip(operators, operands[1:]))
+            comparisons = [
+                f'({left.vector} {operator} {right.vector})'
+                for left, operator, right in zip(operands, operators, operands[1:])
+            ]
+            vector = comparisons[0]
+            for comparison in comparisons[1:]:
+                vector = f'np.logical_and({vector}, {comparison})'
+            return _combine(f'({scalar})', vector, *operands)
+
+        if isinstance(node, ast.IfExp):
+            test, body, orelse = compile_node(node.test), compile_node(node.body), compile_node(node.orelse)
+            return _combine(
+                f'({body.scalar} if {test.scalar} else {orelse.scalar})',
+                f'np.where({test.vector}, {body.vector}, {orelse.vector})',
+                test, body, orelse
+            )
+
+        if isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and not node.keywords:
+            function_name = node.func.id
+            if function_name in _stateful_functions:
+                return self._compile_stateful_call(function_name, node.args, statement)
+            if function_name in _functions:
+                scalar_function, vector_function, num_args = _functions[function_name]
+                if len(node.args) != num_args:
+                    raise ValueError(f'{function_name}() takes {num_args} argument(s) in: {statement}')
+                args = [compile_node(arg) for arg in node.args]
+                return _combine(
+                    f'{scalar_function}({", ".join(arg.scalar for arg in args)})',
+                    f'{vector_function}({", ".join(arg.vector for arg in args)})',
+                    *args
+                )
+
+        raise ValueError(f'Unsupported expression {ast.dump(node)} in: {statement}')
+
+    def _compile_stateful_call(self, function_name: str, args: List[ast.AST], statement: str) -> _Code:
+        if len(args) != 1:
+            raise ValueError(f'{function_name}() takes 1 argument in: {statement}')
+        arg = self._compile_node(args[0], statement)
+        if arg.stateful:
+            raise ValueError(f'previous(), initial() and ever() can not be nested in: {statement}')
+        key = ast.dump(args[0])
+        if key not in self._slots:
+            self._slots[key] = _Slot(len(self._slots), arg)
+        slot = self._slots[key]
+        if function_name == 'previous':
+            slot.needs_previous = True
+            return _Code(f'p{slot.index}', f'p{slot.index}', True, True)
+        if function_name == 'ever':
+            slot.needs_ever = True
+            return _Code(f'e{slot.index}', f'e{slot.index}', False, True)
+        slot.needs_initial = True
+        return _Code(f'i{slot.index}', f'i{slot.index}', False, True)
+
+    def _generate_tick_function(self) -> str:
+        lines = [
+            'def tick_function(packet, state):',
+            f'    {", ".join(self._state_names)}, = state',
+        ]
+        lines += [f'    {line}' for line in _shared_field_reads(self._fields)]
+        lines += [f'    d_{name} = {self._definitions[name].scalar}' for name in self._definition_order if not self._definitions[name].stateful]
+        for slot in self._slots.values():
+            lines.append(f'    v{slot.index} = {slot.code.scalar}')
+        if any(slot.needs_previous or slot.needs_initial for slot in self._slots.values()):
+            lines.append('    if first:')
+            for slot in self._slots.values():
+                if slot.needs_previous:
+                    lines.append(f'        p{slot.index} = v{slot.index}')
+                if slot.needs_initial:
+                    lines.append(f'        i{slot.index} = v{slot.index}')
+        for slot in self._slots.values():
+            if slot.needs_ever:
+                lines.append(f'    e{slot.index} = e{slot.index} or bool(v{slot.index})')
+        lines += [f'    d_{name} = {self._definitions[name].scalar}' for name in self._definition_order if self._definitions[name].stateful]
+
+        conditions = [
+            f'((not first) and {condition.scalar})' if condition.uses_previous else condition.scalar
+            for condition in self._conditions
+        ]
+        for i, (rule, condition) in enumerate(zip(self.rules, conditions)):
+            if rule.ticks > 1:
+                lines.append(f'    c{i} = c{i} + 1 if {condition} else 0')
+        lines.append('    fired = None')
+        for i, (rule, condition) in enumerate(zip(self.rules, conditions)):
+            keyword = 'if' if i == 0 else 'elif'
+            lines.append(f'    {keyword} {f"c{i} >= {rule.ticks}" if rule.ticks > 1 else condition}:')
+            lines.append(f'        fired = {i}')
+
+        new_state = ['False'] + [
+            f'v{name[1:]}' if name.startswith('p') else name
+            for name in self._state_names[1:]
+        ]
+        lines.append(f'    state[:] = {", ".join(new_state)},')
+        lines.append('    return fired')
+        return '\n'.join(lines) + '\n'
+
+    def _generate_batch_function(self) -> str:
+        lines = [
+            'def batch_function(packets):',
+            '    shape = packets.shape',
+            '    first = first_ticks(shape)',
+        ]
+        lines += [f'    {_field_variable(name)} = column(packets, {name!r})' for name in self._fields]
+        lines += [f'    d_{name} = {self._definitions[name].vector}' for name in self._definition_order if not self._definitions[name].stateful]
+        for slot in self._slots.values():
+            lines.append(f'    v{slot.index} = per_tick({slot.code.vector}, shape)')
+            if slot.needs_previous:
+                lines.append(f'    p{slot.index} = previous_values(v{slot.index})')
+            if slot.needs_initial:
+                lines.append(f'    i{slot.index} = v{slot.index}[..., :1]')
+            if slot.needs_ever:
+                lines.append(f'    e{slot.index} = np.logical_or.accumulate(v{slot.index}.astype(bool), axis=-1)')
+        lines += [f'    d_{name} = {self._definitions[name].vector}' for name in self._definition_order if self._definitions[name].stateful]
+
+        masks = []
+        for i, (rule, condition) in enumerate(zip(self.rules, self._conditions)):
+            mask = f'per_tick({condition.vector}, shape)'
+            if condition.uses_previous:
+                mask = f'np.logical_and(np.logical_not(first), {mask})'
+            if rule.ticks > 1:
+                mask = f'(run_lengths({mask}) >= {rule.ticks})'
+            masks.append(mask)
+        lines.append(f'    return first_rules([{", ".join(masks)}], shape)')
+        return '\n'.join(lines) + '\n'
+
+
+def _combine(scalar: str, vector: str, *operands: _Code) -> _Code:
+    return _Code(
+        scalar,
+        vector,
+        any(operand.uses_previous for operand in operands),
+        any(operand.stateful for operand in operands),
+    )
+
+def _dotted_name(node: ast.AST) -> str:
+    if isinstance(node, ast.Name):
+        return node.id
+    if isinstance(node, ast.Attribute):
+        return f'{_dotted_name(node.value)}.{node.attr}'
+    raise ValueError(f'Unsupported name {ast.dump(node)}')
+
+def _field_variable(name: str) -> str:
+    return 'f_' + name.replace('.', '_')
+
+def _shared_field_reads(fields: Dict[str, TickField]) -> List[str]:
+    """
+    Assigns each field to a local variable.
+    Objects which several fields are read from (e.g. packet.game_ball.physics.location) are looked up once.
+    """
+    paths = {name: tuple(field.expression.split('.')) for name, field in fields.items()}
+    children: Dict[Tuple[str, ...], set] = {}
+    for path in paths.values():
+        for length in range(1, len(path)):
+            children.setdefault(path[:length], set()).add(path[length])
+    shared = sorted(
+        (prefix for prefix, prefix_children in children.items() if len(prefix_children) > 1 and len(prefix) > 1),
+        key=len
+    )
+    variables = {('packet',): 'packet'}
+    lines = []
+
+    def read(path: Tuple[str, ...]) -> str:
+        for length in range(len(path) - 1, 0, -1):
+            if path[:length] in variables:
+                return '.'.join((variables[path[:length]],) + path[length:])
+        raise AssertionError(f'{path} is not read from the packet.')
+
+    for i, prefix in enumerate(shared):
+        variables[prefix] = f'o{i}'
+        lines.append(f'o{i} = {read(prefix)}')
+    for name, path in paths.items():
+        lines.append(f'{_field_variable(name)} = {read(path)}')
+    return lines
+
+def _split_statements(text: str) -> List[str]:
+    """
+    Splits the text into lines, joining the lines which are within parentheses.
+    Comments and parentheses only count before the `->` of a rule, as its message is free text.
+    """
+    statements = []
+    current = ''
+    depth = 0
+    for line in text.splitlines():
+        code, arrow, outcome = line.partition('->')
+        code, comment_start, _ = code.partition('#')
+        if comment_start:
+            arrow = outcome = ''
+        line = code + arrow + outcome
+        if not line.strip() and depth == 0:
+            continue
+        current = f'{current} {line.strip()}' if current else line.strip()
+        depth += code.count('(') + code.count('[') - code.count(')') - code.count(']')
+        if depth == 0:
+            statements.append(current)
+            current = ''
+    if current:
+        raise ValueError(f'Unbalanced parentheses in: {current}')
+    return statements
+
+
+def _column(packets: Union[np.ndarray, TickBatch], name: str) -> np.ndarray:
+    if isinstance(packets, TickBatch):
+        return packets.column(name)
+    # As python numbers would be, such that the results match the tick_function.
+    column = read_column(packets, tick_fields[name])
+    if column.dtype.kind == 'f':
+        return column.astype(np.float64)
+    if column.dtype.kind in 'iu':
+        return column.astype(np.int64)
+    return column
+
+def _per_tick(values, shape: Tuple[int, ...]) -> np.ndarray:
+    """ Constants become arrays too. """
+    return np.broadcast_to(np.asarray(values), shape)
+
+def _first_ticks(shape: Tuple[int, ...]) -> np.ndarray:
+    return np.broadcast_to(np.arange(shape[-1]) == 0, shape)
+
+def _previous_values(values: np.ndarray) -> np.ndarray:
+    """ Shifted by one tick. The first tick has itself as its previous value, like the tick_function. """
+    return np.concatenate([values[..., :1], values[..., :-1]], axis=-1)
+
+def _run_lengths(condition: np.ndarray) -> np.ndarray:
+    """ For each tick, how many ticks in a row up to and including it the condition was true. """
+    condition = condition.astype(bool)
+    counts = np.cumsum(condition, axis=-1)
+    return counts - np.maximum.accumulate(np.where(condition, 0, counts), axis=-1)
+
+def _first_rules(masks: List[np.ndarray], shape: Tuple[int, ...]) -> np.ndarray:
+    fired = np.full(shape, -1)
+    for i, mask in reversed(list(enumerate(masks))):
+        fired[mask] = i
+    return fired
+
+
+_compiled_rules: Dict[str, CompiledRules] = {}
+
+def compile_rules(text: str) -> CompiledRules:
+    """
+    Parses the rules (see the top of this file) and generates their functions.
+    Raises a ValueError if they are invalid. Compiled rules are cached by their text.
+    """
+    if text not in _compiled_rules:
+        _compiled_rules[text] = CompiledRules(text)
+    return _compiled_rules[text]
@@ -0,0 +1,149 @@
+from array import array
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Tuple
+import math
+import sys
+import time
+import types
+
+from rlbottraining.grading.grader import Grader
+from rlbottraining.history.metric import Metric
+
+"""
+Opt-in instrumentation which measures how much of each tick every grader in an exercise takes.
+At 120 ticks per second, a slow grader deep within a CompoundGrader steals frame time from the bot.
+
+The profiler replaces methods with timed versions on the instances (not the classes),
+so only the profiled exercise is affected. finish() restores them and returns the stats.
+"""
+
+# The methods of Graders which are called every tick.
+profiled_grader_methods = ('on_tick', 'render')
+
+
+@dataclass
+class CallStats(Metric):
+    """
+    Statistics about the calls to one method of one object.
+    The latencies include the time spent in nested graders.
+    allocated_blocks is the number of memory blocks the calls left allocated (allocations minus frees),
+    as counted by sys.getallocatedblocks(). Steady growth means garbage or retained state per tick.
+    """
+    name: str  # Where the method is, e.g. 'grader.graders[1].on_tick'
+    class_name: str
+    num_calls: int
+    p50_us: float
+    p99_us: float
+    max_us: float
+    total_ms: float
+    allocated_blocks: int
+
+
+@dataclass
+class GraderProfile(Metric):
+    calls: List[CallStats] = field(default_factory=list)  # In the order of the grader tree.
+
+
+class _Samples:
+    def __init__(self, name: str, class_name: str):
+        self.name = name
+        self.class_name = class_name
+        self.durations_ns = array('q')  # Unlike a list of ints, appending does not allocate an object per call.
+        self.allocated_blocks = 0
+
+    def to_stats(self) -> CallStats:
+        durations = sorted(self.durations_ns)
+        return CallStats(
+            name=self.name,
+            class_name=self.class_name,
+            num_calls=len(durations),
+            p50_us=percentile(durations, 50) / 1e3,
+            p99_us=percentile(durations, 99) / 1e3,
+            max_us=durations[-1] / 1e3,
+            total_ms=sum(durations) / 1e6,
+            allocated_blocks=self.allocated_blocks,
+        )
+
+
+def percentile(sorted_values, p: float):
+    """ The nearest-rank percentile of a non-empty sorted sequence. """
+    return sorted_values[max(0, math.ceil(p / 100 * len(sorted_values)) - 1)]
+
+
+def iterate_grader_tree(grader: Grader, name: str = 'grader') -> Iterator[Tuple[str, Grader]]:
+    """
+    Yields the grader and the graders nested within its fields (directly or in lists, tuples and dicts)
+    together with their path from the root.
+    """
+    yield name, grader
+    for attr_name, value in vars(grader).items():
+        if isinstance(value, Grader):
+            yield from iterate_grader_tree(value, f'{name}.{attr_name}')
+        elif isinstance(value, (list, tuple)):
+            for i, item in enumerate(value):
+                if isinstance(item, Grader):
+                    yield from iterate_grader_tree(item, f'{name}.{attr_name}[{i}]')
+        elif isinstance(value, dict):
+            for key, item in value.items():
+                if isinstance(item, Grader):
+                    yield from iterate_grader_tree(item, f'{name}.{attr_name}[{key!r}]')
+
+
+_not_an_instance_attribute = object()
+
+class GraderProfiler:
+    """
+    Records the latency and allocations of each call to the instrumented methods.
+    Recording costs about two microseconds per call, which is included in the latencies of the callers.
+    """
+
+    def __init__(self):
+        self._samples: Dict[str, _Samples] = {}
+        self._instrumented: List[Tuple[Any, str, Any]] = []  # obj, method_name, previous instance attribute
+
+    def instrument_grader_tree(self, grader: Grader, name: str = 'grader'):
+        instrumented_ids = set()
+        for grader_name, nested_grader in iterate_grader_tree(grader, name):
+            if id(nested_grader) in instrumented_ids:
+                continue  # The same grader in several places of the tree.
+            instrumented_ids.add(id(nested_grader))
+            for method_name in profiled_grader_methods:
+                self.instrument(nested_grader, method_name, f'{grader_name}.{method_name}')
+
+    def instrument(self, obj: Any, method_name: str, name: str):
+        assert name not in self._samples, f'{name} is already instrumented.'
+        method = getattr(obj, method_name)
+        previous = vars(obj).get(method_name, _not_an_instance_attribute)
+        samples = self._samples[name] = _Samples(name, f'{type(obj).__module__}.{type(obj).__qualname__}')
+        durations_ns = samples.durations_ns
+        perf_counter_ns = time.perf_counter_ns
+        getallocatedblocks = sys.getallocatedblocks
+
+        def profiled(_self, *args, **kwargs):
+            blocks_before = getallocatedblocks()
+            start = perf_counter_ns()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                durations_ns.append(perf_counter_ns() - start)
+                samples.allocated_blocks += getallocatedblocks() - blocks_before
+
+        # A bound method, such that Metric.to_json() leaves it out.
+        setattr(obj, method_name, types.MethodType(profiled, obj))
+        self._instrumented.append((obj, method_name, previous))
+
+    def finish(self) -> GraderProfile:
+        """
+        Restores the instrumented methods (e.g. such that the graders can be pickled)
+        and returns the stats of the methods which were called.
+        """
+        for obj, method_name, previous in reversed(self._instrumented):
+            if previous is _not_an_instance_attribute:
+                delattr(obj, method_name)
+            else:
+                setattr(obj, method_name, previous)
+        self._instrumented = []
+        return GraderProfile(calls=[
+            samples.to_stats() for samples in self._samples.values()
+            if samples.durations_ns
+        ])
@@ -0,0 +1,183 @@
+import ctypes
+from typing import Dict
+
+import numpy as np
+
+from rlbot.utils.structures.game_data_struct import (
+    BallInfo, GameTickPacket, PlayerInfo, Rotator, ScoreInfo, Touch, Vector3, MAX_PLAYERS
+)
+
+"""
+Zero-copy NumPy views over a GameTickPacket.
+These allow graders to do vector math over e.g. all cars at once
+rather than reading each field through a ctypes attribute lookup.
+
+Note: for a single vector (e.g. just the ball location) plain python math
+on the ctypes fields is faster than NumPy, as NumPy has a per-call overhead.
+"""
+
+# Structs which are mapped to a (3,) float32 subarray rather than a record,
+# such that e.g. the locations of all cars are a (num_cars, 3) array.
+_vector_types = (Vector3, Rotator)
+
+_dtypes: Dict[type, np.dtype] = {}
+
+def dtype_from_ctypes(ctype: type) -> np.dtype:
+    """
+    Returns a NumPy dtype with the same memory layout as the given ctypes type.
+    Fields which NumPy can not represent (e.g. c_wchar arrays) are left out.
+    """
+    if ctype not in _dtypes:
+        _dtypes[ctype] = _make_dtype(ctype)
+    return _dtypes[ctype]
+
+def car_score_matrix(raw: np.ndarray) -> np.ndarray:
+    """
+    Views the ScoreInfo fields (score, goals, own_goals, ...) of every car slot as an int32 (MAX_PLAYERS, 7) matrix,
+    given the bytes of a packet (e.g. PacketArrays.raw), or of several packets as a (n, sizeof(GameTickPacket)) array.
+    This allows comparing all scores in one go.
+    """
+    return _car_matrix(raw, PlayerInfo.score_info.offset, ctypes.c_int, len(ScoreInfo._fields_))
+
+def car_flag_matrix(raw: np.ndarray) -> np.ndarray:
+    """ Like car_score_matrix(), for the bool fields named in car_flag_names as uint8. """
+    return _car_matrix(raw, getattr(PlayerInfo, car_flag_names[0]).offset, ctypes.c_bool, len(car_flag_names))
+
+def car_boosts(raw: np.ndarray) -> np.ndarray:
+    """ Like car_score_matrix(), for the boost amount of every car slot as an int32 (MAX_PLAYERS,) array. """
+    return _car_matrix(raw, PlayerInfo.boost.offset, ctypes.c_int, 1)[..., 0]
+
+def car_state_words(raw: np.ndarray) -> np.ndarray:
+    """
+    Like car_score_matrix(), for the bytes of every car slot from is_demolished up to and including boost,
+    as an int32 (MAX_PLAYERS, 36) matrix. Comparing these finds whether any of the flags or boost amounts changed
+    in one go, which is cheaper than comparing car_flag_matrix() and car_boosts() separately.
+    """
+    start = PlayerInfo.is_demolished.offset
+    return _car_matrix(raw, start, ctypes.c_int, (PlayerInfo.boost.offset + PlayerInfo.boost.size - start) // 4)
+
+def latest_touch_keys(raw: np.ndarray) -> np.ndarray:
+    """
+    Views the bits of the ball's latest_touch.time_seconds and its player_index as an int32 (2,) array, given the bytes
+    of a packet or (n, sizeof(GameTickPacket)) packets. They change iff there is a new touch.
+    """
+    assert raw.dtype == np.uint8 and raw.shape[-1] == ctypes.sizeof(GameTickPacket)
+    time_offset = GameTickPacket.game_ball.offset + BallInfo.latest_touch.offset + Touch.time_seconds.offset
+    player_offset = GameTickPacket.game_ball.offset + BallInfo.latest_touch.offset + Touch.player_index.offset
+    return _strided_view(raw, raw.shape[:-1] + (2,), np.int32, time_offset, (player_offset - time_offset,))
+
+def _car_matrix(raw: np.ndarray, offset_in_car: int, field_type: type, num_fields: int) -> np.ndarray:
+    assert raw.dtype == np.uint8 and raw.shape[-1] == ctypes.sizeof(GameTickPacket)
+    return _strided_view(
+        raw,
+        raw.shape[:-1] + (MAX_PLAYERS, num_fields),
+        np.uint8 if field_type is ctypes.c_bool else np.dtype(field_type),
+        GameTickPacket.game_cars.offset + offset_in_car,
+        (ctypes.sizeof(PlayerInfo), ctypes.sizeof(field_type)),
+    )
+
+def _strided_view(raw: np.ndarray, shape: tuple, dtype, offset: int, inner_strides: tuple) -> np.ndarray:
+    if raw.size == 0:
+        return np.zeros(shape, dtype=dtype)  # e.g. (0, ...) for no packets, which has no buffer to view.
+    return np.ndarray(shape=shape, dtype=dtype, buffer=raw, offset=offset, strides=raw.strides[:-1] + inner_strides)
+
+assert Touch.time_seconds.size == Touch.player_index.size == 4
+assert PlayerInfo.is_demolished.offset % 4 == 0 and PlayerInfo.boost.offset % 4 == 0
+# ScoreInfo is 7 consecutive ints.
+assert all(field_type is ctypes.c_int for _, field_type in ScoreInfo._fields_)
+# The consecutive bool fields of PlayerInfo.
+car_flag_names = ['is_demolished', 'has_wheel_contact', 'is_super_sonic', 'is_bot', 'jumped', 'double_jumped']
+assert [getattr(PlayerInfo, name).offset for name in car_flag_names] == list(range(
+    PlayerInfo.is_demolished.offset, PlayerInfo.is_demolished.offset + len(car_flag_names)))
+
+def _make_dtype(ctype: type) -> np.dtype:
+    if issubclass(ctype, _vector_types):
+        assert all(field_type is ctypes.c_float for _, field_type in ctype._fields_)
+        return np.dtype((np.float32, len(ctype._fields_)))
+    if issubclass(ctype, ctypes.Structure):
+        names, formats, offsets = [], [], []
+        for name, field_type, *_ in ctype._fields_:
+            field_dtype = dtype_from_ctypes(field_type)
+            if field_dtype is None:
+                continue
+            names.append(name)
+            formats.append(field_dtype)
+            offsets.append(getattr(ctype, name).offset)
+        return np.dtype({'names': names, 'formats': formats, 'offsets': offsets, 'itemsize': ctypes.sizeof(ctype)})
+    if issubclass(ctype, ctypes.Array):
+        element_dtype = dtype_from_ctypes(ctype._type_)
+        return None if element_dtype is None else np.dtype((element_dtype, ctype._length_))
+    if issubclass(ctype, ctypes.c_wchar):
+        return None  # Its size differs between platforms.
+    return np.dtype(ctype)
+
+
+class PacketArrays:
+    """
+    Arrays which view the memory of a GameTickPacket, so they reflect the packet's current values.
+    They are read-only to prevent graders from accidentally modifying the packet.
+    Per-car arrays only contain the first num_cars cars.
+    """
+
+    def __init__(self, game_tick_packet: GameTickPacket):
+        self.game_tick_packet = game_tick_packet
+        self.array = np.frombuffer(game_tick_packet, dtype=dtype_from_ctypes(GameTickPacket), count=1).reshape(())
+        self.array.flags.writeable = False
+        self.raw = np.frombuffer(game_tick_packet, dtype=np.uint8)
+        self.raw.flags.writeable = False
+
+    @property
+    def ball_physics(self) -> np.ndarray:
+        return self.array['game_ball']['physics']
+
+    @property
+    def ball_location(self) -> np.ndarray:
+        return self.ball_physics['location']
+
+    @property
+    def ball_velocity(self) -> np.ndarray:
+        return self.ball_physics['velocity']
+
+    @property
+    def ball_angular_velocity(self) -> np.ndarray:
+        return self.ball_physics['angular_velocity']
+
+    @property
+    def cars(self) -> np.ndarray:
+        return self.array['game_cars'][:self.game_tick_packet.num_cars]
+
+    @property
+    def car_physics(self) -> np.ndarray:
+        return self.cars['physics']
+
+    @property
+    def car_locations(self) -> np.ndarray:
+        return self.car_physics['location']
+
+    @property
+    def car_rotations(self) -> np.ndarray:
+        return self.car_physics['rotation']
+
+    @property
+    def car_velocities(self) -> np.ndarray:
+        return self.car_physics['velocity']
+
+    @property
+    def car_angular_velocities(self) -> np.ndarray:
+        return self.car_physics['angular_velocity']
+
+    @property
+    def car_teams(self) -> np.ndarray:
+        return self.cars['team']
+
+    @property
+    def car_scores(self) -> np.ndarray:
+        """ A record per car with the fields of ScoreInfo (score, goals, own_goals, ...). """
+        return self.cars['score_info']
+
+    @property
+    def team_scores(self) -> np.ndarray:
+        return self.array['teams'][:self.game_tick_packet.num_teams]['score']
+
+    def car_distances_to_ball(self) -> np.ndarray:
+        return np.linalg.norm(self.car_locations - self.ball_location, axis=1)
@@ -0,0 +1,64 @@
+import ctypes
+from typing import Dict, List, TypeVar
+
+from rlbot.utils.structures.game_data_struct import GameTickPacket, Touch
+
+"""
+Copies of ctypes structures (e.g. a GameTickPacket which rlbot is about to overwrite with the next tick)
+made with a single memmove into preallocated instances.
+copy.deepcopy() does the same job through the pickle machinery, which is a lot slower.
+"""
+
+Struct = TypeVar('Struct', bound=ctypes.Structure)
+
+
+class SnapshotPool:
+    """
+    Hands out copies of structures of one ctypes type.
+    The instances are allocated chunk_size at a time. Released snapshots get reused.
+    Note: An instance keeps its whole chunk alive, so keep chunks of big structures small.
+    """
+
+    def __init__(self, ctype: type, chunk_size: int = 16):
+        assert chunk_size >= 1
+        self.ctype = ctype
+        self.chunk_size = chunk_size
+        self.num_allocated = 0
+        self._size = ctypes.sizeof(ctype)
+        self._free: List[ctypes.Structure] = []
+
+    def snapshot(self, struct: Struct) -> Struct:
+        """ Returns a copy of the struct which does not change when the struct does. """
+        assert type(struct) is self.ctype
+        if not self._free:
+            self._allocate_chunk()
+        copy = self._free.pop()
+        ctypes.memmove(ctypes.addressof(copy), ctypes.addressof(struct), self._size)
+        return copy
+
+    def release(self, snapshot: Struct):
+        """ Returns a snapshot which is not used anymore to the pool, such that it can be reused. """
+        assert type(snapshot) is self.ctype
+        self._free.append(snapshot)
+
+    def _allocate_chunk(self):
+        chunk = (self.ctype * self.chunk_size)()
+        # The elements share the memory of the chunk, which they keep alive.
+        self._free.extend(reversed(chunk))
+        self.num_allocated += self.chunk_size
+
+
+_pools: Dict[type, SnapshotPool] = {
+    GameTickPacket: SnapshotPool(GameTickPacket, chunk_size=4),  # About 17 KB each.
+    Touch: SnapshotPool(Touch, chunk_size=64),
+}
+
+def snapshot_pool(ctype: type) -> SnapshotPool:
+    """ The shared pool for the type. """
+    if ctype not in _pools:
+        _pools[ctype] = SnapshotPool(ctype)
+    return _pools[ctype]
+
+def snapshot(struct: Struct) -> Struct:
+    """ Copies the struct using the shared pool for its type. """
+    return snapshot_pool(type(struct)).snapshot(struct)
@@ -0,0 +1,63 @@
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from rlbottraining.grading.tick_fields import read_column, tick_fields
+
+"""
+Some fields of the ticks of many runs, stacked into one array such that
+code which evaluates ticks with NumPy (e.g. grader_dsl.py) can evaluate all runs at once.
+"""
+
+
+class TickBatch:
+    """
+    values[run, tick, field] holds the field named field_names[field] as float64,
+    which represents every field exactly (like the python numbers the fields are read as).
+    Runs which are shorter than the longest one are padded by repeating their last tick,
+    such that evaluating the padding does not affect the ticks before it. See valid.
+    """
+
+    def __init__(self, values: np.ndarray, field_names: Sequence[str], num_ticks: np.ndarray):
+        assert values.ndim == 3 and values.shape[2] == len(field_names)
+        self.values = values
+        self.field_names: List[str] = list(field_names)
+        self.num_ticks = num_ticks  # The number of recorded ticks per run.
+        self._field_indices: Dict[str, int] = {name: i for i, name in enumerate(self.field_names)}
+
+    @staticmethod
+    def from_runs(runs: Sequence[np.ndarray], field_names: Sequence[str],
+            selected_ticks: Optional[Sequence[np.ndarray]] = None) -> 'TickBatch':
+        """
+        :param runs: The packets of each run, with the dtype of packet_arrays.dtype_from_ctypes(GameTickPacket).
+        :param field_names: Names from tick_fields.py.
+        :param selected_ticks: Per run, a mask of the packets to use (rather than all of them),
+            which avoids copying the whole packets to select some.
+        """
+        if selected_ticks is None:
+            selected_ticks = [np.ones(len(packets), dtype=bool) for packets in runs]
+        num_ticks = np.array([np.count_nonzero(ticks) for ticks in selected_ticks], dtype=np.int64)
+        max_ticks = int(num_ticks.max()) if len(runs) else 0
+        values = np.zeros((len(runs), max_ticks, len(field_names)))
+        for run, (packets, ticks, n) in enumerate(zip(runs, selected_ticks, num_ticks)):
+            if n == 0:
+                continue
+            for i, name in enumerate(field_names):
+                column = read_column(packets, tick_fields[name])[ticks]
+                values[run, :n, i] = column
+                values[run, n:, i] = column[-1]
+        return TickBatch(values, field_names, num_ticks)
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        """ (runs, ticks) """
+        return self.values.shape[:2]
+
+    @property
+    def valid(self) -> np.ndarray:
+        """ Whether each (run, tick) was recorded rather than padding. """
+        return np.arange(self.shape[1]) < self.num_ticks[:, np.newaxis]
+
+    def column(self, name: str) -> np.ndarray:
+        """ The field for each (run, tick) as a view. """
+        return self.values[:, :, self._field_indices[name]]
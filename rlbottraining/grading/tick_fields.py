@@ -0,0 +1,76 @@
+from typing import Dict, NamedTuple, Tuple, Union
+
+import numpy as np
+
+from rlbot.utils.structures.game_data_struct import MAX_PLAYERS, MAX_TEAMS
+
+"""
+Short names for the fields of a GameTickPacket, e.g. 'ball.z' or 'car1.boost',
+for code which refers to fields by name such as grader_dsl.py.
+
+Each field can be read from a single GameTickPacket or as a column from an array of packets
+with the dtype of packet_arrays.dtype_from_ctypes(GameTickPacket), e.g. from a TickHistory or a tick capture.
+"""
+
+
+class TickField(NamedTuple):
+    name: str
+    expression: str  # Reads the value from a GameTickPacket which is called `packet`.
+    array_path: Tuple[Union[str, int], ...]  # Field names and indices into a structured array of packets.
+
+
+def read_column(packets: np.ndarray, field: TickField) -> np.ndarray:
+    """
+    Returns the field for each of the packets as a view.
+    """
+    column = packets
+    for key in field.array_path:
+        column = column[key] if isinstance(key, str) else column[..., key]
+    return column
+
+
+# Physics vector -> the short names of its components.
+_vector_components = {
+    'location': ('x', 'y', 'z'),
+    'velocity': ('vx', 'vy', 'vz'),
+    'angular_velocity': ('avx', 'avy', 'avz'),
+    'rotation': ('pitch', 'yaw', 'roll'),
+}
+
+def _physics_fields(prefix: str, expression: str, array_path: Tuple) -> Dict[str, TickField]:
+    fields = {}
+    for vector_name, component_names in _vector_components.items():
+        attribute_names = ('pitch', 'yaw', 'roll') if vector_name == 'rotation' else ('x', 'y', 'z')
+        for i, (component_name, attribute_name) in enumerate(zip(component_names, attribute_names)):
+            name = f'{prefix}.{component_name}'
+            fields[name] = TickField(name, f'{expression}.{vector_name}.{attribute_name}', array_path + (vector_name, i))
+    return fields
+
+def _make_tick_fields() -> Dict[str, TickField]:
+    fields: Dict[str, TickField] = {}
+    def add(name: str, expression: str, *array_path):
+        fields[name] = TickField(name, expression, array_path)
+
+    for name in ['seconds_elapsed', 'game_time_remaining', 'is_overtime', 'is_round_active', 'is_kickoff_pause', 'is_match_ended']:
+        add(f'game.{name}', f'packet.game_info.{name}', 'game_info', name)
+    add('num_cars', 'packet.num_cars', 'num_cars')
+
+    fields.update(_physics_fields('ball', 'packet.game_ball.physics', ('game_ball', 'physics')))
+    add('ball.touch_time', 'packet.game_ball.latest_touch.time_seconds', 'game_ball', 'latest_touch', 'time_seconds')
+    add('ball.touch_team', 'packet.game_ball.latest_touch.team', 'game_ball', 'latest_touch', 'team')
+    add('ball.touch_player', 'packet.game_ball.latest_touch.player_index', 'game_ball', 'latest_touch', 'player_index')
+
+    for team in range(MAX_TEAMS):
+        add(f'team{team}.score', f'packet.teams[{team}].score', 'teams', team, 'score')
+
+    for car in range(MAX_PLAYERS):
+        prefix = f'car{car}'
+        expression = f'packet.game_cars[{car}]'
+        fields.update(_physics_fields(prefix, f'{expression}.physics', ('game_cars', car, 'physics')))
+        for name in ['team', 'boost', 'is_demolished', 'has_wheel_contact', 'is_super_sonic', 'jumped', 'double_jumped']:
+            add(f'{prefix}.{name}', f'{expression}.{name}', 'game_cars', car, name)
+        for name in ['score', 'goals', 'own_goals', 'assists', 'saves', 'shots', 'demolitions']:
+            add(f'{prefix}.{name}', f'{expression}.score_info.{name}', 'game_cars', car, 'score_info', name)
+    return fields
+
+tick_fields: Dict[str, TickField] = _make_tick_fields()
@@ -0,0 +1,114 @@
+import ctypes
+
+import numpy as np
+
+from rlbot.utils.structures.game_data_struct import GameTickPacket
+
+from rlbottraining.grading.packet_arrays import (
+    PacketArrays, car_boosts, car_flag_matrix, car_score_matrix, car_state_words, dtype_from_ctypes, latest_touch_keys
+)
+
+"""
+A record of the most recent ticks, shared by everything that compares the current tick to previous ones.
+"""
+
+class TickHistory:
+    """
+    Keeps the last `capacity` ticks in preallocated arrays.
+    Queries return views of a part of the packet for the last n ticks (oldest first), e.g.
+        history.ball(n)['physics']['location']  # (n, 3) float32
+        history.cars(n)['physics']['velocity']  # (n, MAX_PLAYERS, 3) float32
+        history.car_scores(n)  # (n, MAX_PLAYERS, 7) int32
+        history.car_flags(n)  # (n, MAX_PLAYERS, 6) uint8
+    without allocating. See packet_arrays.py for the field layout.
+
+    Each tick is recorded as one copy of the packet's memory, which is a lot faster
+    than copying fields one by one. The views therefore stride over whole packets.
+    To keep the last n ticks contiguous, ticks are appended to a buffer which is
+    twice the capacity and the most recent ticks are moved to its start when it is full.
+    The buffer (about 35 KB per tick of capacity) is only allocated by the first record(),
+    such that histories which are never recorded into cost nothing.
+    One history can be reused for several runs, see clear().
+    """
+
+    def __init__(self, capacity: int = 120):
+        assert capacity >= 1
+        self.capacity = capacity
+        self.num_recorded = 0  # Since creation or clear(), not limited by the capacity.
+        self._end = 0  # Index after the most recent tick.
+        self._allocate(0)
+
+    def _allocate(self, size: int):
+        self._size = size
+        self._packets = np.zeros(self._size, dtype=dtype_from_ctypes(GameTickPacket))
+        self._raw = self._packets.view(np.uint8).reshape(self._size, ctypes.sizeof(GameTickPacket))
+        self._car_scores = car_score_matrix(self._raw)
+        self._car_flags = car_flag_matrix(self._raw)
+        self._car_boosts = car_boosts(self._raw)
+        self._car_state_words = car_state_words(self._raw)
+        self._latest_touch_keys = latest_touch_keys(self._raw)
+
+    def __len__(self) -> int:
+        return min(self.num_recorded, self.capacity)
+
+    def record(self, arrays: PacketArrays):
+        if self._end == self._size:
+            if self._size == 0:
+                self._allocate(2 * self.capacity)
+            else:
+                self._move_to_start()
+        self._raw[self._end] = arrays.raw
+        self._end += 1
+        self.num_recorded += 1
+
+    def clear(self):
+        """ Forgets all ticks (e.g. before the next exercise), keeping the buffer. """
+        self.num_recorded = 0
+        self._end = 0
+
+    def _move_to_start(self):
+        keep = self.capacity - 1  # Makes room for the next tick.
+        self._raw[:keep] = self._raw[self._end - keep:self._end]
+        self._end = keep
+
+    def _window(self, n: int) -> slice:
+        return slice(self._end - min(n, len(self)), self._end)
+
+    def packets(self, n: int) -> np.ndarray:
+        """ The whole packets of the last n ticks (fewer if not that many were recorded). """
+        return self._packets[self._window(n)]
+
+    def ball(self, n: int) -> np.ndarray:
+        return self._packets['game_ball'][self._window(n)]
+
+    def cars(self, n: int) -> np.ndarray:
+        """ All car slots of the last n ticks. See num_cars() for how many were in use. """
+        return self._packets['game_cars'][self._window(n)]
+
+    def car_scores(self, n: int) -> np.ndarray:
+        """ The fields of ScoreInfo (score, goals, own_goals, ...) as a matrix per tick. """
+        return self._car_scores[self._window(n)]
+
+    def car_flags(self, n: int) -> np.ndarray:
+        """ The bool fields named in packet_arrays.car_flag_names (is_demolished, has_wheel_contact, ...) as a uint8 matrix per tick. """
+        return self._car_flags[self._window(n)]
+
+    def car_boosts(self, n: int) -> np.ndarray:
+        return self._car_boosts[self._window(n)]
+
+    def car_state_words(self, n: int) -> np.ndarray:
+        """ See packet_arrays.car_state_words() """
+        return self._car_state_words[self._window(n)]
+
+    def latest_touch_keys(self, n: int) -> np.ndarray:
+        """ See packet_arrays.latest_touch_keys() """
+        return self._latest_touch_keys[self._window(n)]
+
+    def game_info(self, n: int) -> np.ndarray:
+        return self._packets['game_info'][self._window(n)]
+
+    def teams(self, n: int) -> np.ndarray:
+        return self._packets['teams'][self._window(n)]
+
+    def num_cars(self, n: int) -> np.ndarray:
+        return self._packets['num_cars'][self._window(n)]
@@ -1,18 +1,54 @@
-from typing import List
+from typing import List, Optional
 
 from rlbot.utils.structures.game_data_struct import GameTickPacket
 
-from rlbottraining.grading.event_detector import PlayerEventDetector, PlayerEvent
+from rlbottraining.grading.event_detector import PlayerEventDetector, PlayerEvent, PlayerEventType
+from rlbottraining.grading.packet_arrays import PacketArrays
+from rlbottraining.grading.tick_history import TickHistory
 
 
 class TrainingTickPacket:
     """A GameTickPacket but with extra preprocessed information."""
 
-    def __init__(self):
+    def __init__(self, history: Optional[TickHistory] = None):
+        """
+        :param history: Allows runs which happen one after another to share the memory of one history,
+            which gets cleared by the first update().
+        """
         self.game_tick_packet: GameTickPacket = None
-        self.player_events: List[PlayerEvent] = []  # events which happened this tick.
-        self._player_event_detector = PlayerEventDetector()
+        self._player_events: Optional[List[PlayerEvent]] = []
+        # The recent ticks, including the current one. Use this rather than keeping copies of previous packets.
+        self.history = TickHistory() if history is None else history
+        self._player_event_detector = PlayerEventDetector(self.history)
+        self._arrays: PacketArrays = None
+
+    @property
+    def arrays(self) -> PacketArrays:
+        """ NumPy views over the game_tick_packet. See packet_arrays.py """
+        if self._arrays is None or self._arrays.game_tick_packet is not self.game_tick_packet:
+            self._arrays = PacketArrays(self.game_tick_packet)
+        return self._arrays
 
     def update(self, game_tick_packet: GameTickPacket):
+        if self.game_tick_packet is None:
+            self.history.clear()  # In case it is shared and holds the ticks of a previous run.
         self.game_tick_packet = game_tick_packet
-        self.player_events = self._player_event_detector.detect_events(game_tick_packet)
+        self.history.record(self.arrays)
+        self._player_events = None
+
+    @property
+    def player_events(self) -> List[PlayerEvent]:
+        """
+        The events which happened this tick, see PlayerEventType.
+        They are detected once per tick for all graders, when first asked for.
+        """
+        if self._player_events is None:
+            detector = self._player_event_detector
+            self._player_events = (
+                detector.detect_events(self.game_tick_packet) + detector.detect_car_and_ball_events(self.game_tick_packet)
+            )
+        return self._player_events
+
+    def player_events_of_type(self, *event_types: PlayerEventType) -> List[PlayerEvent]:
+        """ e.g. tick.player_events_of_type(PlayerEventType.JUMP, PlayerEventType.DOUBLE_JUMP) """
+        return [event for event in self.player_events if event.type in event_types]
@@ -1,5 +1,6 @@
 from dataclasses import dataclass, field
 from datetime import datetime
+from enum import Enum
 from logging import Logger
 from pathlib import Path
 from typing import Optional, Dict, Any
@@ -8,8 +9,12 @@ import json
 
 from rlbot.training.training import Grade, Pass
 
+from rlbottraining.grading.grader_profiler import GraderProfile
 from rlbottraining.history.metric import Metric
-from rlbottraining.history.metric_json_encoder import MetricJsonEncoder
+from rlbottraining.history.live_feed import publish_result
+from rlbottraining.history.metric_json_encoder import MetricJsonEncoder, iso_format
+from rlbottraining.history.result_log import get_result_log_writer, iso8601_sort_key
+from rlbottraining.history.sqlite_store import get_history_store
 from rlbottraining.paths import HistoryPaths
 from rlbottraining.training_exercise import TrainingExercise
 
@@ -34,6 +39,7 @@ class ExerciseResult(Metric):
     reproduction_info: ReproductionInfo
     run_id: str = field(default_factory=lambda: uuid.uuid4().hex)
     create_time: datetime = field(default_factory=lambda: datetime.utcnow())
+    grader_profile: Optional[GraderProfile] = None  # Only if the graders were profiled.
 
 
 def log_result(result: ExerciseResult, log: Logger):
@@ -49,15 +55,30 @@ def log_result(result: ExerciseResult, log: Logger):
     else:
         log.warning(f'{result.exercise.name}: {grade_str}')
 
-def store_result(result: ExerciseResult, history_dir: Path):
+class StorageMode(Enum):
+    JSON_FILES = 'json_files'  # One <run_id>.json file per result.
+    RESULT_LOG = 'result_log'  # Appended to the segmented log, see result_log.py
+    SQLITE = 'sqlite'  # Indexed in a database, see sqlite_store.py
+
+def store_result(result: ExerciseResult, history_dir: Path, storage_mode=StorageMode.JSON_FILES):
     """
-    Writes the result to disk within the history_dir.
+    Writes the result to disk within the history_dir
+    and then pushes it to the dev server, if one is running (see live_feed.py).
     """
-    run_descriptors = history_dir / HistoryPaths.exercise_results
-    run_descriptors.mkdir(parents=True, exist_ok=True)
-    file_path = run_descriptors / (result.run_id + '.json')
+    result_json_str = json.dumps(result, cls=MetricJsonEncoder, sort_keys=True)
+    if storage_mode == StorageMode.RESULT_LOG:
+        writer = get_result_log_writer(history_dir)
+        writer.append(result_json_str, iso8601_sort_key(iso_format(result.create_time)))
+    elif storage_mode == StorageMode.SQLITE:
+        get_history_store(history_dir).add(json.loads(result_json_str), result_json_str)
+    else:
+        run_descriptors = Path(history_dir) / HistoryPaths.exercise_results
+        run_descriptors.mkdir(parents=True, exist_ok=True)
+        file_path = run_descriptors / (result.run_id + '.json')
 
-    assert not file_path.exists(), "OMG, somehow got the same run_id twice, causing a clash in file names"
+        assert not file_path.exists(), "OMG, somehow got the same run_id twice, causing a clash in file names"
 
-    with open(file_path, 'w') as f:
-        json.dump(result, f, cls=MetricJsonEncoder, sort_keys=True)
+        with open(file_path, 'w') as f:
+            f.write(result_json_str)
+    # Only queued, see live_feed.py. The dev server skips results it already got, whichever way comes first.
+    publish_result(history_dir, result_json_str)
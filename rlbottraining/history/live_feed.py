@@ -0,0 +1,168 @@
+from pathlib import Path
+from socketserver import StreamRequestHandler, ThreadingTCPServer
+from typing import Callable, Dict, Optional, Tuple
+import atexit
+import json
+import queue
+import socket
+import threading
+
+from rlbot.utils.logging_utils import get_logger
+
+from rlbottraining.history.result_log import ResultJson
+from rlbottraining.paths import HistoryPaths
+
+"""
+Pushes results from the processes which store them straight to a running dev server,
+such that it does not need to wait for (and re-parse) file modification events.
+
+The dev server listens on a local TCP socket and advertises its address in the history_dir.
+Publishers send each result JSON as a line. Publishing is best-effort:
+if nobody is listening, results are only stored.
+Results are sent from a background thread, such that a slow or missing listener never stalls training.
+"""
+
+# Give up on a listener which does not keep up.
+SEND_TIMEOUT_SECONDS = 1.0
+# Results beyond this many waiting to be sent are dropped (they are stored regardless).
+MAX_QUEUED_RESULTS = 1000
+
+Address = Tuple[str, int]
+
+def read_live_feed_address(history_dir: Path) -> Optional[Address]:
+    try:
+        host, port = (Path(history_dir) / HistoryPaths.live_feed_address).read_text().strip().rsplit(':', 1)
+    except (OSError, ValueError):
+        return None
+    return host, int(port)
+
+
+class LiveFeedPublisher:
+    """
+    Sends results to the listener of a history_dir on a background thread,
+    keeping the connection open between results.
+    The listener's address is only (re-)read while there is no connection, e.g. after the listener restarted.
+    """
+
+    def __init__(self, history_dir: Path):
+        self.history_dir = Path(history_dir)
+        self._address: Optional[Address] = None
+        self._socket: Optional[socket.socket] = None
+        self._queue: 'queue.Queue[Optional[str]]' = queue.Queue(maxsize=MAX_QUEUED_RESULTS)
+        self._thread: Optional[threading.Thread] = None
+
+    def publish(self, result_json_str: str):
+        """ Queues the result for sending. Never blocks. """
+        assert '\n' not in result_json_str, 'Results must be on a single line.'
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._send_queued, name='live_feed_publisher', daemon=True)
+            self._thread.start()
+        try:
+            self._queue.put_nowait(result_json_str)
+        except queue.Full:
+            get_logger('live_feed').debug('Dropped a result, the live feed is not keeping up.')
+
+    def close(self, timeout: float = SEND_TIMEOUT_SECONDS):
+        """ Sends what is queued (giving up after about timeout seconds) and stops the background thread. """
+        if self._thread is not None:
+            try:
+                self._queue.put(None, timeout=timeout)
+            except queue.Full:
+                pass
+            self._thread.join(timeout)
+            self._thread = None
+        self._disconnect()
+
+    def _send_queued(self):
+        while True:
+            result_json_str = self._queue.get()
+            if result_json_str is None:
+                return
+            self._send(result_json_str)
+
+    def _send(self, result_json_str: str):
+        data = (result_json_str + '\n').encode('utf-8')
+        if self._socket is not None:
+            try:
+                self._socket.sendall(data)
+                return
+            except OSError:
+                self._disconnect()  # The listener went away or was restarted. Try its current address.
+        self._address = read_live_feed_address(self.history_dir)
+        if self._address is None:
+            return  # Nobody is listening.
+        try:
+            self._socket = socket.create_connection(self._address, timeout=SEND_TIMEOUT_SECONDS)
+            self._socket.sendall(data)
+        except OSError as e:
+            get_logger('live_feed').debug(f'Could not publish result to {self._address}: {e}')
+            self._disconnect()
+
+    def _disconnect(self):
+        if self._socket is not None:
+            self._socket.close()
+            self._socket = None
+
+
+_publishers: Dict[Path, LiveFeedPublisher] = {}
+
+def publish_result(history_dir: Path, result_json_str: str):
+    history_dir = Path(history_dir).absolute()
+    if history_dir not in _publishers:
+        _publishers[history_dir] = LiveFeedPublisher(history_dir)
+    _publishers[history_dir].publish(result_json_str)
+
+@atexit.register
+def close_live_feed_publishers():
+    for publisher in _publishers.values():
+        publisher.close()
+    _publishers.clear()
+
+
+class _TCPServer(ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class LiveFeedListener:
+    """
+    Receives published results on a background thread and advertises its address while running.
+    Use as a context manager.
+    """
+
+    def __init__(self, history_dir: Path, callback: Callable[[ResultJson], None], host: str = '127.0.0.1'):
+        self.history_dir = Path(history_dir)
+        self.address_path = self.history_dir / HistoryPaths.live_feed_address
+        self.callback = callback
+
+        class Handler(StreamRequestHandler):
+            def handle(handler):
+                for line in handler.rfile:
+                    if not line.endswith(b'\n'):
+                        break  # The publisher went away mid-write.
+                    try:
+                        result_json = json.loads(line)
+                    except ValueError:
+                        get_logger('live_feed').warning(f'Received invalid result from {handler.client_address}')
+                        continue
+                    self.callback(result_json)
+
+        self.tcp_server = _TCPServer((host, 0), Handler)
+        self._thread = threading.Thread(target=self.tcp_server.serve_forever, daemon=True)
+
+    @property
+    def address(self) -> Address:
+        return self.tcp_server.server_address[:2]
+
+    def __enter__(self):
+        self._thread.start()
+        host, port = self.address
+        self.address_path.parent.mkdir(parents=True, exist_ok=True)
+        self.address_path.write_text(f'{host}:{port}')
+        return self
+
+    def __exit__(self, *exc_info):
+        if read_live_feed_address(self.history_dir) == self.address:
+            self.address_path.unlink()
+        self.tcp_server.shutdown()
+        self.tcp_server.server_close()
@@ -1,6 +1,8 @@
 import ctypes
-from typing import Mapping, Any
+from operator import attrgetter
+from typing import Any, Callable, Dict, List, Mapping, Tuple
 import json
+import types
 from datetime import datetime
 
 from rlbot.training.training import Pass, Fail, Result
@@ -11,54 +13,146 @@ from rlbot.matchconfig.match_config import MatchConfig
 from rlbot.matchconfig.conversions import ConfigJsonEncoder
 
 class MetricJsonEncoder(json.JSONEncoder):
+    """
+    Encodes Metrics and some other well known types (see _make_plan()).
+    The work that only depends on an object's class is done once per class (see _plans),
+    and default() returns plain JSON values such that everything is serialized in a single pass.
+    """
+
     def default(self, obj):
-        # Metric
-        if isinstance(obj, Metric):
-            assert type(obj) != Metric, 'Must subclass Metric, not use it directly'
-            json_dict = obj.to_json()
+        cls = obj.__class__
+        plan = _plans.get(cls)
+        if plan is None:
+            plan = _plans[cls] = _make_plan(cls)
+        return plan(self, obj)
+
+    def _default_fallback(self, obj):
+        # Be permissive - propagate some things rather than failing to encode anything.
+        # As a downside, we need to be more careful when reading these json objects back in
+        # As an upside, we can diagnose what was wrong at a later point in time.
+        if not hasattr(self, 'default_encoder'):
+            self.default_encoder = ConfigJsonEncoder()
+        try:
+            return self.default_encoder.default(obj)
+        except Exception as e:
+            return make_encode_error(e)
+
+
+# Converts an object into something json.JSONEncoder can encode.
+EncodingPlan = Callable[[MetricJsonEncoder, Any], Any]
+_plans: Dict[type, EncodingPlan] = {}
+
+# Best-effort encoding of some well known types which could get subclassed.
+_well_known_types = [Pass, Fail, Result, Grader]
+
+def _make_plan(cls: type) -> EncodingPlan:
+    """
+    Decides how instances of cls are encoded.
+    The order of the checks matters for classes which match several of them.
+    """
+    class_name = full_class_name(cls)
+
+    # Metric
+    if issubclass(cls, Metric):
+        assert cls != Metric, 'Must subclass Metric, not use it directly'
+        uses_default_to_json = cls.to_json is Metric.to_json
+        def encode_metric(encoder: MetricJsonEncoder, obj: Metric):
+            if uses_default_to_json:  # Inlined, as it is by far the most common.
+                json_dict = {
+                    k: v for k, v in obj.__dict__.items()
+                    if (
+                        not (k.startswith('__') and k.endswith('__')) and
+                        not isinstance(v, types.MethodType)
+                    )
+                }
+            else:
+                json_dict = obj.to_json()
             # Tag our Metrics such that we can write specialized code to visualize them.
             assert '__class__' not in json_dict
-            json_dict['__class__'] = full_class_name_of(obj)
+            json_dict['__class__'] = class_name
             return json_dict
+        return encode_metric
 
-        # Best-effort encoding of some well known types which could get subclassed.
-        well_known_types = [Pass, Fail, Result, Grader]
-        for cls in well_known_types:
-            if not isinstance(obj, cls):
-                continue
-            json_dict = json.loads(self.encode(obj.__dict__))
-            json_dict['__class__'] = full_class_name_of(obj)
-            json_dict[f'__isinstance_{cls.__name__}__'] = True
+    for well_known_type in _well_known_types:
+        if not issubclass(cls, well_known_type):
+            continue
+        isinstance_key = f'__isinstance_{well_known_type.__name__}__'
+        def encode_well_known(encoder: MetricJsonEncoder, obj):
+            json_dict = _plain_json_dict(encoder, obj.__dict__)
+            json_dict['__class__'] = class_name
+            json_dict[isinstance_key] = True
             return json_dict
+        return encode_well_known
 
-        if isinstance(obj, ctypes.Structure):
-            json_dict = json.loads(CtypesEncoder().encode(obj))
-            json_dict['__class__'] = full_class_name_of(obj)
+    if issubclass(cls, ctypes.Structure):
+        convert_structure = _ctypes_converter(cls)
+        def encode_structure(encoder: MetricJsonEncoder, obj: ctypes.Structure):
+            json_dict = convert_structure(obj)
+            json_dict['__class__'] = class_name
             return json_dict
+        return encode_structure
 
-        if isinstance(obj, datetime):
-            return {
-                '__class__': 'datetime.datetime',
-                'iso8601': iso_format(obj),
-            }
+    if issubclass(cls, datetime):
+        return lambda encoder, obj: {
+            '__class__': 'datetime.datetime',
+            'iso8601': iso_format(obj),
+        }
 
-        # Numpy array. Not using isinstance to keep dependencies lean.
-        if 'ndarray' in obj.__class__.__name__:
-            return obj.tolist()
+    # Numpy array. Not using isinstance to keep dependencies lean.
+    if 'ndarray' in cls.__name__:
+        return lambda encoder, obj: obj.tolist()
 
-        # Exception (note: this is a thing they want to propagate, rather than an accident)
-        if isinstance(obj, Exception):
-            return jsonify_exception(obj)
+    # Exception (note: this is a thing they want to propagate, rather than an accident)
+    if issubclass(cls, Exception):
+        return lambda encoder, obj: jsonify_exception(obj)
 
-        # Be permissive - propagate some things rather than failing to encode anything.
-        # As a downside, we need to be more careful when reading these json objects back in
-        # As an upside, we can diagnose what was wrong at a later point in time.
-        if not hasattr(self, 'default_encoder'):
-            self.default_encoder = ConfigJsonEncoder()
-        try:
-            return self.default_encoder.default(obj)
-        except Exception as e:
-            return make_encode_error(e)
+    return MetricJsonEncoder._default_fallback
+
+
+def _plain_json_dict(encoder: MetricJsonEncoder, d: Mapping) -> Dict[str, Any]:
+    """
+    Well known types have always been encoded via a JSON round trip (json.loads(encoder.encode(d))).
+    This returns the same thing without serializing: keys are converted to strings, all the way down.
+    """
+    json_dict = {}
+    for key, value in d.items():
+        if not isinstance(key, str):
+            key = _json_key(encoder, key)
+            if key is None:
+                continue  # skipkeys
+        json_dict[key] = _plain_json(encoder, value)
+    return json_dict
+
+def _plain_json(encoder: MetricJsonEncoder, value):
+    if value is None or isinstance(value, (str, int, float)):
+        return value
+    if isinstance(value, dict):
+        return _plain_json_dict(encoder, value)
+    if isinstance(value, (list, tuple)):
+        return [_plain_json(encoder, e) for e in value]
+    if isinstance(value, ctypes.Structure):
+        return encoder.default(value)  # Already plain.
+    return _plain_json(encoder, encoder.default(value))
+
+def _json_key(encoder: MetricJsonEncoder, key):
+    """ Converts non-string dict keys like json.JSONEncoder does. Returns None if the key should be skipped. """
+    if isinstance(key, float):
+        if key != key or key in (float('inf'), float('-inf')):
+            if not encoder.allow_nan:
+                raise ValueError('Out of range float values are not JSON compliant: ' + repr(key))
+            return 'NaN' if key != key else ('Infinity' if key > 0 else '-Infinity')
+        return float.__repr__(key)
+    if key is True:
+        return 'true'
+    if key is False:
+        return 'false'
+    if key is None:
+        return 'null'
+    if isinstance(key, int):
+        return int.__repr__(key)
+    if encoder.skipkeys:
+        return None
+    raise TypeError(f'keys must be str, int, float, bool or None, not {key.__class__.__name__}')
 
 
 def full_class_name_of(obj) -> str:
@@ -128,3 +222,74 @@ class CtypesEncoder(json.JSONEncoder):
             return result
 
         return json.JSONEncoder.default(self, obj)
+
+
+# Type codes of fundamental ctypes types whose values JSON can represent.
+_json_compatible_ctypes_codes = set('?bBhHiIlLqQfdguZP')
+
+def _unchanged(value):
+    return value
+_ctypes_converters: Dict[type, Callable[[Any], Any]] = {}
+
+def _ctypes_converter(ctype: type) -> Callable[[Any], Any]:
+    """
+    Returns a function which does what CtypesEncoder().default() does for a value read from a field of type ctype.
+    Everything that can be decided from the type is decided once.
+    """
+    converter = _ctypes_converters.get(ctype)
+    if converter is None:
+        converter = _ctypes_converters[ctype] = _make_ctypes_converter(ctype)
+    return converter
+
+def _make_ctypes_converter(ctype: type) -> Callable[[Any], Any]:
+    generic = CtypesEncoder().default
+    if (
+        issubclass(ctype, ctypes._SimpleCData) and
+        ctype.__bases__ == (ctypes._SimpleCData,) and  # Fields of subclasses are not converted to python values.
+        ctype._type_ in _json_compatible_ctypes_codes
+    ):
+        return _unchanged
+
+    if issubclass(ctype, ctypes.Array):
+        element_type = ctype._type_
+        if element_type is ctypes.c_wchar:
+            # Read as a str when it is a field, but not when it is the element of another array.
+            return lambda value: value if isinstance(value, str) else generic(value)
+        if element_type.__bases__ == (ctypes._SimpleCData,) and element_type._type_ in _json_compatible_ctypes_codes:
+            return lambda value: value[:]
+        if issubclass(element_type, (ctypes.Structure, ctypes.Array)):
+            convert_element = _ctypes_converter(element_type)
+            return lambda value: [convert_element(e) for e in value]
+        return generic
+
+    if issubclass(ctype, (ctypes.Structure, ctypes.Union)):
+        fields: List[Tuple[str, Callable[[Any], Any], bool]] = []  # name, converter, is_anonymous
+        anonymous = getattr(ctype, '_anonymous_', [])
+        for key, field_type, *_ in getattr(ctype, '_fields_', []):
+            # private fields don't encode
+            if key.startswith('_'):
+                continue
+            fields.append((key, _ctypes_converter(field_type), key in anonymous))
+
+        if len(fields) > 1 and not any(is_anonymous for _, _, is_anonymous in fields):
+            keys = [key for key, _, _ in fields]
+            get_values = attrgetter(*keys)  # Reads all the fields in one call.
+            converted_fields = [(key, convert) for key, convert, _ in fields if convert is not _unchanged]
+            def convert_structure(obj):
+                result = dict(zip(keys, get_values(obj)))
+                for key, convert in converted_fields:
+                    result[key] = convert(result[key])
+                return result
+            return convert_structure
+
+        def convert_structure_with_anonymous_fields(obj):
+            result = {}
+            for key, convert, is_anonymous in fields:
+                if is_anonymous:
+                    result.update(convert(getattr(obj, key)))
+                else:
+                    result[key] = convert(getattr(obj, key))
+            return result
+        return convert_structure_with_anonymous_fields
+
+    return generic
@@ -0,0 +1,212 @@
+from pathlib import Path
+from typing import Any, Dict, IO, Iterator, List, Optional, Tuple
+import atexit
+import json
+import os
+import time
+import uuid
+
+from rlbottraining.paths import HistoryPaths
+
+"""
+An append-only log of exercise results, as an alternative to one <run_id>.json file per result.
+
+The log is a directory of segments. Each segment is a file with one result JSON per line
+(newline-delimited JSON) which is only ever appended to by a single ResultLogWriter.
+Within a segment, results are in create_time order which allows readers to
+stream the whole log in order by merging the segments (see stored_results.py).
+Writers flush every record to the OS such that readers see it straight away,
+but only fsync periodically. A crash can therefore leave a partial last line,
+which readers ignore.
+
+Note: this module deliberately does not depend on exercise_result.py
+as that module uses the writer here.
+"""
+
+RESULT_LOG_SUFFIX = '.jsonl'
+
+ResultJson = Dict[str, Any]
+SortKey = Tuple[str, int]
+
+def create_time_sort_key(result_json: ResultJson) -> SortKey:
+    """ Orders results by when they were created. """
+    return iso8601_sort_key(result_json['create_time']['iso8601'])
+
+def iso8601_sort_key(iso8601: str) -> SortKey:
+    """
+    The milliseconds in the iso8601 strings from MetricJsonEncoder are not zero-padded,
+    so they need to be compared as a number.
+    """
+    seconds, milliseconds = iso8601.rstrip('Z').rsplit('.', 1)
+    return seconds, int(milliseconds)
+
+
+class ResultLogWriter:
+    """
+    Appends result JSON strings to segments in log_dir.
+    """
+
+    def __init__(self, log_dir: Path, max_segment_bytes: int = 16 * 1024**2,
+            fsync_every_records: int = 100, fsync_every_seconds: float = 5.0):
+        self.log_dir = Path(log_dir)
+        self.max_segment_bytes = max_segment_bytes
+        self.fsync_every_records = fsync_every_records
+        self.fsync_every_seconds = fsync_every_seconds
+        self.segment_path: Optional[Path] = None
+        self._segment_file: Optional[IO[bytes]] = None
+        self._segment_bytes = 0
+        self._last_sort_key: Optional[SortKey] = None
+        self._unsynced_records = 0
+        self._last_fsync_time = time.monotonic()
+
+    def append(self, result_json_str: str, sort_key: SortKey):
+        """
+        :param sort_key: The create_time_sort_key() of the result.
+            Results may be appended out of order (e.g. by the parallel runner),
+            in which case a new segment is started to keep each segment in order.
+        """
+        assert '\n' not in result_json_str, 'Records must be on a single line.'
+        line = (result_json_str + '\n').encode('utf-8')
+        if (self._segment_file is None or
+                self._segment_bytes + len(line) > self.max_segment_bytes or
+                sort_key < self._last_sort_key):
+            self._start_segment()
+        self._last_sort_key = sort_key
+        self._segment_file.write(line)
+        self._segment_file.flush()
+        self._segment_bytes += len(line)
+        self._unsynced_records += 1
+        if (self._unsynced_records >= self.fsync_every_records or
+                time.monotonic() - self._last_fsync_time >= self.fsync_every_seconds):
+            self.fsync()
+
+    def fsync(self):
+        if self._segment_file is None:
+            return
+        os.fsync(self._segment_file.fileno())
+        self._unsynced_records = 0
+        self._last_fsync_time = time.monotonic()
+
+    def close(self):
+        if self._segment_file is None:
+            return
+        self.fsync()
+        self._segment_file.close()
+        self._segment_file = None
+
+    def _start_segment(self):
+        """ Rotates to a new segment. Segments are never appended to after being closed. """
+        self.close()
+        self.log_dir.mkdir(parents=True, exist_ok=True)
+        # The time prefix keeps directory listings roughly chronological; uuid avoids clashes between writers.
+        self.segment_path = self.log_dir / f'{int(time.time() * 1000):013d}_{uuid.uuid4().hex[:8]}{RESULT_LOG_SUFFIX}'
+        self._segment_file = open(self.segment_path, 'xb')
+        self._segment_bytes = 0
+
+
+_writers: Dict[Path, ResultLogWriter] = {}
+
+def get_result_log_writer(history_dir: Path) -> ResultLogWriter:
+    """
+    Returns the writer for the result log in the given history_dir.
+    The writer is shared such that results of a process end up in as few segments as possible.
+    """
+    log_dir = Path(history_dir).absolute() / HistoryPaths.result_log
+    if log_dir not in _writers:
+        _writers[log_dir] = ResultLogWriter(log_dir)
+    return _writers[log_dir]
+
+@atexit.register
+def close_result_log_writers():
+    for writer in _writers.values():
+        writer.close()
+    _writers.clear()
+
+
+def list_segments(log_dir: Path) -> List[Path]:
+    if not log_dir.exists():
+        return []
+    return sorted(log_dir.glob('*' + RESULT_LOG_SUFFIX))
+
+def read_segment(segment_path: Path) -> Iterator[ResultJson]:
+    """
+    Yields the results in the segment in the order they were written.
+    A partially written last line is skipped.
+    """
+    with open(segment_path, 'rb') as f:
+        for line in f:
+            if not line.endswith(b'\n'):
+                break
+            yield json.loads(line)
+
+def read_result_files(results_dir: Path) -> List[ResultJson]:
+    """ Reads the one-file-per-result format, sorted by create_time. """
+    if not results_dir.exists():
+        return []
+    results = []
+    for result_json_file in results_dir.iterdir():
+        with open(result_json_file) as f:
+            results.append(json.load(f))
+    results.sort(key=create_time_sort_key)
+    return results
+
+class ResultLogTailer:
+    """
+    Keeps track of how far each segment has been read such that we can pick up appended results.
+    """
+
+    def __init__(self, log_dir: Path):
+        self.log_dir = Path(log_dir)
+        self.offsets: Dict[Path, int] = {}
+
+    def skip_existing(self):
+        """ Considers everything that is currently in the log as read. """
+        self.offsets = {
+            segment_path.absolute(): segment_path.stat().st_size
+            for segment_path in list_segments(self.log_dir)
+        }
+
+    def read_new_results(self, segment_path: Path) -> List[ResultJson]:
+        segment_path = Path(segment_path).absolute()
+        offset = self.offsets.get(segment_path, 0)
+        with open(segment_path, 'rb') as f:
+            f.seek(offset)
+            data = f.read()
+        complete = data[:data.rfind(b'\n') + 1]  # The last line may still be being written.
+        self.offsets[segment_path] = offset + len(complete)
+        return [json.loads(line) for line in complete.splitlines()]
+
+
+def migrate_result_files_to_log(history_dir: Path, delete_result_files: bool = True) -> int:
+    """
+    Moves results from the one-file-per-result format into the result log.
+    Results which are already in the log are skipped, which makes it safe to re-run after an interruption.
+    Returns the number of results added to the log.
+    """
+    history_dir = Path(history_dir)
+    results_dir = history_dir / HistoryPaths.exercise_results
+    if not results_dir.exists():
+        return 0
+    log_dir = history_dir / HistoryPaths.result_log
+    logged_run_ids = {
+        result['run_id']
+        for segment_path in list_segments(log_dir)
+        for result in read_segment(segment_path)
+    }
+
+    writer = ResultLogWriter(log_dir)
+    num_migrated = 0
+    result_files = sorted(results_dir.glob('*.json'))
+    try:
+        for result in read_result_files(results_dir):
+            if result['run_id'] in logged_run_ids:
+                continue
+            writer.append(json.dumps(result, sort_keys=True), create_time_sort_key(result))
+            num_migrated += 1
+    finally:
+        writer.close()  # fsyncs before we delete anything.
+
+    if delete_result_files:
+        for result_file in result_files:
+            result_file.unlink()
+    return num_migrated
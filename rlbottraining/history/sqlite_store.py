@@ -0,0 +1,328 @@
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Tuple
+import atexit
+import json
+import sqlite3
+import threading
+import time
+
+from rlbottraining.history.result_log import ResultJson, list_segments, read_result_files, read_segment
+from rlbottraining.paths import HistoryPaths
+
+"""
+A history store in an embedded SQLite database.
+Next to the full JSON of each result, it indexes a few fields such that questions like
+"the last 1000 fails of exercise X" can be answered without deserializing the whole history.
+"""
+
+_schema = '''
+CREATE TABLE IF NOT EXISTS exercise_results (
+    run_id TEXT PRIMARY KEY,
+    create_time TEXT NOT NULL,  -- iso8601 with zero-padded milliseconds such that it sorts.
+    exercise_name TEXT,
+    exercise_class TEXT,
+    grader_class TEXT,
+    passed INTEGER,  -- NULL if the grade is neither a Pass nor a Fail.
+    seed INTEGER,
+    playlist_index INTEGER,
+    json TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS by_create_time ON exercise_results (create_time);
+CREATE INDEX IF NOT EXISTS by_exercise_name ON exercise_results (exercise_name, passed, create_time);
+CREATE INDEX IF NOT EXISTS by_exercise_class ON exercise_results (exercise_class, passed, create_time);
+CREATE INDEX IF NOT EXISTS by_grader_class ON exercise_results (grader_class, passed, create_time);
+CREATE INDEX IF NOT EXISTS by_seed ON exercise_results (seed, playlist_index);
+'''
+
+_indexed_columns = ['run_id', 'create_time', 'exercise_name', 'exercise_class', 'grader_class', 'passed', 'seed', 'playlist_index']
+
+
+class IndexedResult(NamedTuple):
+    run_id: str
+    create_time: str
+    exercise_name: Optional[str]
+    exercise_class: Optional[str]
+    grader_class: Optional[str]
+    passed: Optional[bool]
+    seed: Optional[int]
+    playlist_index: Optional[int]
+
+
+def index_result(result_json: ResultJson) -> IndexedResult:
+    exercise = result_json.get('exercise') or {}
+    grader = exercise.get('grader') or {}
+    grade = result_json.get('grade') or {}
+    reproduction_info = result_json.get('reproduction_info') or {}
+    passed = None
+    if grade.get('__isinstance_Pass__'):
+        passed = True
+    elif grade.get('__isinstance_Fail__'):
+        passed = False
+    return IndexedResult(
+        run_id=result_json['run_id'],
+        create_time=sortable_iso8601(result_json['create_time']['iso8601']),
+        exercise_name=exercise.get('name'),
+        exercise_class=exercise.get('__class__'),
+        grader_class=grader.get('__class__'),
+        passed=passed,
+        seed=reproduction_info.get('seed'),
+        playlist_index=reproduction_info.get('playlist_index'),
+    )
+
+def sortable_iso8601(iso8601: str) -> str:
+    """ Zero-pads the milliseconds of the iso8601 strings from MetricJsonEncoder. """
+    seconds, milliseconds = iso8601.rstrip('Z').rsplit('.', 1)
+    return format_iso8601(datetime.strptime(seconds, '%Y-%m-%dT%H:%M:%S') + timedelta(milliseconds=int(milliseconds)))
+
+def format_iso8601(dt: datetime) -> str:
+    return dt.strftime('%Y-%m-%dT%H:%M:%S.') + f'{dt.microsecond // 1000:03d}Z'
+
+
+def connect(db_path: Path) -> sqlite3.Connection:
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+    connection = sqlite3.connect(str(db_path), check_same_thread=False)
+    # WAL lets the website read while a runner is writing.
+    connection.execute('PRAGMA journal_mode=WAL')
+    connection.execute('PRAGMA synchronous=NORMAL')
+    connection.executescript(_schema)
+    return connection
+
+
+class SqliteHistoryStore:
+    """
+    Writes results in batches (one transaction per batch) and answers queries on the indexed fields.
+    """
+
+    def __init__(self, db_path: Path, batch_size: int = 100, batch_seconds: float = 5.0):
+        self.db_path = Path(db_path)
+        self.batch_size = batch_size
+        self.batch_seconds = batch_seconds
+        self.connection = connect(self.db_path)
+        self._pending_rows: List[Tuple] = []
+        self._last_flush_time = time.monotonic()
+        self._lock = threading.RLock()  # e.g. the dev server renders on several threads.
+
+    def add(self, result_json: ResultJson, result_json_str: Optional[str] = None):
+        """
+        Queues the result to be written with the next batch.
+        :param result_json_str: The serialized result_json, if the caller has it already.
+        """
+        if result_json_str is None:
+            result_json_str = json.dumps(result_json, sort_keys=True)
+        row = (*index_result(result_json), result_json_str)
+        with self._lock:  # flush() may be running on another thread.
+            self._pending_rows.append(row)
+            if len(self._pending_rows) >= self.batch_size or time.monotonic() - self._last_flush_time >= self.batch_seconds:
+                self.flush()
+
+    def flush(self):
+        with self._lock:
+            if self._pending_rows:
+                with self.connection:  # A transaction.
+                    self.connection.executemany(
+                        f'INSERT OR IGNORE INTO exercise_results ({", ".join(_indexed_columns)}, json) '
+                        f'VALUES ({", ".join("?" * (len(_indexed_columns) + 1))})',
+                        self._pending_rows
+                    )
+                self._pending_rows = []
+            self._last_flush_time = time.monotonic()
+
+    def close(self):
+        with self._lock:
+            self.flush()
+            self.connection.close()
+
+    def query(self, **filters) -> List[IndexedResult]:
+        """
+        Returns the indexed fields of the matching results. See _select() for the filters.
+        """
+        rows = self._select(', '.join(_indexed_columns), **filters)
+        return [
+            IndexedResult(*row[:5], None if row[5] is None else bool(row[5]), *row[6:])
+            for row in rows
+        ]
+
+    def query_json(self, **filters) -> Iterator[ResultJson]:
+        """
+        Like query() but returns the full results.
+        """
+        for json_str, in self._select('json', **filters):
+            yield json.loads(json_str)
+
+    def count(self, **filters) -> int:
+        (count,), = self._select('COUNT(*)', **filters)
+        return count
+
+    def get(self, run_id: str) -> Optional[ResultJson]:
+        self.flush()
+        with self._lock:
+            row = self.connection.execute('SELECT json FROM exercise_results WHERE run_id = ?', (run_id,)).fetchone()
+        return None if row is None else json.loads(row[0])
+
+    def contains(self, run_id: str) -> bool:
+        self.flush()
+        with self._lock:
+            return self.connection.execute('SELECT 1 FROM exercise_results WHERE run_id = ?', (run_id,)).fetchone() is not None
+
+    def last_rowid(self) -> int:
+        """ Rows are numbered in the order they were added, which makes this a watermark for what has been read. """
+        self.flush()
+        with self._lock:
+            (last_rowid,), = self.connection.execute('SELECT COALESCE(MAX(rowid), 0) FROM exercise_results')
+        return last_rowid
+
+    def run_ids(self, up_to_rowid: Optional[int] = None) -> Iterator[str]:
+        """ In create_time order. """
+        for run_id, in self._select('run_id', up_to_rowid=up_to_rowid, newest_first=False):
+            yield run_id
+
+    def _select(self, columns: str,
+            exercise_name: Optional[str] = None,
+            exercise_class: Optional[str] = None,
+            grader_class: Optional[str] = None,
+            passed: Optional[bool] = None,
+            seed: Optional[int] = None,
+            playlist_index: Optional[int] = None,
+            since: Optional[datetime] = None,
+            until: Optional[datetime] = None,
+            after_rowid: Optional[int] = None,
+            up_to_rowid: Optional[int] = None,
+            newest_first: bool = True,
+            limit: Optional[int] = None) -> List[Tuple]:
+        """
+        Filters which are None are ignored. since is inclusive, until is exclusive.
+        The rowid filters select results by the order they were added in. See last_rowid().
+        The rows are fetched under the lock, as the connection is shared between threads.
+        """
+        self.flush()  # Make sure we see our own writes.
+        conditions = []
+        parameters: List[Any] = []
+        for column, value in [
+                ('exercise_name', exercise_name),
+                ('exercise_class', exercise_class),
+                ('grader_class', grader_class),
+                ('passed', passed),
+                ('seed', seed),
+                ('playlist_index', playlist_index)]:
+            if value is not None:
+                conditions.append(f'{column} = ?')
+                parameters.append(value)
+        if since is not None:
+            conditions.append('create_time >= ?')
+            parameters.append(format_iso8601(since))
+        if until is not None:
+            conditions.append('create_time < ?')
+            parameters.append(format_iso8601(until))
+        if after_rowid is not None:
+            conditions.append('rowid > ?')
+            parameters.append(after_rowid)
+        if up_to_rowid is not None:
+            conditions.append('rowid <= ?')
+            parameters.append(up_to_rowid)
+        sql = f'SELECT {columns} FROM exercise_results'
+        if conditions:
+            sql += ' WHERE ' + ' AND '.join(conditions)
+        sql += ' ORDER BY create_time ' + ('DESC' if newest_first else 'ASC')
+        if limit is not None:
+            sql += ' LIMIT ?'
+            parameters.append(limit)
+        with self._lock:
+            return self.connection.execute(sql, parameters).fetchall()
+
+
+_stores: Dict[Path, SqliteHistoryStore] = {}
+
+def get_history_store(history_dir: Path) -> SqliteHistoryStore:
+    """
+    Returns the shared store for the given history_dir, creating the database if needed.
+    """
+    db_path = Path(history_dir).absolute() / HistoryPaths.sqlite_store
+    if db_path not in _stores:
+        _stores[db_path] = SqliteHistoryStore(db_path)
+    return _stores[db_path]
+
+@atexit.register
+def close_history_stores():
+    for store in _stores.values():
+        store.close()
+    _stores.clear()
+
+
+def read_sqlite_store(history_dir: Path, up_to_rowid: Optional[int] = None) -> Iterator[ResultJson]:
+    """ Streams the results in the database in create_time order. """
+    db_path = Path(history_dir) / HistoryPaths.sqlite_store
+    if not db_path.exists():
+        return
+    store = SqliteHistoryStore(db_path)
+    try:
+        yield from store.query_json(up_to_rowid=up_to_rowid, newest_first=False)
+    finally:
+        store.close()
+
+
+class SqliteHistoryTailer:
+    """
+    Picks up results which were added to the database since we last looked.
+    """
+
+    def __init__(self, db_path: Path):
+        self.db_path = Path(db_path)
+        self.last_rowid = 0
+
+    def skip_existing(self):
+        """ Considers everything that is currently in the database as read. """
+        if not self.db_path.exists():
+            self.last_rowid = 0
+            return
+        connection = connect(self.db_path)
+        try:
+            (last_rowid,), = connection.execute('SELECT COALESCE(MAX(rowid), 0) FROM exercise_results')
+        finally:
+            connection.close()
+        self.last_rowid = last_rowid
+
+    def read_new_results(self) -> List[ResultJson]:
+        if not self.db_path.exists():
+            return []
+        connection = connect(self.db_path)
+        try:
+            rows = connection.execute(
+                'SELECT rowid, json FROM exercise_results WHERE rowid > ? ORDER BY rowid',
+                (self.last_rowid,)
+            ).fetchall()
+        finally:
+            connection.close()
+        if rows:
+            self.last_rowid = rows[-1][0]
+        return [json.loads(json_str) for _, json_str in rows]
+
+
+def migrate_to_sqlite_store(history_dir: Path) -> int:
+    """
+    Moves results from the per-result json files and the result log into the database.
+    Sources are only deleted once their results are committed, which makes it safe to re-run after an interruption.
+    Returns the number of results which were moved.
+    """
+    history_dir = Path(history_dir)
+    store = SqliteHistoryStore(history_dir / HistoryPaths.sqlite_store, batch_size=1000)
+    num_before = store.count()
+
+    for segment_path in list_segments(history_dir / HistoryPaths.result_log):
+        for result in read_segment(segment_path):
+            store.add(result)
+        store.flush()
+        segment_path.unlink()
+
+    results_dir = history_dir / HistoryPaths.exercise_results
+    if results_dir.exists():
+        result_files = list(results_dir.glob('*.json'))
+        for result in read_result_files(results_dir):
+            store.add(result)
+        store.flush()
+        for result_file in result_files:
+            result_file.unlink()
+
+    num_moved = store.count() - num_before
+    store.close()
+    return num_moved
@@ -0,0 +1,34 @@
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional
+import heapq
+
+from rlbottraining.history.result_log import ResultJson, create_time_sort_key, list_segments, read_result_files, read_segment
+from rlbottraining.history.sqlite_store import read_sqlite_store
+from rlbottraining.paths import HistoryPaths
+
+"""
+Reads back the results within a history_dir, regardless of which StorageMode they were stored with.
+"""
+
+def iterate_stored_results(history_dir: Path, sqlite_up_to_rowid: Optional[int] = None) -> Iterator[ResultJson]:
+    """
+    Streams all results within the history_dir in create_time order.
+    :param sqlite_up_to_rowid: Ignore results which were added to the database after this row.
+    """
+    history_dir = Path(history_dir)
+    sources: List[Iterable[ResultJson]] = [
+        read_segment(segment_path)
+        for segment_path in list_segments(history_dir / HistoryPaths.result_log)
+    ]
+    sources.append(read_result_files(history_dir / HistoryPaths.exercise_results))
+    sources.append(read_sqlite_store(history_dir, sqlite_up_to_rowid))
+    return heapq.merge(*sources, key=create_time_sort_key)
+
+def has_unindexed_results(history_dir: Path) -> bool:
+    """
+    Whether there are results which are not in the SQLite store, i.e. in json files or the result log.
+    """
+    history_dir = Path(history_dir)
+    results_dir = history_dir / HistoryPaths.exercise_results
+    has_result_files = results_dir.exists() and next(results_dir.iterdir(), None) is not None
+    return has_result_files or bool(list_segments(history_dir / HistoryPaths.result_log))
@@ -1,4 +1,4 @@
-from typing import List, Dict, Callable
+from typing import List, Dict, Callable, Optional
 import json
 
 from contextlib import contextmanager
@@ -9,16 +9,29 @@ from watchdog.observers import Observer
 from rlbot.utils.logging_utils import get_logger
 
 from rlbottraining.history.exercise_result import ExerciseResultJson
+from rlbottraining.history.result_log import RESULT_LOG_SUFFIX, ResultLogTailer
+from rlbottraining.history.sqlite_store import SqliteHistoryTailer
 from rlbottraining.paths import HistoryPaths
 
 logger = get_logger('server')
 
 @contextmanager
-def monitor_authoritative_data(history_dir: Path, incremental_callback: Callable[[ExerciseResultJson], None], reset_callback: Callable[[], None]):
+def monitor_authoritative_data(
+        history_dir: Path,
+        incremental_callback: Callable[[ExerciseResultJson], None],
+        reset_callback: Callable[[], None],
+        is_known_run_id: Optional[Callable[[str], bool]] = None):
     """
     Monitors the authoritative data within history_dir and signals when action needs to be taken.
+    :param is_known_run_id: Allows skipping result files which were received by other means (see live_feed.py).
     """
-    event_handler = AuthoritativeDataMonitor(incremental_callback, reset_callback)
+    event_handler = AuthoritativeDataMonitor(
+        incremental_callback,
+        reset_callback,
+        ResultLogTailer(history_dir / HistoryPaths.result_log),
+        SqliteHistoryTailer(history_dir / HistoryPaths.sqlite_store),
+        is_known_run_id,
+    )
     observer = Observer()
     logger.debug('monitoring: ' + str(history_dir / HistoryPaths.authoritative_data))
     observer.schedule(event_handler, str(history_dir / HistoryPaths.authoritative_data), recursive=True)
@@ -33,26 +46,53 @@ class AuthoritativeDataMonitor(LoggingEventHandler):
     def __init__(
             self,
             incremental_callback: Callable[[ExerciseResultJson], None],
-            reset_callback: Callable[[], None]):
+            reset_callback: Callable[[], None],
+            result_log_tailer: ResultLogTailer,
+            sqlite_tailer: SqliteHistoryTailer,
+            is_known_run_id: Optional[Callable[[str], bool]] = None):
         self.incremental_callback = incremental_callback
+        self.is_known_run_id = is_known_run_id or (lambda run_id: False)
         self.reset_callback = reset_callback
+        self.result_log_tailer = result_log_tailer
+        self.sqlite_tailer = sqlite_tailer
+        # The server has read those already.
+        self.result_log_tailer.skip_existing()
+        self.sqlite_tailer.skip_existing()
+        # Writes to the database show up on the main file or the write-ahead log. (not the -shm file, which readers touch too)
+        self.sqlite_paths = (str(sqlite_tailer.db_path), str(sqlite_tailer.db_path) + '-wal')
+
+    def reset(self):
+        self.reset_callback()
+        self.result_log_tailer.skip_existing()
+        self.sqlite_tailer.skip_existing()
 
     def on_created(self, event):
         pass
 
     def on_modified(self, event):
         if event.is_directory: return
+        if event.src_path.endswith(RESULT_LOG_SUFFIX):
+            for result_json in self.result_log_tailer.read_new_results(event.src_path):
+                self.incremental_callback(result_json)
+            return
+        if event.src_path.endswith(self.sqlite_paths):
+            for result_json in self.sqlite_tailer.read_new_results():
+                self.incremental_callback(result_json)
+            return
+        if not event.src_path.endswith('.json'): return  # e.g. tick captures
+        if self.is_known_run_id(Path(event.src_path).stem): return  # Also avoids re-parsing on repeated events.
         logger.warning(f'Authoritative data was written: {event.src_path}')
-        assert event.src_path.endswith('.json')
         with open(event.src_path) as f:
             self.incremental_callback(json.load(f))
 
     def on_deleted(self, event):
         if event.is_directory: return
+        if not event.src_path.endswith(('.json', RESULT_LOG_SUFFIX)): return
         logger.warning(f'{event.src_path} was deleted.')
-        self.reset_callback()
+        self.reset()
 
     def on_moved(self, event):
         if event.is_directory: return
+        if not event.src_path.endswith(('.json', RESULT_LOG_SUFFIX)): return
         logger.warning(f'{event.src_path} was moved.')
-        self.reset_callback()
+        self.reset()
@@ -4,6 +4,8 @@ from dataclasses import dataclass, field
 from pathlib import Path
 
 from rlbottraining.history.exercise_result import ExerciseResultJson
+from rlbottraining.history.sqlite_store import SqliteHistoryStore
+from rlbottraining.history.website.json_utils import Json
 from rlbottraining.history.website.view import Aggregator, Renderer
 from rlbottraining.paths import HistoryPaths
 
@@ -18,10 +20,42 @@ class FullJsonRenderer(Renderer):
     def render(self) -> str:
         return json.dumps(self.result_json)
 
+    def fingerprint(self) -> str:
+        return self.result_json['run_id']  # Results are immutable.
+
+@dataclass
+class StoredFullJsonRenderer(Renderer):
+    """
+    Like FullJsonRenderer but loads the result from the history_store when rendered
+    rather than keeping every result in memory.
+    """
+    run_id: str
+    history_store: SqliteHistoryStore
+
+    def render(self) -> str:
+        return json.dumps(self.history_store.get(self.run_id))
+
+    def fingerprint(self) -> str:
+        return self.run_id  # Results are immutable.
+
 @dataclass
 class FullJsonAggregator(Aggregator):
 
     def add_exercise_result(self, result_json: ExerciseResultJson):
-        path = HistoryPaths.Website.data_dir / 'results' / f'{result_json["run_id"]}.json'
-        self.shared_url_map[path] = FullJsonRenderer(result_json=result_json)
+        run_id = result_json['run_id']
+        if self.history_store is not None and self.history_store.contains(run_id):
+            self.shared_url_map[self.get_path(run_id)] = StoredFullJsonRenderer(run_id=run_id, history_store=self.history_store)
+        else:
+            self.shared_url_map[self.get_path(run_id)] = FullJsonRenderer(result_json=result_json)
+
+    def get_path(self, run_id: str) -> Path:
+        return HistoryPaths.Website.data_dir / 'results' / f'{run_id}.json'
+
+    def get_snapshot(self) -> Json:
+        # Snapshots are only used when all results are in the history_store,
+        # which is cheaper to list than to snapshot.
+        return {}
 
+    def restore_snapshot(self, snapshot: Json):
+        for run_id in self.history_store.run_ids():
+            self.shared_url_map[self.get_path(run_id)] = StoredFullJsonRenderer(run_id=run_id, history_store=self.history_store)
@@ -1,10 +1,11 @@
 import json
-from typing import List
+from typing import List, Optional
 from dataclasses import dataclass, field
 from pathlib import Path
 
 from rlbottraining.history.exercise_result import ExerciseResultJson
-from rlbottraining.history.website.json_utils import slim_copy
+from rlbottraining.history.result_log import iso8601_sort_key
+from rlbottraining.history.website.json_utils import Json, slim_copy
 from rlbottraining.history.website.view import Aggregator, Renderer
 from rlbottraining.paths import HistoryPaths
 
@@ -19,6 +20,65 @@ class SlimResultsRenderer(Renderer):
     def render(self) -> str:
         return json.dumps(self.slim_results)
 
+@dataclass
+class SlimResultsPageRenderer(Renderer):
+    """
+    Renders a fixed-size slice of the slim results.
+    Pages are only ever appended to, so their length identifies their content.
+    """
+    slim_results: List[ExerciseResultJson]  # Shared with the other renderers of the ResultListAggregator.
+    page_index: int
+    page_size: int
+
+    def render(self) -> str:
+        start = self.page_index * self.page_size
+        return json.dumps(self.slim_results[start:start + self.page_size])
+
+    def fingerprint(self) -> str:
+        return str(self.page_length())
+
+    def page_length(self) -> int:
+        return min(self.page_size, len(self.slim_results) - self.page_index * self.page_size)
+
+
+@dataclass
+class PageTimeRange:
+    first_iso8601: str
+    last_iso8601: str
+
+    def extend(self, iso8601: str):
+        if iso8601_sort_key(iso8601) < iso8601_sort_key(self.first_iso8601):
+            self.first_iso8601 = iso8601
+        if iso8601_sort_key(iso8601) > iso8601_sort_key(self.last_iso8601):
+            self.last_iso8601 = iso8601
+
+@dataclass
+class SlimResultsIndexRenderer(Renderer):
+    """
+    Describes the pages such that the list page can decide which ones to load.
+    Results are paged in the order they were added, which is roughly chronological,
+    so each page states the range of create_times it contains.
+    """
+    pages: List[SlimResultsPageRenderer]
+    time_ranges: List[PageTimeRange]
+
+    def render(self) -> str:
+        return json.dumps({
+            'num_results': len(self.pages[0].slim_results) if self.pages else 0,
+            'pages': [
+                {
+                    'path': f'page_{page.page_index}.json',
+                    'num_results': page.page_length(),
+                    'first_create_time': time_range.first_iso8601,
+                    'last_create_time': time_range.last_iso8601,
+                }
+                for page, time_range in zip(self.pages, self.time_ranges)
+            ],
+        })
+
+    def fingerprint(self) -> str:
+        return str(len(self.pages[0].slim_results) if self.pages else 0)
+
 
 slim_keys = [path.split('.') for path in [
     '__class__',
@@ -35,6 +95,10 @@ slim_keys = [path.split('.') for path in [
 @dataclass
 class ResultListAggregator(Aggregator):
     path: Path = field(default_factory=lambda: HistoryPaths.Website.data_dir/'slim_results.json')
+    # Paged version of the above: an index.json and page_<n>.json files.
+    pages_dir: Path = field(default_factory=lambda: HistoryPaths.Website.data_dir/'slim_results')
+    page_size: int = 1000
+    _index_renderer: Optional[SlimResultsIndexRenderer] = field(default=None, init=False, repr=False)
 
     def add_exercise_result(self, result_json: ExerciseResultJson):
         if self.path in self.shared_url_map:
@@ -42,7 +106,39 @@ class ResultListAggregator(Aggregator):
             assert isinstance(renderer, SlimResultsRenderer)
         else:
             renderer = SlimResultsRenderer(slim_results=[])
+            self.shared_url_map[self.path] = renderer
+            self._add_index_renderer()
         slim_result = slim_copy(result_json, slim_keys)
         renderer.slim_results.append(slim_result)
+        self._add_to_page(slim_result)
+
+    def _add_index_renderer(self):
+        self._index_renderer = SlimResultsIndexRenderer(pages=[], time_ranges=[])
+        self.shared_url_map[self.pages_dir/'index.json'] = self._index_renderer
+
+    def _add_to_page(self, slim_result: ExerciseResultJson):
+        """ Must be called after slim_result was appended to the slim_results. """
+        index = self._index_renderer
+        slim_results = self.shared_url_map[self.path].slim_results
+        iso8601 = slim_result['create_time']['iso8601']
+        page_index = (len(slim_results) - 1) // self.page_size
+        if page_index == len(index.pages):
+            page = SlimResultsPageRenderer(slim_results=slim_results, page_index=page_index, page_size=self.page_size)
+            index.pages.append(page)
+            index.time_ranges.append(PageTimeRange(first_iso8601=iso8601, last_iso8601=iso8601))
+            self.shared_url_map[self.pages_dir/f'page_{page_index}.json'] = page
+        else:
+            index.time_ranges[page_index].extend(iso8601)
+
+    def get_snapshot(self) -> Json:
+        renderer = self.shared_url_map.get(self.path)
+        return {'slim_results': renderer.slim_results if renderer else []}
+
+    def restore_snapshot(self, snapshot: Json):
+        renderer = SlimResultsRenderer(slim_results=[])
         self.shared_url_map[self.path] = renderer
+        self._add_index_renderer()
+        for slim_result in snapshot['slim_results']:
+            renderer.slim_results.append(slim_result)
+            self._add_to_page(slim_result)
 
@@ -2,6 +2,7 @@ from typing import Dict
 from pathlib import Path
 from dataclasses import dataclass
 
+from rlbottraining.history.website.json_utils import Json
 from rlbottraining.history.website.view import Aggregator, Renderer
 
 
@@ -42,3 +43,9 @@ class SiteMapAggregator(Aggregator):
     def __init__(self, shared_url_map: Dict[Path, Renderer]):
         super().__init__(shared_url_map)
         self.shared_url_map[self.serve_path] = SiteMapRenderer(shared_url_map=shared_url_map)
+
+    def get_snapshot(self) -> Json:
+        return {}  # Nothing is aggregated.
+
+    def restore_snapshot(self, snapshot: Json):
+        pass
@@ -1,5 +1,5 @@
 """dev_server.py
-Dynamically renders all pages before serving them.
+Dynamically renders pages when they are requested and keeps them in memory until new results arrive.
 This is meant to be started via `rlbottraining dev_server <history_dir>`
 such that the source code is reloaded when it changes
 
@@ -14,46 +14,238 @@ Options:
   --version                Show version.
 """
 
+from dataclasses import dataclass
 from pathlib import Path
 from http.server import ThreadingHTTPServer, ThreadingHTTPServer, SimpleHTTPRequestHandler
 from functools import partial
+from collections import deque
+from typing import Deque, Dict, List, Optional, Set, Tuple
+import gzip
+import hashlib
+import json
+import re
+import threading
+import time
 
 from docopt import docopt
 
 from rlbot.utils.logging_utils import get_logger
+from rlbottraining.history.exercise_result import ExerciseResultJson
+from rlbottraining.history.live_feed import LiveFeedListener
 from rlbottraining.history.website.authoritative_data_monitor import monitor_authoritative_data
-from rlbottraining.history.website.server import Server
+from rlbottraining.history.website.common_views.result_list import slim_keys
+from rlbottraining.history.website.json_utils import Json, slim_copy
+from rlbottraining.history.website.server import Server, render_bytes
 from rlbottraining.paths import HistoryPaths
 from rlbottraining.version import __version__
 
 
+# Smaller responses are not worth compressing.
+MIN_GZIP_SIZE = 1024
+# Comments are sent to idle event streams such that dead connections get noticed.
+EVENT_STREAM_KEEPALIVE_SECONDS = 15
+
+
+@dataclass
+class RenderedPage:
+    content: bytes
+    etag: str
+    generation: int
+    fingerprint: Optional[str]
+    _gzipped_content: Optional[bytes] = None
+
+    def gzipped_content(self) -> bytes:
+        if self._gzipped_content is None:
+            self._gzipped_content = gzip.compress(self.content, compresslevel=6)
+        return self._gzipped_content
+
+    @property
+    def gzipped_etag(self) -> str:
+        """ Strong ETags have to differ between representations. """
+        return self.etag[:-1] + '-gzip"'
+
+
+def parse_entity_tags(header: str) -> List[str]:
+    """
+    Returns the entity tags in an If-None-Match header, without the weakness indicator (W/)
+    as If-None-Match uses the weak comparison. '*' is returned as such.
+    """
+    return [tag for _, tag in re.findall(r'(W/)?("[^"]*"|\*)', header)]
+
+def matches_entity_tag(header: str, etag: str) -> bool:
+    tags = parse_entity_tags(header)
+    return etag in tags or '*' in tags
+
+
+class RenderCache:
+    """
+    Keeps rendered pages in memory until the Server gets a new result.
+    Pages whose Renderer has a fingerprint() are kept for as long as that stays the same.
+    Results are added and pages are rendered under a lock as renderers read
+    the state that aggregators modify.
+    """
+
+    def __init__(self, server: Server):
+        self.server = server
+        self.pages: Dict[Path, RenderedPage] = {}
+        self.generation = 0  # Incremented for every new result.
+        self.lock = threading.RLock()
+        # New results may arrive both via the live feed and the file monitor.
+        self.added_run_ids: Set[str] = set()
+
+    def add_exercise_result(self, result_json: ExerciseResultJson) -> bool:
+        """ Returns False if the result was added already. """
+        with self.lock:
+            if result_json['run_id'] in self.added_run_ids:
+                return False
+            self.added_run_ids.add(result_json['run_id'])
+            self.server.add_exercise_result(result_json)
+            self.generation += 1
+            return True
+
+    def has_result(self, run_id: str) -> bool:
+        return run_id in self.added_run_ids
+
+    def get(self, path: Path) -> RenderedPage:
+        with self.lock:
+            renderer = self.server.url_map[path]
+            fingerprint = renderer.fingerprint()
+            page = self.pages.get(path)
+            if page is not None:
+                if fingerprint is None and page.generation == self.generation:
+                    return page
+                if fingerprint is not None and page.fingerprint == fingerprint:
+                    return page
+            content = render_bytes(renderer)
+            page = RenderedPage(
+                content=content,
+                etag='"' + hashlib.sha1(content).hexdigest() + '"',
+                generation=self.generation,
+                fingerprint=fingerprint,
+            )
+            self.pages[path] = page
+            return page
+
+
+class EventStream:
+    """
+    Broadcasts server-sent events to any number of connections.
+    Recent events are kept such that reconnecting browsers can catch up via Last-Event-ID.
+    Browsers which missed events are told to reset.
+    """
+
+    def __init__(self, max_events: int = 1000):
+        self.events: Deque[Tuple[int, str, str]] = deque(maxlen=max_events)
+        # Event ids are based on time such that they keep increasing across restarts.
+        self.first_event_id = self.last_event_id = int(time.time() * 1000)
+        self.condition = threading.Condition()
+
+    def publish(self, event: str, data: Json):
+        with self.condition:
+            self.last_event_id += 1
+            self.events.append((self.last_event_id, event, json.dumps(data)))
+            self.condition.notify_all()
+
+    def wait_for_events(self, after_event_id: int, timeout: float) -> List[Tuple[int, str, str]]:
+        with self.condition:
+            if after_event_id < self.first_event_id or (self.events and after_event_id < self.events[0][0] - 1):
+                return [(self.last_event_id, 'reset', 'null')]
+            self.condition.wait_for(lambda: self.last_event_id > after_event_id, timeout)
+            return [e for e in self.events if e[0] > after_event_id]
+
+
 def run_devserver(history_dir: Path, host: str, port: int):
     logger = get_logger('dev_server')
 
-    server = None
+    render_cache: RenderCache = None
     def reset_server():
-        nonlocal server
+        nonlocal render_cache
         logger.info('Starting server...')
         server = Server(history_dir)
-        server.clean_website()
+        server.clean_website()  # Pages are served from memory, anything on disk is outdated.
+        render_cache = RenderCache(server)
+        event_stream.publish('reset', None)
+    event_stream = EventStream()
     reset_server()
 
     serve_dir = history_dir / HistoryPaths.Website._website_dir
     class DevServer(SimpleHTTPRequestHandler):
         def do_GET(self):
+            self.send_page(include_body=True)
+
+        def do_HEAD(self):
+            self.send_page(include_body=False)
+
+        def send_page(self, include_body: bool):
+            if self.path == '/events':
+                self.send_events()
+                return
             path = Path(self.translate_path(self.path)).relative_to(serve_dir)
             if path == Path('.'):
                 path = Path('index.html')
-            if path not in server.url_map:
+            if path not in render_cache.server.url_map:
                 self.send_error(404)
-            server.render_to_disk(path)
-            super().do_GET()
+                return
+            page = render_cache.get(path)
+
+            use_gzip = len(page.content) >= MIN_GZIP_SIZE and 'gzip' in self.headers.get('Accept-Encoding', '')
+            etag = page.gzipped_etag if use_gzip else page.etag
+            if matches_entity_tag(self.headers.get('If-None-Match', ''), etag):
+                self.send_response(304)
+                self.send_header('ETag', etag)
+                self.send_header('Vary', 'Accept-Encoding')
+                self.end_headers()
+                return
+
+            content = page.gzipped_content() if use_gzip else page.content
+            self.send_response(200)
+            self.send_header('Content-Type', self.guess_type(str(path)))
+            self.send_header('Content-Length', str(len(content)))
+            self.send_header('ETag', etag)
+            self.send_header('Cache-Control', 'no-cache')  # Always revalidate, which is cheap thanks to the ETag.
+            self.send_header('Vary', 'Accept-Encoding')
+            if use_gzip:
+                self.send_header('Content-Encoding', 'gzip')
+            self.end_headers()
+            if include_body:
+                self.wfile.write(content)
+
+        def send_events(self):
+            """ Streams the slim version of each new result until the browser disconnects. """
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/event-stream')
+            self.send_header('Cache-Control', 'no-cache')
+            self.end_headers()
+            try:
+                last_event_id = int(self.headers.get('Last-Event-ID'))
+            except (TypeError, ValueError):
+                last_event_id = event_stream.last_event_id
+            try:
+                while True:
+                    events = event_stream.wait_for_events(last_event_id, timeout=EVENT_STREAM_KEEPALIVE_SECONDS)
+                    if not events:
+                        self.wfile.write(b': keepalive\n\n')
+                    for last_event_id, event, data in events:
+                        self.wfile.write(f'id: {last_event_id}\nevent: {event}\ndata: {data}\n\n'.encode('utf-8'))
+                    self.wfile.flush()
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+
         def log_request(self, code='-', size=None):
             logger.info(f'"{self.requestline}" {code} {size if size is not None else ""}')
 
     handler_class = partial(DevServer, directory=str(serve_dir))
 
-    with monitor_authoritative_data(history_dir, server.add_exercise_result, reset_server):
+    def add_exercise_result(result_json: ExerciseResultJson):
+        # Note: render_cache changes on reset.
+        if render_cache.add_exercise_result(result_json):
+            event_stream.publish('result', slim_copy(result_json, slim_keys))
+
+    def is_known_run_id(run_id: str) -> bool:
+        return render_cache.has_result(run_id)
+
+    with monitor_authoritative_data(history_dir, add_exercise_result, reset_server, is_known_run_id), \
+            LiveFeedListener(history_dir, add_exercise_result):
         with ThreadingHTTPServer((host, port), handler_class) as httpd:
             sa = httpd.socket.getsockname()
             host, port = sa[0], sa[1]
@@ -62,7 +254,7 @@ def run_devserver(history_dir: Path, host: str, port: int):
                 httpd.serve_forever()
             except KeyboardInterrupt:
                 pass
-    server.clean_website()  # Don't use the partially rendered site for anything.
+    render_cache.server.clean_website()  # Don't use the partially rendered site for anything.
 
 
 def main():
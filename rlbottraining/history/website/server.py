@@ -1,20 +1,33 @@
 import os
-import json
-from typing import List, Dict, Callable, Iterable
+from typing import List, Dict, Callable, Iterable, Optional
 from dataclasses import dataclass, field
 import shutil
 from pathlib import Path
+import hashlib
 import inspect
+import json
+import traceback
 
 from rlbot.utils.class_importer import load_external_module
+from rlbot.utils.logging_utils import get_logger
 
 from rlbottraining.history.exercise_result import ExerciseResultJson
+from rlbottraining.history.metric_json_encoder import full_class_name_of
+from rlbottraining.history.sqlite_store import SqliteHistoryStore
+from rlbottraining.history.stored_results import has_unindexed_results, iterate_stored_results
 from rlbottraining.history.website.common_views.result_full_json import FullJsonAggregator
 from rlbottraining.history.website.common_views.result_list import ResultListAggregator
 from rlbottraining.history.website.common_views.site_map import SiteMapAggregator
+from rlbottraining.history.website.json_utils import Json
 from rlbottraining.history.website.view import Aggregator, Renderer
 from rlbottraining.paths import HistoryPaths, _website_static_source
 
+logger = get_logger('server')
+
+# Increment when the format of the snapshot (or what an Aggregator puts in it) changes.
+SNAPSHOT_VERSION = 1
+# Increment when a Renderer changes its output without changing its fingerprint().
+RENDER_MANIFEST_VERSION = 1
 
 
 class Server:
@@ -28,11 +41,30 @@ class Server:
     aggregators: List[Aggregator]
     url_map: Dict[Path, Renderer]
 
-    def __init__(self, history_dir: Path, url_map: Dict[Path, Renderer]=None, aggregators: List[Aggregator]=None):
-        self.history_dir = history_dir
+    def __init__(self, history_dir: Path, url_map: Dict[Path, Renderer]=None, aggregators: List[Aggregator]=None, use_snapshot=True):
+        """
+        :param use_snapshot: Continue from the aggregator state of the last start, if possible.
+            This requires all results to be in the SQLite store and the default aggregators.
+        """
+        self.history_dir = Path(history_dir)
         self.out_dir = self.history_dir / HistoryPaths.Website._website_dir
         self.url_map = {} if url_map is None else url_map
+        self.snapshot_path = self.history_dir / HistoryPaths.aggregator_snapshot
+        use_snapshot = use_snapshot and aggregators is None
+        self.snapshot_is_current = False
 
+        db_path = self.history_dir / HistoryPaths.sqlite_store
+        self.history_store = SqliteHistoryStore(db_path) if db_path.exists() else None
+        self.aggregators = self.create_aggregators(aggregators)
+
+        # Add past exercise results.
+        if not (use_snapshot and self._restore_snapshot()):
+            self._add_stored_results()
+        if use_snapshot:
+            self._save_snapshot()
+
+    def create_aggregators(self, aggregators: List[Aggregator]=None) -> List[Aggregator]:
+        history_dir = self.history_dir
         if aggregators is None:
             aggregators = [
                 SiteMapAggregator(shared_url_map=self.url_map), # index.html
@@ -51,41 +83,153 @@ class Server:
                 module = load_external_module(file)
                 agg_class = find_class(module, Aggregator)
                 aggregators.append(agg_class(shared_url_map=self.url_map))
-        self.aggregators = aggregators
+        for agg in aggregators:
+            agg.history_store = self.history_store
+        return aggregators
 
-        # Add past exercise results.
-        input_dir = self.history_dir / HistoryPaths.exercise_results
-        results = []
-        for result_json_file in input_dir.iterdir():
-            with open(result_json_file) as f:
-                results.append(json.load(f))
-        results.sort(key=lambda result_json: result_json['create_time']['iso8601'])
-        for result in results:
+    def _add_stored_results(self):
+        """
+        Streams all stored results into the aggregators.
+        """
+        self.last_rowid = self.history_store.last_rowid() if self.history_store else 0
+        for result in iterate_stored_results(self.history_dir, sqlite_up_to_rowid=self.last_rowid):
             self.add_exercise_result(result)
 
+    def _restore_snapshot(self) -> bool:
+        """
+        Restores the aggregators from the snapshot and adds the results which were stored after it.
+        Returns whether that worked. If not, the aggregators are reset.
+        """
+        if self.history_store is None or not self.snapshot_path.exists() or has_unindexed_results(self.history_dir):
+            return False
+        try:
+            with open(self.snapshot_path) as f:
+                snapshot = json.load(f)
+            if (snapshot['version'] != SNAPSHOT_VERSION or
+                    snapshot['aggregator_classes'] != [full_class_name_of(agg) for agg in self.aggregators] or
+                    # Results were deleted since.
+                    snapshot['num_results'] != self.history_store.count(up_to_rowid=snapshot['last_rowid'])):
+                return False
+            for agg, agg_snapshot in zip(self.aggregators, snapshot['aggregators']):
+                agg.restore_snapshot(agg_snapshot)
+        except Exception:
+            logger.warning(f'Could not restore the aggregator snapshot:\n{traceback.format_exc()}')
+            self.url_map.clear()
+            self.aggregators = self.create_aggregators()
+            return False
+
+        # Note: these are added in the order they were stored which may differ from the create_time order.
+        self.last_rowid = self.history_store.last_rowid()
+        self.snapshot_is_current = self.last_rowid == snapshot['last_rowid']
+        for result in self.history_store.query_json(after_rowid=snapshot['last_rowid'], up_to_rowid=self.last_rowid, newest_first=False):
+            self.add_exercise_result(result)
+        return True
+
+    def _save_snapshot(self):
+        """
+        Saves the aggregator state which reflects exactly the results up to self.last_rowid.
+        """
+        if self.snapshot_is_current:
+            return
+        aggregator_snapshots = [agg.get_snapshot() for agg in self.aggregators]
+        if self.history_store is None or has_unindexed_results(self.history_dir) or None in aggregator_snapshots:
+            if self.snapshot_path.exists():
+                self.snapshot_path.unlink()
+            return
+        snapshot = {
+            'version': SNAPSHOT_VERSION,
+            'last_rowid': self.last_rowid,
+            'num_results': self.history_store.count(up_to_rowid=self.last_rowid),
+            'aggregator_classes': [full_class_name_of(agg) for agg in self.aggregators],
+            'aggregators': aggregator_snapshots,
+        }
+        temp_path = self.snapshot_path.with_name(self.snapshot_path.name + '.partial')
+        with open(temp_path, 'w') as f:
+            f.write(json.dumps(snapshot))  # Much faster than json.dump() which can't use the C encoder.
+        temp_path.replace(self.snapshot_path)
+
 
     def add_exercise_result(self, result_json: ExerciseResultJson):
         for agg in self.aggregators:
             agg.add_exercise_result(result_json)
 
     def render_static_website(self):
-        self.clean_website()
-        for path in self.url_map:
-            self.render_to_disk(path)
+        """
+        Renders every path in the url_map to the out_dir.
+        A manifest of the previous render lets us skip pages which have not changed.
+        """
+        manifest_path = self.history_dir / HistoryPaths.website_render_manifest
+        old_manifest = load_render_manifest(manifest_path)
+        if old_manifest is None:
+            self.clean_website()  # We don't know what is in there.
+            old_manifest = {}
+
+        new_manifest = {}
+        for path, renderer in self.url_map.items():
+            new_manifest[str(path)] = self._render_if_changed(path, renderer, old_manifest.get(str(path)))
+        for stale_path in old_manifest.keys() - new_manifest.keys():
+            stale_file = self.out_dir / stale_path
+            if stale_file.exists():
+                stale_file.unlink()
+
+        temp_path = manifest_path.with_name(manifest_path.name + '.partial')
+        with open(temp_path, 'w') as f:
+            f.write(json.dumps({'version': RENDER_MANIFEST_VERSION, 'entries': new_manifest}))
+        temp_path.replace(manifest_path)
+
+    def _render_if_changed(self, path: Path, renderer: Renderer, previous_entry: Optional[Json]) -> Json:
+        """
+        Returns the manifest entry for the path.
+        """
+        file_path = self.out_dir / path
+        renderer_class = full_class_name_of(renderer)
+        fingerprint = renderer.fingerprint()
+        is_on_disk = previous_entry is not None and file_path.exists()
+        if (is_on_disk and fingerprint is not None and
+                previous_entry['renderer'] == renderer_class and
+                previous_entry['fingerprint'] == fingerprint):
+            return previous_entry  # Skip rendering.
+
+        content = render_bytes(renderer)
+        content_hash = hashlib.sha256(content).hexdigest()
+        if not (is_on_disk and previous_entry['sha256'] == content_hash):
+            self._write_file(file_path, content)
+        return {'renderer': renderer_class, 'fingerprint': fingerprint, 'sha256': content_hash}
 
     def clean_website(self):
         if self.out_dir.exists():
             shutil.rmtree(self.out_dir)
+        manifest_path = self.history_dir / HistoryPaths.website_render_manifest
+        if manifest_path.exists():
+            manifest_path.unlink()
 
     def render_to_disk(self, path):
-        renderer = self.url_map[path]
-        file_path = self.out_dir / path
+        self._write_file(self.out_dir / path, render_bytes(self.url_map[path]))
+
+    def _write_file(self, file_path: Path, content: bytes):
         file_path.parent.mkdir(parents=True, exist_ok=True)
-        content = renderer.render()
-        if isinstance(content, bytes):
-            file_path.write_bytes(content)
-        else:
-            file_path.write_text(content)
+        file_path.write_bytes(content)
+
+def render_bytes(renderer: Renderer) -> bytes:
+    content = renderer.render()
+    if isinstance(content, bytes):
+        return content
+    return content.encode('utf-8')
+
+def load_render_manifest(manifest_path: Path) -> Optional[Dict[str, Json]]:
+    """
+    Returns what was rendered last time by path, or None if that is unknown.
+    """
+    if not manifest_path.exists():
+        return None
+    try:
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+    except ValueError:
+        return None
+    if manifest.get('version') != RENDER_MANIFEST_VERSION:
+        return None
+    return manifest['entries']
 
 def make_static_file_aggregator(static_root: Path) -> type:
     class StaticFileAggregator(Aggregator):
@@ -101,6 +245,12 @@ def make_static_file_aggregator(static_root: Path) -> type:
                     path = root / file
                     serve_path = path.relative_to(static_root)
                     self.shared_url_map[serve_path] = StaticFileRenderer(file_path=path)
+
+        def get_snapshot(self) -> Json:
+            return {}  # Nothing is aggregated.
+
+        def restore_snapshot(self, snapshot: Json):
+            pass
     return StaticFileAggregator
 
 @dataclass
@@ -108,6 +258,9 @@ class StaticFileRenderer(Renderer):
     file_path: Path
     def render(self):
         return self.file_path.read_bytes()
+    def fingerprint(self) -> str:
+        stat = self.file_path.stat()
+        return f'{self.file_path}:{stat.st_mtime_ns}:{stat.st_size}'
 
 
 def set_additional_website_code(additional_website_code: Path, history_dir: Path):
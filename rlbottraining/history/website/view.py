@@ -1,10 +1,12 @@
 from dataclasses import dataclass, field
-from typing import Dict
+from typing import Dict, Optional
 from pathlib import Path
 
 from rlbot.utils.logging_utils import get_logger
 
 from rlbottraining.history.exercise_result import ExerciseResultJson
+from rlbottraining.history.sqlite_store import SqliteHistoryStore
+from rlbottraining.history.website.json_utils import Json
 
 """
 This file descibes the common interface for views which show data
@@ -21,6 +23,14 @@ class Renderer:
     def render(self) -> str:
         raise NotImplementedError()
 
+    def fingerprint(self) -> Optional[str]:
+        """
+        Returns something which changes whenever render() would return something different,
+        or None if that is not known without rendering.
+        Allows skipping the render of unchanged pages.
+        """
+        return None
+
 @dataclass
 class Aggregator:
 
@@ -34,5 +44,20 @@ class Aggregator:
     # we'd like to be able to statically render our website out fully.
     shared_url_map: Dict[Path, Renderer]
 
+    # Allows querying past results without keeping them all in memory.
+    # Set by the Server if the history_dir has a database (see sqlite_store.py).
+    history_store: Optional[SqliteHistoryStore] = field(default=None, init=False, repr=False)
+
     def add_exercise_result(self, result_json: ExerciseResultJson):
         pass
+
+    def get_snapshot(self) -> Optional[Json]:
+        """
+        Returns the aggregated state as JSON such that a restarted Server can
+        continue from it via restore_snapshot() rather than re-adding every result.
+        Returns None if this Aggregator does not support that.
+        """
+        return None
+
+    def restore_snapshot(self, snapshot: Json):
+        raise NotImplementedError()
@@ -0,0 +1,150 @@
+from dataclasses import fields, is_dataclass
+from types import CodeType, FunctionType, MethodType
+from typing import Any, Iterator, List, Optional, Set, Tuple
+
+"""
+Applies a reloaded definition of an object (e.g. a TrainingExercise from a reloaded module, see run_module())
+to the existing object, such that code which holds on to it picks up the changes.
+Only what differs is swapped, which keeps the state of unchanged parts (e.g. graders) intact.
+
+Reloading a module creates new classes and functions, so definitions are compared by content:
+classes by their methods' code and their attributes, objects by their class and (dataclass) fields.
+"""
+
+_PLAIN_TYPES = {type(None), bool, int, float, complex, str, bytes}
+
+# Class attributes which are derived from the rest of the class or which don't affect behaviour.
+_IGNORED_CLASS_ATTRIBUTES = {'__dict__', '__weakref__', '__module__', '__doc__', '__dataclass_fields__', '__dataclass_params__'}
+
+
+def hot_swap(source: Any, destination: Any, reference: Any = None) -> List[str]:
+    """
+    Mutates the destination object to behave like the source object.
+    Dataclass fields declared with compare=False (e.g. runtime state like TrainingExercise.matchcomms_factory) are kept.
+    If given, the reference is the definition which the destination was made from (e.g. by the previous load of the module)
+    and only what differs between it and the source is swapped. This keeps state which the destination gathered
+    while running (e.g. in its grader) from counting as a change.
+    Returns the names of what was swapped, which is empty if the definitions are identical.
+    """
+    if reference is None:
+        reference = destination
+    swapped = []
+    source_class, reference_class = type(source), type(reference)
+    if source_class is not reference_class and not _same_class(source_class, reference_class, set()):
+        destination.__class__ = source_class
+        swapped.append(f'class {source_class.__qualname__}')
+
+    source_attributes = _definition_attributes(source)
+    reference_attributes = _definition_attributes(reference)
+    for name in sorted(reference_attributes - source_attributes):
+        if hasattr(destination, name):
+            delattr(destination, name)
+        swapped.append(name)
+    for name in sorted(source_attributes):
+        value = getattr(source, name)
+        if name in reference_attributes and _same_definition(value, getattr(reference, name)):
+            continue
+        setattr(destination, name, value)
+        swapped.append(name)
+    return swapped
+
+
+def _definition_attributes(obj: Any) -> Set[str]:
+    names = set(vars(obj))
+    if is_dataclass(obj):
+        names.difference_update(f.name for f in fields(obj) if not f.compare)
+    return names
+
+def _same_definition(a: Any, b: Any, seen: Optional[Set[Tuple[int, int]]] = None) -> bool:
+    if a is b:
+        return True
+    if type(a) in _PLAIN_TYPES:  # By far the most common.
+        return type(a) is type(b) and a == b
+    if seen is None:
+        seen = set()
+    key = (id(a), id(b))
+    if key in seen:
+        return True  # A cycle, e.g. a recursive function. The rest of the comparison decides.
+    seen.add(key)
+    if isinstance(a, type) or isinstance(b, type):
+        return isinstance(a, type) and isinstance(b, type) and _same_class(a, b, seen)
+    if type(a) is not type(b) and not _same_class(type(a), type(b), seen):
+        return False
+    if isinstance(a, (list, tuple)):
+        return len(a) == len(b) and all(_same_definition(x, y, seen) for x, y in zip(a, b))
+    if isinstance(a, dict):
+        return a.keys() == b.keys() and all(_same_definition(value, b[key], seen) for key, value in a.items())
+    if isinstance(a, FunctionType):
+        return _same_function(a, b, seen)
+    if isinstance(a, MethodType):
+        return _same_function(a.__func__, b.__func__, seen) and _same_definition(a.__self__, b.__self__, seen)
+    if is_dataclass(a):
+        # Rather than the generated __eq__, which requires the exact same class.
+        return all(_same_definition(getattr(a, f.name), getattr(b, f.name), seen) for f in fields(a) if f.compare)
+    if type(a).__eq__ is object.__eq__ and hasattr(a, '__dict__'):
+        return _same_definition(vars(a), vars(b), seen)
+    try:
+        return bool(a == b)
+    except Exception:
+        return False  # e.g. numpy arrays. Swapping is always safe.
+
+def _same_class(a: type, b: type, seen: Set[Tuple[int, int]]) -> bool:
+    if a is b:
+        return True
+    if (a.__module__, a.__qualname__) != (b.__module__, b.__qualname__) or len(a.__mro__) != len(b.__mro__):
+        return False
+    for class_a, class_b in zip(a.__mro__, b.__mro__):
+        if class_a is class_b:
+            continue
+        if class_a.__qualname__ != class_b.__qualname__:
+            return False
+        dict_a, dict_b = vars(class_a), vars(class_b)
+        if dict_a.keys() != dict_b.keys():
+            return False
+        for name, value in dict_a.items():
+            if name not in _IGNORED_CLASS_ATTRIBUTES and not _same_class_attribute(value, dict_b[name], seen):
+                return False
+    return True
+
+def _same_class_attribute(a: Any, b: Any, seen: Set[Tuple[int, int]]) -> bool:
+    if isinstance(a, (staticmethod, classmethod)):
+        return type(a) is type(b) and _same_function(a.__func__, b.__func__, seen)
+    if isinstance(a, property):
+        return isinstance(b, property) and all(
+            _same_definition(getattr(a, accessor), getattr(b, accessor), seen)
+            for accessor in ('fget', 'fset', 'fdel')
+        )
+    return _same_definition(a, b, seen)
+
+def _same_function(a: FunctionType, b: FunctionType, seen: Set[Tuple[int, int]]) -> bool:
+    if a.__code__ != b.__code__:
+        return False
+    if not (_same_definition(a.__defaults__, b.__defaults__, seen) and _same_definition(a.__kwdefaults__, b.__kwdefaults__, seen)):
+        return False
+    closure_a, closure_b = a.__closure__ or (), b.__closure__ or ()
+    if len(closure_a) != len(closure_b):
+        return False
+    for cell_a, cell_b in zip(closure_a, closure_b):
+        if not _same_definition(_cell_contents(cell_a), _cell_contents(cell_b), seen):
+            return False
+    if a.__globals__ is not b.__globals__:
+        # The same code in a reloaded module may call e.g. a helper function which changed.
+        for name in _global_names(a.__code__):
+            if name in a.__globals__ and not _same_definition(a.__globals__[name], b.__globals__.get(name), seen):
+                return False
+    return True
+
+_EMPTY_CELL = object()
+
+def _cell_contents(cell) -> Any:
+    try:
+        return cell.cell_contents
+    except ValueError:
+        return _EMPTY_CELL
+
+def _global_names(code: CodeType) -> Iterator[str]:
+    """ The names which the code (including nested functions) may look up in its globals. """
+    yield from code.co_names
+    for const in code.co_consts:
+        if isinstance(const, CodeType):
+            yield from _global_names(const)
@@ -0,0 +1,145 @@
+from dataclasses import dataclass
+from typing import Callable, ContextManager, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, TypeVar
+import multiprocessing
+import queue
+import traceback
+
+from rlbot.setup_manager import SetupManager, setup_manager_context
+
+from rlbottraining.backends.simulation_backend import SimulationBackend
+from rlbottraining.exercise_runner import run_playlist, RenderPolicy
+from rlbottraining.history.exercise_result import ExerciseResult
+from rlbottraining.training_exercise import TrainingExercise, Playlist
+
+"""
+This module runs the exercises of a playlist in several worker processes at once.
+Each worker owns its own game, which it gets from a SetupManager context,
+or its own simulation backend (e.g. HeadlessBackend).
+
+Note: rlbot seeds the random number generator of every exercise with the same seed,
+regardless of where the exercise is in the playlist. Therefore the results only
+depend on the seed, not on how the playlist is split between workers.
+"""
+
+SetupManagerContextFactory = Callable[[], ContextManager[SetupManager]]
+BackendFactory = Callable[[], SimulationBackend]
+T = TypeVar('T')
+
+
+def run_playlist_in_parallel(playlist: Playlist, seed: int = 4, num_workers: int = 2,
+    setup_manager_context_factory: SetupManagerContextFactory = setup_manager_context,
+    render_policy=RenderPolicy.DEFAULT, backend_factory: Optional[BackendFactory] = None) -> Iterator[ExerciseResult]:
+    """
+    Like exercise_runner.run_playlist() but the exercises are sharded across num_workers processes.
+    The results are yielded in playlist order as soon as all the previous ones are available.
+    If a backend_factory is given, each worker runs its exercises on the backend it creates
+    instead of in the game from setup_manager_context_factory.
+    The exercises and factories need to be picklable.
+    """
+    assert num_workers > 0
+    exercises = list(playlist)
+    mp_context = multiprocessing.get_context('spawn')
+    result_queue = mp_context.Queue()
+    workers = [
+        mp_context.Process(
+            target=_run_shard,
+            args=(
+                [(i, exercises[i]) for i in shard],
+                seed,
+                setup_manager_context_factory,
+                backend_factory,
+                render_policy,
+                result_queue,
+            ),
+            daemon=True,
+        )
+        for shard in shard_playlist_indices(len(exercises), num_workers) if shard
+    ]
+    for worker in workers:
+        worker.start()
+    try:
+        yield from merge_in_playlist_order(
+            _receive_results(result_queue, len(exercises), workers),
+            len(exercises)
+        )
+    finally:
+        for worker in workers:
+            if worker.is_alive():
+                worker.terminate()
+            worker.join()
+
+
+def shard_playlist_indices(num_exercises: int, num_workers: int) -> List[range]:
+    """
+    Splits the playlist into contiguous chunks of (almost) equal size.
+    Contiguous chunks keep exercises which share a match config together,
+    which avoids restarting the match in between.
+    """
+    return [
+        range(i * num_exercises // num_workers, (i + 1) * num_exercises // num_workers)
+        for i in range(num_workers)
+    ]
+
+
+def merge_in_playlist_order(indexed_items: Iterable[Tuple[int, T]], num_items: int) -> Iterator[T]:
+    """
+    Yields the items ordered by their index, given that every index in range(num_items) arrives once.
+    """
+    pending: Dict[int, T] = {}
+    next_index = 0
+    for index, item in indexed_items:
+        assert 0 <= index < num_items and index not in pending, f'unexpected playlist index: {index}'
+        pending[index] = item
+        while next_index in pending:
+            yield pending.pop(next_index)
+            next_index += 1
+        if next_index == num_items:
+            return
+    assert next_index == num_items, f'Only got results for {next_index} out of {num_items} exercises.'
+
+
+@dataclass
+class WorkerFailure:
+    traceback_string: str
+
+
+class WorkerFailedException(Exception):
+    pass
+
+
+def _receive_results(result_queue, num_results: int, workers: List[multiprocessing.Process]) -> Iterator[Tuple[int, ExerciseResult]]:
+    for _ in range(num_results):
+        while True:
+            try:
+                message = result_queue.get(timeout=1.0)
+                break
+            except queue.Empty:
+                # Note: a worker which exited normally has already sent all its results.
+                if not any(worker.is_alive() for worker in workers):
+                    raise WorkerFailedException('All worker processes exited before sending all results.')
+        if isinstance(message, WorkerFailure):
+            raise WorkerFailedException('A worker process failed:\n' + message.traceback_string)
+        yield message
+
+
+def _run_shard(indexed_exercises: Sequence[Tuple[int, TrainingExercise]], seed: int,
+    setup_manager_context_factory: SetupManagerContextFactory, backend_factory: Optional[BackendFactory],
+    render_policy, result_queue):
+    exercises = [exercise for _, exercise in indexed_exercises]
+    try:
+        if backend_factory:
+            _send_results(indexed_exercises, run_playlist(exercises, seed, backend=backend_factory()), result_queue)
+            return
+        with setup_manager_context_factory() as setup_manager:
+            _send_results(indexed_exercises, run_playlist(exercises, seed, setup_manager, render_policy), result_queue)
+    except Exception:
+        result_queue.put(WorkerFailure(traceback.format_exc()))
+
+
+def _send_results(indexed_exercises: Sequence[Tuple[int, TrainingExercise]], results: Iterable[ExerciseResult], result_queue):
+    for (playlist_index, _), result in zip(indexed_exercises, results):
+        result.reproduction_info.playlist_index = playlist_index
+        # Matchcomms don't survive being sent to another process.
+        result.exercise.matchcomms_factory = None
+        result.exercise._matchcomms = None
+        result_queue.put((playlist_index, result))
@@ -42,8 +42,16 @@ class HistoryPaths:
     # Files in here should be immutable with the caveat of data retention.
     authoritative_data = Path('authoritative_data')
     exercise_results = authoritative_data / 'exercise_results'
+    result_log = authoritative_data / 'result_log'  # segments of newline-delimited results, see history/result_log.py
+    sqlite_store = authoritative_data / 'exercise_results.sqlite3'  # see history/sqlite_store.py
+    tick_captures = authoritative_data / 'tick_captures'  # <run_id>.ticks files, see replay/tick_capture.py
     additional_website_code = authoritative_data / 'additional_website_code.manual_symlink'  # points to python files or symlinks to python files with contain Aggregators.
 
+    # Derived from the authoritative_data, such that the website can be started quicker. Safe to delete.
+    aggregator_snapshot = Path('aggregator_snapshot.json')
+    website_render_manifest = Path('website_render_manifest.json')
+    live_feed_address = Path('live_feed_address.txt')  # host:port of a running dev server, see history/live_feed.py
+
     class Website:
         _website_dir = Path('website')
         data_dir = Path('data')
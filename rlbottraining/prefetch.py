@@ -0,0 +1,111 @@
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from random import Random
+from typing import Dict, Iterator, Optional, Sequence, Set
+
+from rlbot.utils.game_state_util import GameState
+
+from rlbottraining.rng import SeededRandomNumberGenerator
+from rlbottraining.training_exercise import TrainingExercise
+from rlbottraining.training_exercise_adapter import TrainingExerciseAdapter
+
+"""
+Computes the GameStates of upcoming exercises on a worker thread while the current exercise runs,
+such that the gap between exercises is not spent in make_game_state() (e.g. parsing imported shots).
+
+This relies on rlbot seeding a new Random with the same seed for the setup() of each exercise:
+the game state of an exercise only depends on its definition and the seed.
+Exercises for which that is not the case (e.g. make_game_state() depends on on_briefing())
+can opt out via TrainingExercise.prefetch_game_state.
+"""
+
+
+class GameStatePrefetcher:
+    """
+    Keeps the game states of the next `depth` exercises (in the order they run) in flight.
+    Use game_state_prefetcher() rather than creating one directly.
+    """
+
+    def __init__(self, exercises: Sequence[TrainingExerciseAdapter], seed: int, depth: int):
+        assert depth >= 1
+        self.exercises = list(exercises)
+        self.seed = seed
+        self.depth = depth
+        self._seeded_rng_state = Random(seed).getstate()
+        self._indices: Dict[int, int] = {id(exercise): i for i, exercise in enumerate(self.exercises)}
+        self._futures: Dict[int, Future] = {}  # By index in exercises. Only touched by the thread which runs the exercises.
+        self._taken: Set[int] = set()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='game_state_prefetch')
+        self._schedule(0)
+
+    def take(self, exercise: TrainingExerciseAdapter, rng: Random) -> Optional[GameState]:
+        """
+        Returns the prefetched game state for the setup() of the exercise,
+        or None if it has to be made on the spot: e.g. when rng is not seeded like we assumed
+        or when prefetching it failed (making it again gives the usual exception and traceback).
+        """
+        index = self._indices.get(id(exercise))
+        if index is None:
+            return None
+        self._taken.add(index)
+        self._schedule(index + 1)
+        future = self._futures.pop(index, None)
+        if future is None:
+            return None
+        if rng.getstate() != self._seeded_rng_state:
+            future.cancel()
+            return None
+        try:
+            return future.result()
+        except Exception:
+            return None
+
+    def invalidate(self, exercise: TrainingExercise):
+        """
+        Discards the prefetched game states of the exercise, e.g. because it was hot swapped (see hot_swap.py),
+        and prefetches them again.
+        """
+        for index, adapter in enumerate(self.exercises):
+            if adapter.exercise is not exercise or index not in self._futures:
+                continue
+            self._futures.pop(index).cancel()  # A game state which is being made right now will be ignored.
+            self._submit(index)
+
+    def close(self):
+        for future in self._futures.values():
+            future.cancel()
+        self._futures.clear()
+        self._executor.shutdown(wait=True)
+
+    def _schedule(self, start: int):
+        for index in range(start, min(start + self.depth, len(self.exercises))):
+            if index not in self._futures and index not in self._taken:
+                self._submit(index)
+
+    def _submit(self, index: int):
+        exercise = self.exercises[index].exercise
+        if not exercise.prefetch_game_state:
+            return
+        rng = Random()
+        rng.setstate(self._seeded_rng_state)
+        self._futures[index] = self._executor.submit(exercise.make_game_state, SeededRandomNumberGenerator(rng))
+
+
+@contextmanager
+def game_state_prefetcher(exercises: Sequence[TrainingExerciseAdapter], seed: int, depth: int) -> Iterator[Optional[GameStatePrefetcher]]:
+    """
+    Prefetches the game states of the exercises (which are about to be run with the seed) while the context is active.
+    Provides None if depth is 0, which disables prefetching.
+    """
+    if depth <= 0:
+        yield None
+        return
+    prefetcher = GameStatePrefetcher(exercises, seed, depth)
+    for exercise in exercises:
+        exercise.game_state_prefetcher = prefetcher
+    try:
+        yield prefetcher
+    finally:
+        for exercise in exercises:
+            exercise.game_state_prefetcher = None
+        prefetcher.close()
@@ -0,0 +1,234 @@
+from functools import partial
+from typing import Callable, Dict, Hashable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from rlbot.training.training import Pass, Grade
+from rlbot.utils.structures.game_data_struct import GameTickPacket
+
+from rlbottraining.common_graders.compound_grader import CompoundGrader
+from rlbottraining.common_graders.goal_grader import PassOnBallGoingAwayFromGoal, PassOnGoalForAllyTeam, WrongGoalFail
+from rlbottraining.common_graders.kickoff_grader import PassOnBallMoveFromKickoff
+from rlbottraining.common_graders.rl_graders import FailOnBallOnGround, RocketLeagueStrikerGrader
+from rlbottraining.common_graders.rule_grader import (
+    RuleGrader, ball_going_away_from_goal_definition, ball_on_ground_definition, goal_definitions,
+    kickoff_definition, timeout_definition
+)
+from rlbottraining.common_graders.timeout import FailOnTimeout, PassOnTimeout
+from rlbottraining.grading.grader import Grader
+from rlbottraining.grading.grader_dsl import compile_rules
+from rlbottraining.grading.tick_batch import TickBatch
+from rlbottraining.grading.training_tick_packet import TrainingTickPacket
+from rlbottraining.replay.replay_runner import FailDueToEndOfReplay, grade_ticks
+
+"""
+Grades many recorded runs at once: Rather than calling on_tick() for every tick of every run,
+graders are translated into rules (see grader_dsl.py) which NumPy evaluates for all ticks
+of all runs which use the same rules in one go.
+Graders which can not be translated are graded tick by tick like replay_runner.grade_replay() does.
+"""
+
+GradeFactory = Callable[[], Grade]
+
+
+class BatchPlan:
+    """
+    Evaluates a grader for every tick of a TickBatch.
+    Plans with the same key evaluate the same way and only differ in the grades they make.
+    """
+
+    key: Hashable
+    field_names: List[str]  # The tick_fields which evaluate() reads.
+    grade_factories: List[GradeFactory]
+    is_pass: np.ndarray  # Whether each of the grade_factories makes a Pass.
+
+    def evaluate(self, batch: TickBatch) -> np.ndarray:
+        """ Returns the index into grade_factories for each (run, tick), -1 where the grader would return None. """
+        raise NotImplementedError()
+
+
+class RulePlan(BatchPlan):
+    def __init__(self, rules: str, grade_factories: List[GradeFactory]):
+        self.compiled = compile_rules(rules)
+        assert len(grade_factories) == len(self.compiled.rules)
+        self.key = rules
+        self.field_names = self.compiled.field_names
+        self.grade_factories = grade_factories
+        self.is_pass = np.array([rule.outcome == 'Pass' for rule in self.compiled.rules])
+
+    def evaluate(self, batch: TickBatch) -> np.ndarray:
+        return self.compiled.evaluate_batch(batch)
+
+    @staticmethod
+    def from_rules(definitions: str, rules: List[Tuple[str, GradeFactory]]) -> 'RulePlan':
+        """ Each rule comes with the factory of the grade it stands for. """
+        return RulePlan(definitions + ''.join(f'\n{rule}' for rule, _ in rules), [make_grade for _, make_grade in rules])
+
+
+class CompoundPlan(BatchPlan):
+    """ Picks the grade of its children like CompoundGrader: The first Fail, otherwise the first Pass. """
+
+    def __init__(self, children: List[BatchPlan]):
+        self.children = children
+        self.key = ('compound',) + tuple(child.key for child in children)
+        self.field_names = sorted({name for child in children for name in child.field_names})
+        self.grade_factories = [make_grade for child in children for make_grade in child.grade_factories]
+        self.is_pass = np.concatenate([child.is_pass for child in children])
+
+    def evaluate(self, batch: TickBatch) -> np.ndarray:
+        offsets = np.cumsum([0] + [len(child.grade_factories) for child in self.children])
+        children_fired = [child.evaluate(batch) for child in self.children]
+        fired = np.full(batch.shape, -1)
+        for pick_pass in [True, False]:  # Fails are assigned last such that they win.
+            for offset, child, child_fired in reversed(list(zip(offsets, self.children, children_fired))):
+                mask = (child_fired >= 0) & (child.is_pass[child_fired] == pick_pass)
+                fired[mask] = child_fired[mask] + offset
+        return fired
+
+
+BatchPlanner = Callable[[Grader], Optional[BatchPlan]]
+
+# Grader.on_tick function -> makes the plan for a grader with that on_tick() implementation.
+# Planners return None for graders which they can not translate, e.g. ones which already saw ticks.
+batch_planners: Dict[Callable, BatchPlanner] = {}
+
+def batch_plan(grader: Grader) -> Optional[BatchPlan]:
+    """ Returns the plan to grade with the grader in batches, or None if it can only be graded tick by tick. """
+    if 'on_tick' in getattr(grader, '__dict__', {}):
+        return None  # e.g. instrumented by a GraderProfiler.
+    planner = batch_planners.get(type(grader).on_tick)
+    return planner(grader) if planner else None
+
+def _batch_planner(grader_class: type):
+    def register(planner: BatchPlanner) -> BatchPlanner:
+        batch_planners[grader_class.on_tick] = planner
+        return planner
+    return register
+
+@_batch_planner(FailOnTimeout)
+def _fail_on_timeout_plan(grader: FailOnTimeout) -> Optional[BatchPlan]:
+    if grader.initial_seconds_elapsed is not None:
+        return None
+    return RulePlan.from_rules(timeout_definition(grader.max_duration_seconds), [
+        ('timed_out -> Fail', partial(grader.FailDueToTimeout, grader.max_duration_seconds)),
+    ])
+
+@_batch_planner(PassOnTimeout)
+def _pass_on_timeout_plan(grader: PassOnTimeout) -> Optional[BatchPlan]:
+    if grader.initial_seconds_elapsed is not None:
+        return None
+    return RulePlan.from_rules(timeout_definition(grader.max_duration_seconds), [
+        ('timed_out -> Pass', partial(grader.PassDueToTimeout, grader.max_duration_seconds)),
+    ])
+
+@_batch_planner(PassOnGoalForAllyTeam)
+def _goal_plan(grader: PassOnGoalForAllyTeam) -> Optional[BatchPlan]:
+    if grader.init_score is not None or grader.ally_team not in (0, 1):
+        return None
+    return RulePlan.from_rules(goal_definitions(grader.ally_team), [
+        ('ally_goal -> Pass', Pass),
+        ('wrong_goal -> Fail', WrongGoalFail),
+    ])
+
+@_batch_planner(PassOnBallGoingAwayFromGoal)
+def _ball_going_away_from_goal_plan(grader: PassOnBallGoingAwayFromGoal) -> Optional[BatchPlan]:
+    if grader.consequtive_good_ticks != 0 or grader.ally_team not in (0, 1):
+        return None
+    return RulePlan.from_rules(ball_going_away_from_goal_definition(grader.ally_team), [
+        (f'ball_going_away_from_goal for {grader.REQUIRED_CONSECUTIVE_TICKS} ticks -> Pass', Pass),
+    ])
+
+@_batch_planner(FailOnBallOnGround)
+def _ball_on_ground_plan(grader: FailOnBallOnGround) -> Optional[BatchPlan]:
+    return RulePlan.from_rules(ball_on_ground_definition, [
+        ('ball_on_ground -> Fail', grader.FailDueToGroundHit),
+    ])
+
+@_batch_planner(PassOnBallMoveFromKickoff)
+def _kickoff_plan(grader: PassOnBallMoveFromKickoff) -> Optional[BatchPlan]:
+    if grader.initial_seconds_elapsed is not None or grader.ball_moved_flag:
+        return None
+    return RulePlan.from_rules(kickoff_definition(grader.min_exercise_duration, grader.min_ball_displacement), [
+        ('ball_moved_after_duration -> Pass', grader.PassDueToMovedBall),
+    ])
+
+@_batch_planner(RuleGrader)
+def _rule_grader_plan(grader: RuleGrader) -> Optional[BatchPlan]:
+    if not grader.has_initial_state():
+        return None
+    compiled = compile_rules(grader.rules)
+    return RulePlan(grader.rules, [partial(grader.make_grade, rule) for rule in compiled.rules])
+
+@_batch_planner(CompoundGrader)
+def _compound_plan(grader: CompoundGrader) -> Optional[BatchPlan]:
+    order = grader.evaluation_order or range(len(grader.graders))
+    children = [batch_plan(grader.graders[i]) for i in order]
+    if not children or None in children:
+        return None
+    return CompoundPlan(children)
+
+@_batch_planner(RocketLeagueStrikerGrader)
+def _rocket_league_striker_plan(grader: RocketLeagueStrikerGrader) -> Optional[BatchPlan]:
+    goal_grader, ground_grader, timeout_grader = grader.graders
+    child_types = [PassOnGoalForAllyTeam, FailOnBallOnGround, FailOnTimeout]
+    if any(type(child).on_tick is not child_type.on_tick or batch_plan(child) is None
+            for child, child_type in zip(grader.graders, child_types)):
+        return None
+    hit_ground = ground_grader.FailDueToGroundHit
+    rules = [('ally_goal -> Pass', Pass)]
+    if grader.timeout_override:
+        rules.append(('timed_out -> Fail', partial(timeout_grader.FailDueToTimeout, timeout_grader.max_duration_seconds)))
+    rules.append(('timed_out and ball_on_ground -> Fail', hit_ground))
+    if grader.ground_override:
+        rules.append(('ball_on_ground -> Fail', hit_ground))
+    definitions = (goal_definitions(goal_grader.ally_team) + timeout_definition(timeout_grader.max_duration_seconds)
+        + ball_on_ground_definition)
+    return RulePlan.from_rules(definitions, rules)
+
+
+def first_grades(fired: np.ndarray, valid: np.ndarray) -> np.ndarray:
+    """ The first valid grade index of each run in the result of BatchPlan.evaluate(), -1 if there is none. """
+    graded = (fired >= 0) & valid
+    first_tick = np.argmax(graded, axis=1)
+    return np.where(graded.any(axis=1), fired[np.arange(len(fired)), first_tick], -1)
+
+def grade_recorded_runs(graders: Sequence[Grader], runs: Sequence[np.ndarray], max_runs_per_batch: int = 1024) -> List[Grade]:
+    """
+    Returns the grade which replay_runner.grade_replay() would give for each run, if the run's exercise
+    had the grader at the same index. Each run is an array of its packets, see tick_capture.read_tick_capture_array().
+    The graders are expected to be new, like the grader of an exercise which has not been run yet.
+
+    Note: PassOnGoalForAllyTeam re-initializes its scores if one decreases, whereas its batch plan
+    keeps comparing to the scores of the first tick. Scores do not decrease within a recorded run.
+    """
+    assert len(graders) == len(runs)
+    grades: List[Optional[Grade]] = [None] * len(runs)
+    plans = [batch_plan(grader) for grader in graders]
+    groups: Dict[Hashable, List[int]] = {}
+    for i, plan in enumerate(plans):
+        if plan is None:
+            grades[i] = _grade_tick_by_tick(graders[i], runs[i])
+        else:
+            groups.setdefault(plan.key, []).append(i)
+
+    for indices in groups.values():
+        for start in range(0, len(indices), max_runs_per_batch):
+            batch_indices = indices[start:start + max_runs_per_batch]
+            plan = plans[batch_indices[0]]
+            batch_runs = [runs[i] for i in batch_indices]
+            batch = TickBatch.from_runs(batch_runs, plan.field_names)
+            for i, fired in zip(batch_indices, first_grades(plan.evaluate(batch), batch.valid)):
+                grades[i] = plans[i].grade_factories[fired]() if fired >= 0 else FailDueToEndOfReplay()
+    return grades
+
+def _grade_tick_by_tick(grader: Grader, packets: np.ndarray) -> Grade:
+    tick = TrainingTickPacket()
+    def on_tick(game_tick_packet: GameTickPacket) -> Optional[Grade]:
+        tick.update(game_tick_packet)
+        return grader.on_tick(tick)
+    return grade_ticks(on_tick, _packets_from_array(packets))
+
+def _packets_from_array(packets: np.ndarray) -> Iterator[GameTickPacket]:
+    packets = np.ascontiguousarray(packets)
+    for i in range(len(packets)):
+        yield GameTickPacket.from_buffer_copy(packets, i * packets.itemsize)
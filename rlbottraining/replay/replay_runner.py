@@ -0,0 +1,75 @@
+from random import Random
+from typing import Callable, Iterable, Iterator, Optional
+import traceback
+
+from rlbot.training.training import Fail, FailDueToExerciseException, Grade
+from rlbot.utils.structures.game_data_struct import GameTickPacket
+
+from rlbottraining.history.exercise_result import ExerciseResult, ReproductionInfo
+from rlbottraining.training_exercise import TrainingExercise, Playlist
+from rlbottraining.training_exercise_adapter import TrainingExerciseAdapter
+
+"""
+This module grades exercises against previously recorded GameTickPackets.
+No Rocket League (or any other game) is required which makes it possible
+to re-grade past runs with new Graders as fast as the CPU allows.
+"""
+
+TickStream = Iterable[GameTickPacket]
+
+
+class FailDueToEndOfReplay(Fail):
+    """ Indicates that the recorded ticks ran out before the Grader made a decision. """
+
+    def __repr__(self):
+        return f'{super().__repr__()}: The replay ended before the exercise was graded.'
+
+
+def grade_replay(exercise: TrainingExercise, tick_stream: TickStream, seed: int = 4) -> Grade:
+    """
+    Feeds the tick_stream through the exercise as if it was coming from the game.
+    This mirrors what rlbot's run_exercises() does minus the game:
+    The game state is set up with the same seed, briefing is skipped as there
+    are no bots to brief and on_tick() is called for every tick.
+    A tick capture holds exactly the packets which on_tick() got during the run, so none are skipped here.
+    """
+    adapter = TrainingExerciseAdapter(exercise)
+    rng = Random()
+    rng.seed(seed)
+    try:
+        adapter.setup(rng)
+    except Exception as e:
+        return FailDueToExerciseException(e, traceback.format_exc())
+    return grade_ticks(adapter.on_tick, tick_stream)
+
+
+def grade_ticks(on_tick: Callable[[GameTickPacket], Optional[Grade]], tick_stream: TickStream) -> Grade:
+    """
+    Calls on_tick() for each tick until it returns a grade.
+    """
+    for game_tick_packet in tick_stream:
+        try:
+            grade = on_tick(game_tick_packet)
+        except Exception as e:
+            return FailDueToExerciseException(e, traceback.format_exc())
+        if grade is not None:
+            return grade
+    return FailDueToEndOfReplay()
+
+
+def run_replayed_playlist(playlist: Playlist, tick_streams: Iterable[TickStream], seed: int = 4,
+    python_file_with_playlist: Optional[str] = None) -> Iterator[ExerciseResult]:
+    """
+    Grades the exercises in the playlist against the tick_stream at the same index
+    and returns the results like exercise_runner.run_playlist() does.
+    """
+    for i, (exercise, tick_stream) in enumerate(zip(playlist, tick_streams)):
+        yield ExerciseResult(
+            grade=grade_replay(exercise, tick_stream, seed),
+            exercise=exercise,
+            reproduction_info=ReproductionInfo(
+                seed=seed,
+                python_file_with_playlist=python_file_with_playlist,
+                playlist_index=i,
+            )
+        )
@@ -0,0 +1,134 @@
+from pathlib import Path
+from typing import Iterator, Optional
+import ctypes
+import mmap
+import struct
+import uuid
+
+import numpy as np
+
+from rlbot.utils.structures.game_data_struct import GameTickPacket
+
+from rlbottraining.grading.packet_arrays import dtype_from_ctypes
+
+"""
+A tick capture is a binary file containing every GameTickPacket an exercise saw.
+It consists of a fixed-size header followed by the raw ctypes bytes of each packet.
+The captures can be fed back into the graders via replay_runner.grade_replay() or batch_grading.py.
+"""
+
+CAPTURE_MAGIC = b'RLBTICKS'
+CAPTURE_VERSION = 1
+CAPTURE_FILE_SUFFIX = '.ticks'
+HEADER_SIZE = 64
+_header = struct.Struct('<8sIIQ')  # magic, version, record_size, num_records
+_num_records_offset = 16
+assert _header.size <= HEADER_SIZE
+
+
+class TickRecorder:
+    """
+    Appends packets to a memory-mapped file which grows in preallocated chunks.
+    Recording a tick is a single memmove, so this is cheap enough to do on every tick.
+    The file is only created once the first tick is recorded.
+    """
+
+    def __init__(self, capture_dir: Path, ticks_per_chunk: int = 1024):
+        assert ticks_per_chunk > 0
+        self.capture_dir = Path(capture_dir)
+        self.ticks_per_chunk = ticks_per_chunk
+        self.record_size = ctypes.sizeof(GameTickPacket)
+        self.num_records = 0
+        self.partial_file_path: Optional[Path] = None
+        self._file = None
+        self._mmap: Optional[mmap.mmap] = None
+        self._mapped_buffer = None  # ctypes view into _mmap which gives us a stable address.
+        self._num_records_field = None  # the num_records in the header.
+        self._base_address = 0
+        self._capacity = 0
+
+    def record(self, game_tick_packet: GameTickPacket):
+        if self.num_records == self._capacity:
+            self._grow()
+        ctypes.memmove(
+            self._base_address + HEADER_SIZE + self.num_records * self.record_size,
+            ctypes.addressof(game_tick_packet),
+            self.record_size
+        )
+        self.num_records += 1
+        self._num_records_field.value = self.num_records
+
+    def save(self, file_path: Path):
+        """
+        Finishes the recording and moves it to file_path.
+        Does nothing if no tick has been recorded.
+        """
+        if self._file is None:
+            return
+        self._close_mapping()
+        self._file.truncate(HEADER_SIZE + self.num_records * self.record_size)
+        self._file.close()
+        self._file = None
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        self.partial_file_path.replace(file_path)
+
+    def discard(self):
+        if self._file is None:
+            return
+        self._close_mapping()
+        self._file.close()
+        self._file = None
+        self.partial_file_path.unlink()
+
+    def _grow(self):
+        if self._file is None:
+            self.capture_dir.mkdir(parents=True, exist_ok=True)
+            self.partial_file_path = self.capture_dir / f'{uuid.uuid4().hex}{CAPTURE_FILE_SUFFIX}.partial'
+            self._file = open(self.partial_file_path, 'w+b')
+        else:
+            self._close_mapping()
+        self._capacity += self.ticks_per_chunk
+        size = HEADER_SIZE + self._capacity * self.record_size
+        self._file.truncate(size)
+        self._mmap = mmap.mmap(self._file.fileno(), size)
+        _header.pack_into(self._mmap, 0, CAPTURE_MAGIC, CAPTURE_VERSION, self.record_size, self.num_records)
+        self._mapped_buffer = (ctypes.c_char * size).from_buffer(self._mmap)
+        self._base_address = ctypes.addressof(self._mapped_buffer)
+        self._num_records_field = ctypes.c_uint64.from_buffer(self._mmap, _num_records_offset)
+
+    def _close_mapping(self):
+        # The ctypes views need to be released before the mmap can be closed.
+        self._mapped_buffer = None
+        self._num_records_field = None
+        self._mmap.close()
+        self._mmap = None
+
+
+def read_tick_capture(file_path: Path) -> Iterator[GameTickPacket]:
+    """
+    Yields a copy of each GameTickPacket in the capture in the order they were recorded.
+    """
+    with open(file_path, 'rb') as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            num_records = _read_header(mapped, file_path)
+            for i in range(num_records):
+                yield GameTickPacket.from_buffer_copy(mapped, HEADER_SIZE + i * ctypes.sizeof(GameTickPacket))
+
+
+def read_tick_capture_array(file_path: Path) -> np.ndarray:
+    """
+    Returns all packets in the capture as one array with the dtype of packet_arrays.dtype_from_ctypes(GameTickPacket),
+    e.g. for batch_grading.py.
+    """
+    with open(file_path, 'rb') as f:
+        num_records = _read_header(f.read(HEADER_SIZE), file_path)
+        return np.fromfile(f, dtype=dtype_from_ctypes(GameTickPacket), count=num_records)
+
+
+def _read_header(header: bytes, file_path: Path) -> int:
+    """ Checks that the capture can be read and returns its number of records. """
+    magic, version, record_size, num_records = _header.unpack_from(header, 0)
+    assert magic == CAPTURE_MAGIC, f'{file_path} is not a tick capture.'
+    assert version == CAPTURE_VERSION, f'Unsupported tick capture version {version} in {file_path}'
+    assert record_size == ctypes.sizeof(GameTickPacket), f'{file_path} was recorded with a different GameTickPacket layout.'
+    return num_records
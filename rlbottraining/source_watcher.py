@@ -0,0 +1,72 @@
+from pathlib import Path
+from typing import Callable, Optional
+import threading
+import time
+
+from watchdog.events import FileSystemEvent, FileSystemEventHandler
+from watchdog.observers import Observer
+
+"""
+Notices changes to the python files of an exercise module, such that run_module()
+only reloads the module when there is something new to load (see ReloadPolicy.ON_FILE_CHANGE).
+"""
+
+
+class SourceChangeWatcher(FileSystemEventHandler):
+    """
+    Watches the .py files in a directory and its subdirectories.
+    Editors tend to write a file in several steps (e.g. truncate, write, rename),
+    so a change only counts once there were no further changes for debounce_seconds.
+    Usage:
+        with SourceChangeWatcher(directory) as watcher:
+            ...
+            if watcher.take_changes():
+                reload()
+    """
+
+    def __init__(self, directory: Path, debounce_seconds: float = 0.5, clock: Callable[[], float] = time.monotonic):
+        self.directory = Path(directory)
+        self.debounce_seconds = debounce_seconds
+        self.clock = clock
+        self._last_change_time: Optional[float] = None  # None while there are no pending changes.
+        self._lock = threading.Lock()  # on_any_event() is called on the observer's thread.
+        self._observer: Optional[Observer] = None
+
+    def __enter__(self) -> 'SourceChangeWatcher':
+        self._observer = Observer()
+        self._observer.schedule(self, str(self.directory), recursive=True)
+        self._observer.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._observer.stop()
+        self._observer.join()
+        self._observer = None
+
+    def on_any_event(self, event: FileSystemEvent):
+        if event.is_directory: return
+        # Moves count for both ends, e.g. editors which save by renaming a temporary file over the original.
+        paths = [event.src_path, getattr(event, 'dest_path', '')]
+        if not any(is_python_source(path) for path in paths): return
+        with self._lock:
+            self._last_change_time = self.clock()
+
+    def take_changes(self) -> bool:
+        """
+        Returns whether there were (settled) changes since the last call which returned True.
+        Cheap enough to call after every exercise.
+        """
+        last_change_time = self._last_change_time
+        if last_change_time is None:
+            return False
+        if self.clock() - last_change_time < self.debounce_seconds:
+            return False  # Let the changes settle. We'll pick them up on a later call.
+        with self._lock:
+            if self._last_change_time != last_change_time:
+                return False  # Changed in the meantime.
+            self._last_change_time = None
+        return True
+
+
+def is_python_source(path: str) -> bool:
+    return path.endswith('.py') and '__pycache__' not in path
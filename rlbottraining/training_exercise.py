@@ -1,5 +1,5 @@
 from dataclasses import dataclass, field
-from typing import Iterable, Optional, Callable
+from typing import Callable, ClassVar, Iterable, Optional
 
 from rlbot.matchcomms.client import MatchcommsClient
 from rlbot.matchconfig.match_config import MatchConfig
@@ -18,8 +18,14 @@ class TrainingExercise(Metric):
     match_config: MatchConfig = field(default_factory=make_default_match_config)
 
     # MatchcommsClient connected to the current match
-    _matchcomms: Optional[MatchcommsClient] = None
-    matchcomms_factory: Callable[[], MatchcommsClient] = None  # Initialized externally.
+    # Runtime state rather than part of the definition (compare=False), which is kept by hot_swap().
+    _matchcomms: Optional[MatchcommsClient] = field(default=None, compare=False)
+    matchcomms_factory: Callable[[], MatchcommsClient] = field(default=None, compare=False)  # Initialized externally.
+
+    # Whether make_game_state() may be called ahead of time on another thread, see prefetch.py
+    # Override with False if it depends on more than the rng and the fields, e.g. on something on_briefing() does.
+    prefetch_game_state: ClassVar[bool] = True
+
     def get_matchcomms(self) -> MatchcommsClient:
         if (not self._matchcomms) or (not self._matchcomms.thread.is_alive()):
             assert self.matchcomms_factory
@@ -11,8 +11,11 @@ from rlbot.utils.rendering.rendering_manager import RenderingManager
 from rlbot.utils.structures.game_data_struct import GameTickPacket
 
 from rlbottraining.grading.grader import Grader
+from rlbottraining.grading.grader_profiler import GraderProfile, GraderProfiler
+from rlbottraining.grading.tick_history import TickHistory
 from rlbottraining.grading.training_tick_packet import TrainingTickPacket
 from rlbottraining.history.exercise_result import ExerciseResult
+from rlbottraining.replay.tick_capture import TickRecorder
 from rlbottraining.rng import SeededRandomNumberGenerator
 from rlbottraining.training_exercise import TrainingExercise
 
@@ -22,7 +25,8 @@ class TrainingExerciseAdapter(RLBotExercise):
     and the convenient to use RLBotTraining API.
     It does this by wrapping the TrainingExercise and unwrapping the result.
     """
-    def __init__(self, exercise: TrainingExercise):
+    def __init__(self, exercise: TrainingExercise, tick_recorder: Optional[TickRecorder] = None,
+            grader_profiler: Optional[GraderProfiler] = None, tick_history: Optional[TickHistory] = None):
         # Do some sanity checks that the object looks correct
         # In case the implementer of the exercise made a mistake with ordered arguments.
         # note: prefer to use keyword arguments when using dataclasses
@@ -31,7 +35,15 @@ class TrainingExerciseAdapter(RLBotExercise):
         assert isinstance(exercise.name, str)
         assert isinstance(exercise.match_config, MatchConfig)
         self.exercise = exercise
-        self.training_tick_packet = TrainingTickPacket()
+        # Exercises which run one after another can share a tick_history, rather than each holding one.
+        self.training_tick_packet = TrainingTickPacket(tick_history)
+        self.tick_recorder = tick_recorder  # Opt-in recording of every tick this exercise sees.
+        self.grader_profiler = grader_profiler  # Opt-in timing of on_tick() and render(), see grader_profiler.py
+        self.game_state_prefetcher = None  # Opt-in, see prefetch.py
+        if grader_profiler:
+            grader_profiler.instrument(self, 'on_tick', 'TrainingExerciseAdapter.on_tick')
+            grader_profiler.instrument(self, 'render', 'TrainingExerciseAdapter.render')
+            grader_profiler.instrument_grader_tree(exercise.grader)
 
     def get_name(self) -> str:
         return self.exercise.name
@@ -40,11 +52,17 @@ class TrainingExerciseAdapter(RLBotExercise):
         return self.exercise.match_config
 
     def setup(self, rng: Random) -> GameState:
+        if self.game_state_prefetcher:
+            game_state = self.game_state_prefetcher.take(self, rng)
+            if game_state is not None:
+                return game_state
         return self.exercise.make_game_state(
             SeededRandomNumberGenerator(rng)
         )
 
     def on_tick(self, game_tick_packet: GameTickPacket) -> Optional[Grade]:
+        if self.tick_recorder:
+            self.tick_recorder.record(game_tick_packet)
         self.training_tick_packet.update(game_tick_packet)
         return self.exercise.grader.on_tick(self.training_tick_packet)
 
@@ -63,3 +81,9 @@ class TrainingExerciseAdapter(RLBotExercise):
 
     def render(self, renderer: RenderingManager):
         self.exercise.render(renderer)
+
+    def finish_grader_profile(self) -> Optional[GraderProfile]:
+        """ Stops profiling. Returns None unless a grader_profiler was given. """
+        if not self.grader_profiler:
+            return None
+        return self.grader_profiler.finish()
@@ -7,3 +7,25 @@ tests.test_grading ^
 tests.test_dataclasses ^
 tests.test_run_module_stubbed ^
 tests.test_common_exercises_quick ^
+tests.test_replay ^
+tests.test_tick_capture ^
+tests.test_parallel_runner ^
+tests.test_headless_backend ^
+tests.test_result_log ^
+tests.test_sqlite_store ^
+tests.test_server_snapshot ^
+tests.test_render_static ^
+tests.test_dev_server_cache ^
+tests.test_result_list_pages ^
+tests.test_live_feed ^
+tests.test_metric_json_encoder ^
+tests.test_packet_arrays ^
+tests.test_tick_history ^
+tests.test_grader_profiler ^
+tests.test_compound_grader ^
+tests.test_grader_dsl ^
+tests.test_batch_grading ^
+tests.test_snapshot ^
+tests.test_source_watcher ^
+tests.test_hot_swap ^
+tests.test_prefetch ^
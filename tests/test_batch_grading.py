@@ -0,0 +1,99 @@
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from typing import Optional
+import unittest
+
+import numpy as np
+
+from rlbot.training.training import Fail, Grade
+
+from rlbottraining.common_graders.compound_grader import CompoundGrader
+from rlbottraining.common_graders.goal_grader import GoalieGrader, StrikerGrader
+from rlbottraining.common_graders.kickoff_grader import KickoffGrader
+from rlbottraining.common_graders.rl_graders import RocketLeagueStrikerGrader
+from rlbottraining.common_graders.rule_grader import RuleGrader, kickoff_rules
+from rlbottraining.common_graders.timeout import FailOnTimeout, PassOnTimeout
+from rlbottraining.grading.grader import Grader
+from rlbottraining.grading.grader_dsl import compile_rules
+from rlbottraining.grading.tick_batch import TickBatch
+from rlbottraining.grading.training_tick_packet import TrainingTickPacket
+from rlbottraining.replay.batch_grading import batch_plan, grade_recorded_runs
+from rlbottraining.replay.replay_runner import grade_replay
+from rlbottraining.replay.tick_capture import TickRecorder, read_tick_capture_array
+
+from .test_grader_dsl import make_packet, record_headless_run, to_array
+from .test_headless_backend import BallFallingOnGround, BallRollingIntoGoal, DriveIntoBall, full_throttle
+from .test_replay import TimeoutExercise
+
+
+class FailOnHighBall(Grader):
+    """ Has no batch plan. """
+
+    def on_tick(self, tick: TrainingTickPacket) -> Optional[Grade]:
+        if tick.game_tick_packet.game_ball.physics.location.z > 500:
+            return Fail()
+
+
+class BatchGradingTest(unittest.TestCase):
+
+    def test_like_grade_replay(self):
+        runs = [
+            record_headless_run(BallRollingIntoGoal),
+            record_headless_run(BallFallingOnGround),
+            record_headless_run(DriveIntoBall, bot_controllers={0: full_throttle}),
+        ]
+        runs.append(runs[0][:30])  # Ends before a grade.
+        runs.append([runs[1][0]] * 3 + runs[1][:50])  # Repeated ticks are skipped.
+        make_graders = [
+            lambda: StrikerGrader(timeout_seconds=3),
+            lambda: StrikerGrader(ally_team=1),
+            lambda: GoalieGrader(timeout_seconds=2),
+            lambda: GoalieGrader(ally_team=1),
+            lambda: KickoffGrader(),
+            lambda: KickoffGrader(timeout_seconds=5, min_exercise_duration=.5, min_ball_displacement=300),
+            lambda: PassOnTimeout(1),
+            lambda: CompoundGrader([FailOnTimeout(2), FailOnHighBall()]),
+            lambda: CompoundGrader([PassOnTimeout(1), FailOnTimeout(1)], short_circuit=True),
+            lambda: RuleGrader(kickoff_rules(min_exercise_duration=.5)),
+        ] + [
+            lambda kwargs=kwargs: RocketLeagueStrikerGrader(**kwargs)
+            for timeout_override in [False, True]
+            for ground_override in [False, True]
+            for kwargs in [dict(timeout_seconds=2, timeout_override=timeout_override, ground_override=ground_override)]
+        ]
+        self.assertIsNone(batch_plan(make_graders[7]()))
+
+        graders, arrays, expected = [], [], []
+        for make_grader in make_graders:
+            for packets in runs:
+                graders.append(make_grader())
+                arrays.append(to_array(packets))
+                exercise = TimeoutExercise(name='replayed', grader=make_grader())
+                expected.append(repr(grade_replay(exercise, packets)))
+        grades = grade_recorded_runs(graders, arrays, max_runs_per_batch=4)
+        self.assertEqual([repr(grade) for grade in grades], expected)
+        self.assertGreater(len(set(expected)), 5)
+
+    def test_ever(self):
+        rules = 'ever(ball.z > 100) and ball.z < 50 -> Pass'
+        heights = [[10, 200, 10, 10], [10, 20, 30, 40]]
+        packets = np.stack([to_array([make_packet(t, ball_z=z) for t, z in enumerate(run)]) for run in heights])
+        expected = [[-1, -1, 0, 0], [-1, -1, -1, -1]]
+        self.assertEqual(compile_rules(rules).evaluate_batch(packets).tolist(), expected)
+        batch = TickBatch.from_runs([packets[0], packets[1][:2]], ['ball.z'])
+        self.assertEqual(batch.column('ball.z').tolist(), [heights[0], [10, 20, 20, 20]])
+        self.assertEqual(batch.valid.tolist(), [[True] * 4, [True, True, False, False]])
+
+    def test_read_tick_capture_array(self):
+        with TemporaryDirectory() as tmpdir:
+            recorder = TickRecorder(Path(tmpdir), ticks_per_chunk=2)
+            packets = [make_packet(t, ball_z=t * 10) for t in range(5)]
+            for packet in packets:
+                recorder.record(packet)
+            recorder.save(Path(tmpdir) / 'run.ticks')
+            array = read_tick_capture_array(Path(tmpdir) / 'run.ticks')
+        self.assertEqual(array.tobytes(), to_array(packets).tobytes())
+
+
+if __name__ == '__main__':
+    unittest.main()
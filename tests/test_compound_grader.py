@@ -0,0 +1,112 @@
+from itertools import product
+from typing import List, Optional
+import unittest
+
+from rlbot.training.training import Pass, Fail, Grade
+
+from rlbottraining.common_graders.compound_grader import CompoundGrader
+from rlbottraining.common_graders.goal_grader import GoalieGrader, StrikerGrader
+from rlbottraining.common_graders.kickoff_grader import KickoffGrader
+from rlbottraining.common_graders.rl_graders import RocketLeagueStrikerGrader
+from rlbottraining.common_graders.rule_grader import RuleGrader
+from rlbottraining.grading.grader import Grader
+from rlbottraining.grading.training_tick_packet import TrainingTickPacket
+
+
+class FixedGrader(Grader):
+    """ Returns the same grade every tick and counts how often it was asked. """
+
+    def __init__(self, grade: Optional[Grade], evaluation_cost=1.0, priority=0, requires_every_tick=True):
+        self.grade = grade
+        self.evaluation_cost = evaluation_cost
+        self.priority = priority
+        self.requires_every_tick = requires_every_tick
+        self.num_calls = 0
+
+    def on_tick(self, tick: TrainingTickPacket) -> Optional[Grade]:
+        self.num_calls += 1
+        return self.grade
+
+
+def num_calls(graders: List[FixedGrader]) -> List[int]:
+    return [grader.num_calls for grader in graders]
+
+
+class CompoundGraderTest(unittest.TestCase):
+
+    def test_evaluation_order(self):
+        grader = CompoundGrader([
+            FixedGrader(None, evaluation_cost=5),
+            FixedGrader(None, evaluation_cost=0.1),
+            FixedGrader(None, priority=1, evaluation_cost=10),
+            FixedGrader(None),
+        ], short_circuit=True)
+        self.assertEqual(grader.evaluation_order, [2, 1, 3, 0])
+        self.assertIsNone(CompoundGrader([FixedGrader(None)]).evaluation_order)
+
+    def test_stops_at_first_fail(self):
+        first_fail, second_fail = Fail(), Fail()
+        graders = [
+            FixedGrader(Pass()),
+            FixedGrader(first_fail),
+            FixedGrader(second_fail),
+            FixedGrader(None, requires_every_tick=False),
+            FixedGrader(None),
+        ]
+        grade = CompoundGrader(graders, short_circuit=True).on_tick(None)
+        self.assertIs(grade, first_fail)
+        self.assertEqual(num_calls(graders), [1, 1, 1, 0, 1])
+
+    def test_pass_without_fail(self):
+        first_pass = Pass()
+        graders = [FixedGrader(None), FixedGrader(first_pass), FixedGrader(Pass(), requires_every_tick=False)]
+        self.assertIs(CompoundGrader(graders, short_circuit=True).on_tick(None), first_pass)
+        self.assertEqual(num_calls(graders), [1, 1, 1])
+
+    def test_same_grade_as_default_mode(self):
+        for grades in product([None, Pass(), Fail()], repeat=3):
+            default = CompoundGrader([FixedGrader(g) for g in grades]).on_tick(None)
+            short_circuit = CompoundGrader([FixedGrader(g, requires_every_tick=False) for g in grades], short_circuit=True).on_tick(None)
+            self.assertIs(short_circuit, default)
+
+    def test_shipped_graders_which_can_be_skipped(self):
+        self.assertFalse(StrikerGrader().requires_every_tick)  # Goal and timeout.
+        self.assertTrue(GoalieGrader().requires_every_tick)  # Counts consecutive ticks of the ball going away.
+        self.assertTrue(KickoffGrader().requires_every_tick)  # Remembers whether the ball ever moved.
+        self.assertFalse(RuleGrader('ball.z > initial(ball.z) -> Pass').requires_every_tick)
+        for rules in ['ball.z > previous(ball.z) -> Pass', 'ever(ball.z > 100) -> Pass', 'ball.z > 100 for 2 ticks -> Pass']:
+            self.assertTrue(RuleGrader(rules).requires_every_tick, rules)
+
+    def test_rocket_league_striker_grader(self):
+        def reference_grade(grades, timeout_override, ground_override):
+            # The previous implementation, which evaluated every grader.
+            timeout = isinstance(grades[2], Fail)
+            ball_on_ground = isinstance(grades[1], Fail)
+            goal = isinstance(grades[0], Pass)
+            if goal:
+                return grades[0]
+            elif timeout:
+                if timeout_override:
+                    return grades[2]
+                elif ball_on_ground:
+                    return grades[1]
+            elif ground_override and ball_on_ground:
+                return grades[1]
+            return None
+
+        for goal, ground, timeout, timeout_override, ground_override in product(
+                [None, Pass(), Fail()], [None, Fail()], [None, Fail()], [False, True], [False, True]):
+            grader = RocketLeagueStrikerGrader(timeout_override=timeout_override, ground_override=ground_override)
+            graders = grader.graders = [FixedGrader(goal), FixedGrader(ground), FixedGrader(timeout)]
+            self.assertIs(
+                grader.on_tick(None),
+                reference_grade([goal, ground, timeout], timeout_override, ground_override)
+            )
+            self.assertEqual(num_calls(graders)[0], 1)
+            self.assertEqual(num_calls(graders)[2], 1)
+            if timeout is None and not ground_override:
+                self.assertEqual(num_calls(graders)[1], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+from datetime import timedelta
+from pathlib import Path
+from tempfile import TemporaryDirectory
+import json
+import unittest
+
+from rlbottraining.history.exercise_result import store_result
+from rlbottraining.history.metric_json_encoder import MetricJsonEncoder
+from rlbottraining.history.website.dev_server import RenderCache, matches_entity_tag, parse_entity_tags
+from rlbottraining.history.website.server import Server
+
+from .test_result_log import make_result, start_time
+
+
+class DevServerCacheTest(unittest.TestCase):
+
+    def test_pages_are_cached_until_a_new_result(self):
+        with TemporaryDirectory() as tmpdir:
+            history_dir = Path(tmpdir)
+            first = make_result('first', start_time)
+            store_result(first, history_dir)
+            cache = RenderCache(Server(history_dir))
+            slim_results_path = Path('data/slim_results.json')
+            first_page_path = Path(f'data/results/{first.run_id}.json')
+
+            slim_results = cache.get(slim_results_path)
+            first_page = cache.get(first_page_path)
+            self.assertIs(cache.get(slim_results_path), slim_results)
+            self.assertTrue(slim_results.etag.startswith('"'))
+
+            second = make_result('second', start_time + timedelta(seconds=1))
+            cache.add_exercise_result(json.loads(json.dumps(second, cls=MetricJsonEncoder)))
+            new_slim_results = cache.get(slim_results_path)
+            self.assertIsNot(new_slim_results, slim_results)
+            self.assertNotEqual(new_slim_results.etag, slim_results.etag)
+            self.assertIn(b'second', new_slim_results.content)
+            # The page of the first result has a fingerprint so it stays cached.
+            self.assertIs(cache.get(first_page_path), first_page)
+
+    def test_gzipped_content_is_cached(self):
+        with TemporaryDirectory() as tmpdir:
+            history_dir = Path(tmpdir)
+            store_result(make_result('first', start_time), history_dir)
+            cache = RenderCache(Server(history_dir))
+            page = cache.get(Path('index.html'))
+            gzipped = page.gzipped_content()
+            self.assertLess(len(gzipped), len(page.content))
+            self.assertIs(page.gzipped_content(), gzipped)
+            self.assertNotEqual(page.gzipped_etag, page.etag)
+            self.assertTrue(page.gzipped_etag.startswith('"') and page.gzipped_etag.endswith('"'))
+
+    def test_if_none_match(self):
+        header = 'W/"abc", "abc-gzip" ,"x,y"'
+        self.assertEqual(parse_entity_tags(header), ['"abc"', '"abc-gzip"', '"x,y"'])
+        self.assertTrue(matches_entity_tag(header, '"abc"'))
+        self.assertTrue(matches_entity_tag(header, '"abc-gzip"'))
+        self.assertFalse(matches_entity_tag(header, '"ab"'))  # Not a substring match.
+        self.assertFalse(matches_entity_tag('"abcd"', '"abc"'))
+        self.assertTrue(matches_entity_tag('*', '"abc"'))
+        self.assertFalse(matches_entity_tag('', '"abc"'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,200 @@
+from typing import List, Optional, Tuple
+import json
+import random
+import unittest
+
+import numpy as np
+
+from rlbot.training.training import Pass
+from rlbot.utils.structures.game_data_struct import GameTickPacket
+
+from rlbottraining.backends.headless_backend import HeadlessBackend
+from rlbottraining.common_graders.compound_grader import CompoundGrader
+from rlbottraining.common_graders.goal_grader import GoalieGrader, StrikerGrader
+from rlbottraining.common_graders.rl_graders import FailOnBallOnGround, RocketLeagueStrikerGrader
+from rlbottraining.common_graders.rule_grader import (
+    RuleGrader, ball_on_ground_definition, goalie_rules, rocket_league_striker_rules, striker_rules
+)
+from rlbottraining.common_graders.timeout import FailOnTimeout
+from rlbottraining.exercise_runner import run_playlist
+from rlbottraining.grading.grader import Grader
+from rlbottraining.grading.grader_dsl import compile_rules
+from rlbottraining.grading.packet_arrays import dtype_from_ctypes
+from rlbottraining.grading.training_tick_packet import TrainingTickPacket
+from rlbottraining.history.metric_json_encoder import MetricJsonEncoder
+
+from .test_headless_backend import BallFallingOnGround, BallRollingIntoGoal, DriveIntoBall, full_throttle
+
+
+class RecordTicks(Grader):
+    def __init__(self):
+        self.packets: List[GameTickPacket] = []
+
+    def on_tick(self, tick: TrainingTickPacket):
+        self.packets.append(GameTickPacket.from_buffer_copy(tick.game_tick_packet))
+
+
+def record_headless_run(exercise_class, bot_controllers=None, seconds=6) -> List[GameTickPacket]:
+    recorder = RecordTicks()
+    exercise = exercise_class(name='recorded', grader=CompoundGrader([recorder, FailOnTimeout(seconds)]))
+    list(run_playlist([exercise], backend=HeadlessBackend(bot_controllers=bot_controllers)))
+    return recorder.packets
+
+def to_array(packets: List[GameTickPacket]) -> np.ndarray:
+    return np.frombuffer(b''.join(bytes(packet) for packet in packets), dtype=dtype_from_ctypes(GameTickPacket))
+
+def first_grade(grader: Grader, packets: List[GameTickPacket]) -> Optional[Tuple[int, bool]]:
+    """ The index of the tick which got graded and whether it was a Pass. """
+    tick = TrainingTickPacket()
+    for i, packet in enumerate(packets):
+        tick.update(packet)
+        grade = grader.on_tick(tick)
+        if grade is not None:
+            return i, isinstance(grade, Pass)
+    return None
+
+def rules_per_tick(rules: str, packets: List[GameTickPacket]) -> List[int]:
+    compiled = compile_rules(rules)
+    state = compiled.make_state()
+    fired = [compiled.tick_function(packet, state) for packet in packets]
+    return [-1 if i is None else i for i in fired]
+
+def make_packet(seconds_elapsed: float, **fields) -> GameTickPacket:
+    packet = GameTickPacket()
+    packet.game_info.seconds_elapsed = seconds_elapsed
+    for name, value in fields.items():
+        obj_name, attribute_name = name.split('_', 1)
+        setattr({'ball': packet.game_ball.physics.location, 'team1': packet.teams[1]}[obj_name], attribute_name, value)
+    return packet
+
+
+class GraderDslTest(unittest.TestCase):
+
+    def test_rules(self):
+        rules = '''
+            high = ball.z > 100  # A comment.
+            (high and
+                ball.z > previous(ball.z)) -> Pass: Going up
+            high for 3 ticks -> Fail
+            team1.score > initial(team1.score) -> Fail: Conceded
+        '''
+        packets = [make_packet(t, ball_z=z, team1_score=score) for t, z, score in [
+            (0, 200, 1), (1, 150, 1), (2, 120, 1), (3, 130, 1), (4, 90, 1), (5, 50, 2), (6, 50, 0), (7, 300, 3),
+        ]]
+        expected = [-1, -1, 1, 0, -1, 2, -1, 0]
+        self.assertEqual(rules_per_tick(rules, packets), expected)
+        self.assertEqual(compile_rules(rules).evaluate_batch(to_array(packets)).tolist(), expected)
+
+        grader = RuleGrader(rules)
+        self.assertEqual(first_grade(grader, packets), (2, False))
+        index, grade = RuleGrader(rules).grade_batch(to_array(packets))
+        self.assertEqual(index, 2)
+        self.assertIsInstance(grade, RuleGrader.FailDueToRule)
+        self.assertEqual(grade.rule, 'high for 3 ticks -> Fail')
+        self.assertIsNone(RuleGrader('ball.z > 1000 -> Pass').grade_batch(to_array(packets)))
+
+    def test_messages_are_free_text(self):
+        rules = '''
+            # A comment -> not a rule
+            ball.z > 100 -> Fail: Missed shot #2 (too high
+            (ball.z >
+                50) -> Pass: [ok]
+        '''
+        compiled = compile_rules(rules)
+        self.assertEqual([rule.message for rule in compiled.rules], ['Missed shot #2 (too high', '[ok]'])
+        self.assertEqual(rules_per_tick(rules, [make_packet(0, ball_z=200), make_packet(1, ball_z=60)]), [0, 1])
+
+    def test_rule_grader_json(self):
+        grader = RuleGrader('ever(ball.z > 100) -> Pass')
+        first_grade(grader, [make_packet(0, ball_z=50)])
+        self.assertFalse(grader.has_initial_state())
+        self.assertEqual(json.loads(json.dumps(grader, cls=MetricJsonEncoder)), {
+            '__class__': 'rlbottraining.common_graders.rule_grader.RuleGrader',
+            'rules': 'ever(ball.z > 100) -> Pass',
+        })
+
+    def test_invalid_rules(self):
+        for rules in [
+            'ball.height > 1 -> Pass',
+            'ball.z > 1 -> Maybe',
+            'ball.z > 1',
+            'previous(previous(ball.z)) > 1 -> Pass',
+            'ball.z > 1 for 0 ticks -> Pass',
+            'ball.z.x > 1 -> Pass',
+            '[ball.z] -> Pass',
+            '(ball.z > 1 -> Pass',
+            'x = 1',
+        ]:
+            with self.assertRaises(ValueError, msg=rules):
+                compile_rules(rules)
+
+    def test_shared_field_reads(self):
+        source = compile_rules('ball.x + ball.y + ball.z + ball.vx > 0 -> Pass').tick_source
+        self.assertEqual(source.count('packet.'), 1)
+
+    def test_ball_on_ground_like_grader(self):
+        rng = random.Random(3)
+        packets = []
+        angular_velocity = [1.0, 2.0, 3.0]
+        for i in range(3000):
+            seconds_elapsed = 10 + i / 60
+            packet = make_packet(seconds_elapsed)
+            choice = rng.random()
+            if choice < .3:
+                angular_velocity[2] = rng.uniform(-6, 6)
+            elif choice < .5:
+                angular_velocity[rng.randrange(3)] = rng.uniform(-6, 6)
+            ball = packet.game_ball
+            ball.physics.angular_velocity.x, ball.physics.angular_velocity.y, ball.physics.angular_velocity.z = angular_velocity
+            if rng.random() < .5:
+                ball.physics.velocity.x = rng.choice([0, 100])
+            ball.physics.location.z = rng.choice([93, 1000, 2000])
+            ball.latest_touch.time_seconds = rng.choice([seconds_elapsed, seconds_elapsed - 1 / 60, seconds_elapsed - 1, 0])
+            packets.append(packet)
+
+        grader = FailOnBallOnGround()
+        tick = TrainingTickPacket()
+        expected = []
+        for packet in packets:
+            tick.update(packet)
+            expected.append(0 if grader.on_tick(tick) else -1)
+        self.assertGreater(expected.count(0), 100)
+        self.assertGreater(expected.count(-1), 100)
+
+        rules = ball_on_ground_definition + 'ball_on_ground -> Fail'
+        self.assertEqual(rules_per_tick(rules, packets), expected)
+        self.assertEqual(compile_rules(rules).evaluate_batch(to_array(packets)).tolist(), expected)
+
+    def test_like_existing_graders(self):
+        recordings = {
+            'rolling': record_headless_run(BallRollingIntoGoal),
+            'falling': record_headless_run(BallFallingOnGround),
+            'driving': record_headless_run(DriveIntoBall, bot_controllers={0: full_throttle}),
+        }
+        grader_pairs = [
+            (lambda: StrikerGrader(timeout_seconds=3), striker_rules(timeout_seconds=3)),
+            (lambda: StrikerGrader(ally_team=1), striker_rules(ally_team=1)),
+            (lambda: GoalieGrader(timeout_seconds=5), goalie_rules(timeout_seconds=5)),
+            (lambda: GoalieGrader(ally_team=1), goalie_rules(ally_team=1)),
+        ] + [
+            (
+                lambda kwargs=kwargs: RocketLeagueStrikerGrader(**kwargs),
+                rocket_league_striker_rules(**kwargs),
+            )
+            for timeout_override in [False, True]
+            for ground_override in [False, True]
+            for kwargs in [dict(timeout_seconds=2, timeout_override=timeout_override, ground_override=ground_override)]
+        ]
+        num_passes = 0
+        for name, packets in recordings.items():
+            for make_grader, rules in grader_pairs:
+                expected = first_grade(make_grader(), packets)
+                self.assertEqual(first_grade(RuleGrader(rules), packets), expected, (name, rules))
+                batch_grade = RuleGrader(rules).grade_batch(to_array(packets))
+                self.assertEqual(batch_grade and (batch_grade[0], isinstance(batch_grade[1], Pass)), expected, (name, rules))
+                num_passes += bool(expected and expected[1])
+        self.assertGreater(num_passes, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,99 @@
+from dataclasses import dataclass, field
+import json
+import pickle
+import unittest
+
+from rlbot.utils.structures.game_data_struct import GameTickPacket, GameInfo
+
+from rlbottraining.backends.headless_backend import HeadlessBackend
+from rlbottraining.common_graders.compound_grader import CompoundGrader
+from rlbottraining.common_graders.tick_wrapper import GameTickPacketWrapperGrader
+from rlbottraining.common_graders.timeout import FailOnTimeout
+from rlbottraining.exercise_runner import run_playlist
+from rlbottraining.grading.grader import Grader
+from rlbottraining.grading.grader_profiler import GraderProfiler, iterate_grader_tree, percentile
+from rlbottraining.history.metric_json_encoder import MetricJsonEncoder
+from rlbottraining.training_exercise_adapter import TrainingExerciseAdapter
+
+from .test_replay import TimeoutExercise
+
+
+class AllocatingGrader(Grader):
+    def __init__(self):
+        self.kept = []
+
+    def on_tick(self, tick):
+        self.kept.append([tick.game_tick_packet.game_info.seconds_elapsed])
+
+
+@dataclass
+class NestedExercise(TimeoutExercise):
+    grader: Grader = field(default_factory=lambda: CompoundGrader([
+        GameTickPacketWrapperGrader(FailOnTimeout(3.5)),
+        AllocatingGrader(),
+    ]))
+
+
+class GraderProfilerTest(unittest.TestCase):
+
+    def test_percentile(self):
+        values = list(range(1, 101))
+        self.assertEqual(percentile(values, 50), 50)
+        self.assertEqual(percentile(values, 99), 99)
+        self.assertEqual(percentile(values, 100), 100)
+        self.assertEqual(percentile([7], 1), 7)
+
+    def test_grader_tree(self):
+        names = [name for name, _ in iterate_grader_tree(NestedExercise(name='nested').grader)]
+        self.assertEqual(names, [
+            'grader',
+            'grader.graders[0]',
+            'grader.graders[0].inner_grader',
+            'grader.graders[1]',
+        ])
+
+    def test_profile_exercise(self):
+        exercise = NestedExercise(name='nested')
+        adapter = TrainingExerciseAdapter(exercise, grader_profiler=GraderProfiler())
+        grade = None
+        time = 10
+        while grade is None:
+            grade = adapter.on_tick(GameTickPacket(game_info=GameInfo(seconds_elapsed=time)))
+            time += .5
+        profile = adapter.finish_grader_profile()
+
+        self.assertEqual([call.name for call in profile.calls], [
+            'TrainingExerciseAdapter.on_tick',
+            'grader.on_tick',
+            'grader.graders[0].on_tick',
+            'grader.graders[0].inner_grader.on_tick',
+            'grader.graders[1].on_tick',
+        ])  # render() was not called.
+        self.assertTrue(all(call.num_calls == 9 for call in profile.calls))
+        adapter_stats, root_stats = profile.calls[:2]
+        self.assertEqual(root_stats.class_name, 'rlbottraining.common_graders.compound_grader.CompoundGrader')
+        self.assertLessEqual(root_stats.p50_us, root_stats.p99_us)
+        self.assertLessEqual(root_stats.p99_us, root_stats.max_us)
+        self.assertGreaterEqual(adapter_stats.total_ms, root_stats.total_ms)
+        self.assertGreaterEqual(profile.calls[-1].allocated_blocks, 9)
+
+        # The graders are back to normal.
+        self.assertNotIn('on_tick', vars(exercise.grader))
+        self.assertNotIn('on_tick', vars(adapter))
+        pickle.dumps(exercise.grader)
+        profile_json = json.loads(json.dumps(profile, cls=MetricJsonEncoder))
+        self.assertEqual(profile_json['calls'][1]['num_calls'], 9)
+
+    def test_run_playlist(self):
+        result, = run_playlist([TimeoutExercise(name='profiled')], backend=HeadlessBackend(), profile_graders=True)
+        self.assertEqual(result.grader_profile.calls[0].name, 'TrainingExerciseAdapter.on_tick')
+        self.assertGreater(result.grader_profile.calls[0].num_calls, 0)
+        result_json = json.loads(json.dumps(result, cls=MetricJsonEncoder))
+        self.assertEqual(result_json['grader_profile']['calls'][1]['name'], 'grader.on_tick')
+
+        result, = run_playlist([TimeoutExercise(name='not profiled')], backend=HeadlessBackend())
+        self.assertIsNone(result.grader_profile)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,98 @@
+import unittest
+from dataclasses import dataclass, field
+
+from rlbot.agents.base_agent import SimpleControllerState
+from rlbot.training.training import Pass, FailDueToExerciseException
+from rlbot.utils.game_state_util import GameState, BallState, CarState, Physics, Vector3, Rotator
+
+from rlbottraining.backends.headless_backend import HeadlessBackend
+from rlbottraining.common_exercises.bronze_striker import make_default_playlist as make_bronze_striker_playlist
+from rlbottraining.common_exercises.common_base_exercises import StrikerExercise
+from rlbottraining.common_graders.compound_grader import CompoundGrader
+from rlbottraining.common_graders.rl_graders import FailOnBallOnGround
+from rlbottraining.common_graders.timeout import FailOnTimeout
+from rlbottraining.exercise_runner import run_playlist
+from rlbottraining.grading.grader import Grader
+from rlbottraining.rng import SeededRandomNumberGenerator
+
+"""
+Tests running exercises against the HeadlessBackend, which does not require RocketLeague to run.
+"""
+
+@dataclass
+class BallRollingIntoGoal(StrikerExercise):
+    def make_game_state(self, rng: SeededRandomNumberGenerator) -> GameState:
+        return GameState(
+            ball=BallState(physics=Physics(
+                location=Vector3(0, 4000, 93),
+                velocity=Vector3(0, 1500, 0),
+                angular_velocity=Vector3(0, 0, 0))),
+        )
+
+@dataclass
+class BallFallingOnGround(StrikerExercise):
+    grader: Grader = field(default_factory=lambda: CompoundGrader([
+        FailOnBallOnGround(),
+        FailOnTimeout(3),
+    ]))
+
+    def make_game_state(self, rng: SeededRandomNumberGenerator) -> GameState:
+        return GameState(
+            ball=BallState(physics=Physics(
+                location=Vector3(0, 0, 800),
+                velocity=Vector3(300, 0, 0),
+                angular_velocity=Vector3(0, 0, 0))),
+        )
+
+@dataclass
+class DriveIntoBall(StrikerExercise):
+    def make_game_state(self, rng: SeededRandomNumberGenerator) -> GameState:
+        return GameState(
+            ball=BallState(physics=Physics(
+                location=Vector3(0, 4600, 93),
+                velocity=Vector3(0, 0, 0),
+                angular_velocity=Vector3(0, 0, 0))),
+            cars={0: CarState(
+                physics=Physics(
+                    location=Vector3(0, 3400, 17),
+                    rotation=Rotator(0, 1.5707963, 0),
+                    velocity=Vector3(0, 0, 0),
+                    angular_velocity=Vector3(0, 0, 0)),
+                boost_amount=100)},
+        )
+
+
+def full_throttle(packet) -> SimpleControllerState:
+    return SimpleControllerState(throttle=1, boost=True)
+
+
+class HeadlessBackendTest(unittest.TestCase):
+
+    def test_ball_rolls_into_goal(self):
+        result, = run_playlist([BallRollingIntoGoal(name='rolling')], backend=HeadlessBackend())
+        self.assertIsInstance(result.grade, Pass)
+
+    def test_ball_hits_ground(self):
+        result, = run_playlist([BallFallingOnGround(name='falling')], backend=HeadlessBackend())
+        self.assertIsInstance(result.grade, FailOnBallOnGround.FailDueToGroundHit)
+
+    def test_bot_controller_scores(self):
+        backend = HeadlessBackend(bot_controllers={0: full_throttle})
+        result, = run_playlist([DriveIntoBall(name='drive')], backend=backend)
+        self.assertIsInstance(result.grade, Pass)
+
+    def test_common_exercises_run(self):
+        results = list(run_playlist(make_bronze_striker_playlist(), backend=HeadlessBackend()))
+        self.assertEqual(len(results), len(make_bronze_striker_playlist()))
+        for result in results:
+            self.assertNotIsInstance(result.grade, FailDueToExerciseException, result.exercise.name)
+
+    def test_deterministic(self):
+        def grades():
+            backend = HeadlessBackend(bot_controllers={0: full_throttle})
+            return [repr(result.grade) for result in run_playlist(make_bronze_striker_playlist(), seed=7, backend=backend)]
+        self.assertEqual(grades(), grades())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,110 @@
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from random import Random
+from types import ModuleType
+import importlib.util
+import sys
+import unittest
+
+from rlbottraining.common_exercises.bronze_striker import FacingAwayFromBallInFrontOfGoal
+from rlbottraining.hot_swap import hot_swap
+from rlbottraining.rng import SeededRandomNumberGenerator
+
+
+exercise_module_source = '''
+from dataclasses import dataclass
+
+from rlbottraining.common_graders.timeout import FailOnTimeout
+from rlbottraining.training_exercise import TrainingExercise
+
+def car_x(rng):
+    return {car_x}
+
+@dataclass
+class LoadedExercise(TrainingExercise):
+    boost: float = 20
+
+    def make_game_state(self, rng):
+        return (car_x(rng), {y}, self.boost)
+
+def make_default_playlist():
+    return [LoadedExercise('loaded', FailOnTimeout({timeout}))]
+'''
+
+def load_exercise(tmpdir: str, car_x=1, y=2, timeout=3):
+    # A directory per version: cached bytecode is only invalidated by a different source mtime (in seconds) or size.
+    version_dir = Path(tmpdir) / str(len(list(Path(tmpdir).iterdir())))
+    version_dir.mkdir()
+    path = version_dir / 'loaded_exercise.py'
+    path.write_text(exercise_module_source.format(car_x=car_x, y=y, timeout=timeout))
+    exercise, = load_fresh_module(path).make_default_playlist()
+    return exercise
+
+def load_fresh_module(path: Path) -> ModuleType:
+    """
+    Executes the file as a new module object each time, under the same module name, like a reload does.
+    (importlib.import_module() would return the cached module on the second call.)
+    """
+    spec = importlib.util.spec_from_file_location(path.stem, str(path))
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module  # Looked up by @dataclass.
+    try:
+        spec.loader.exec_module(module)
+    finally:
+        del sys.modules[spec.name]
+    return module
+
+
+class HotSwapTest(unittest.TestCase):
+
+    def test_identical_definitions(self):
+        with TemporaryDirectory() as tmpdir:
+            old = load_exercise(tmpdir)
+            new = load_exercise(tmpdir)
+        self.assertIsNot(type(old), type(new))
+        grader = old.grader
+        self.assertEqual(hot_swap(new, old), [])
+        self.assertIs(old.grader, grader)
+
+    def test_changed_fields(self):
+        old = FacingAwayFromBallInFrontOfGoal('ex', car_start_x=3.)
+        old.matchcomms_factory = factory = lambda: None
+        grader = old.grader
+        new = FacingAwayFromBallInFrontOfGoal('ex', car_start_x=5.)
+        self.assertEqual(hot_swap(new, old), ['car_start_x'])
+        self.assertEqual(old.car_start_x, 5.)
+        self.assertIs(old.grader, grader)
+        self.assertIs(old.matchcomms_factory, factory)  # Runtime state is kept.
+
+    def test_runtime_state_with_reference(self):
+        with TemporaryDirectory() as tmpdir:
+            reference = load_exercise(tmpdir)
+            running = load_exercise(tmpdir)
+            running.grader.initial_seconds_elapsed = 10.  # As if it ran.
+            grader = running.grader
+            self.assertEqual(hot_swap(load_exercise(tmpdir), running, reference), [])
+            self.assertIs(running.grader, grader)
+            self.assertEqual(hot_swap(load_exercise(tmpdir, timeout=5), running, reference), ['grader'])
+            self.assertEqual(running.grader.max_duration_seconds, 5)
+
+    def test_changed_code(self):
+        rng = SeededRandomNumberGenerator(Random(0))
+        with TemporaryDirectory() as tmpdir:
+            old = load_exercise(tmpdir)
+            old.boost = 33
+
+            self.assertEqual(hot_swap(load_exercise(tmpdir, y=4), old), ['class LoadedExercise', 'boost'])
+            self.assertEqual(old.make_game_state(rng), (1, 4, 20))
+
+            # Only a function which make_game_state() calls changed.
+            self.assertEqual(hot_swap(load_exercise(tmpdir, car_x=7, y=4), old), ['class LoadedExercise'])
+            self.assertEqual(old.make_game_state(rng), (7, 4, 20))
+
+            grader = old.grader
+            self.assertEqual(hot_swap(load_exercise(tmpdir, car_x=7, y=4, timeout=5), old), ['grader'])
+            self.assertIsNot(old.grader, grader)
+            self.assertEqual(old.grader.max_duration_seconds, 5)
+
+
+if __name__ == '__main__':
+    unittest.main()
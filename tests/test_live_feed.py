@@ -0,0 +1,94 @@
+from pathlib import Path
+from tempfile import TemporaryDirectory
+import threading
+import unittest
+
+from rlbottraining.history.exercise_result import StorageMode, store_result
+from rlbottraining.history.live_feed import LiveFeedListener, close_live_feed_publishers
+from rlbottraining.history.result_log import close_result_log_writers
+from rlbottraining.history.website.dev_server import EventStream, RenderCache
+from rlbottraining.history.website.server import Server
+from rlbottraining.paths import HistoryPaths
+
+from .test_result_log import make_result, start_time
+
+
+class LiveFeedTest(unittest.TestCase):
+
+    def tearDown(self):
+        close_live_feed_publishers()
+        close_result_log_writers()
+
+    def test_stored_results_are_pushed(self):
+        with TemporaryDirectory() as tmpdir:
+            history_dir = Path(tmpdir)
+            received = []
+            received_two = threading.Event()
+            def callback(result_json):
+                received.append(result_json)
+                if len(received) == 2:
+                    received_two.set()
+
+            first = make_result('first', start_time)
+            second = make_result('second', start_time)
+            with LiveFeedListener(history_dir, callback):
+                store_result(first, history_dir)
+                store_result(second, history_dir, StorageMode.RESULT_LOG)
+                self.assertTrue(received_two.wait(timeout=5))
+            self.assertEqual([result['run_id'] for result in received], [first.run_id, second.run_id])
+            self.assertFalse((history_dir / HistoryPaths.live_feed_address).exists())
+
+    def test_publishing_without_listener(self):
+        with TemporaryDirectory() as tmpdir:
+            history_dir = Path(tmpdir)
+            with LiveFeedListener(history_dir, lambda result_json: None) as listener:
+                address_text = (history_dir / HistoryPaths.live_feed_address).read_text()
+            # As if the dev server crashed without cleaning up.
+            (history_dir / HistoryPaths.live_feed_address).write_text(address_text)
+            store_result(make_result('stored anyway', start_time), history_dir)
+            self.assertEqual(len(list((history_dir / HistoryPaths.exercise_results).iterdir())), 1)
+
+    def test_listener_restart(self):
+        with TemporaryDirectory() as tmpdir:
+            history_dir = Path(tmpdir)
+            with LiveFeedListener(history_dir, lambda result_json: None):
+                store_result(make_result('before restart', start_time), history_dir)
+                close_live_feed_publishers()  # Waits for the result to be sent.
+            received = threading.Event()
+            with LiveFeedListener(history_dir, lambda result_json: received.set()):
+                # The first send on the old connection may seemingly succeed. Results are stored regardless.
+                for i in range(5):
+                    store_result(make_result(f'after restart {i}', start_time), history_dir)
+                self.assertTrue(received.wait(timeout=5))
+
+    def test_render_cache_skips_duplicates(self):
+        with TemporaryDirectory() as tmpdir:
+            history_dir = Path(tmpdir)
+            cache = RenderCache(Server(history_dir))
+            result_json = {'run_id': 'abc', 'create_time': {'iso8601': '2019-03-01T12:00:00.0Z'}}
+            self.assertTrue(cache.add_exercise_result(result_json))
+            self.assertFalse(cache.add_exercise_result(result_json))
+            self.assertTrue(cache.has_result('abc'))
+            self.assertEqual(cache.generation, 1)
+
+
+class EventStreamTest(unittest.TestCase):
+
+    def test_catch_up_and_reset(self):
+        stream = EventStream(max_events=2)
+        connected_at = stream.last_event_id
+        stream.publish('result', {'run_id': 'a'})
+        (event_id, event, data), = stream.wait_for_events(connected_at, timeout=0)
+        self.assertEqual((event, data), ('result', '{"run_id": "a"}'))
+        self.assertEqual(stream.wait_for_events(event_id, timeout=0), [])
+
+        stream.publish('result', {'run_id': 'b'})
+        stream.publish('result', {'run_id': 'c'})
+        (_, event, _), = stream.wait_for_events(connected_at, timeout=0)  # Missed 'b'.
+        self.assertEqual(event, 'reset')
+        (_, event, _), = stream.wait_for_events(connected_at - 1000, timeout=0)  # From before a restart.
+        self.assertEqual(event, 'reset')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,123 @@
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict
+import ctypes
+import json
+import unittest
+
+import numpy as np
+
+from rlbot.matchconfig.match_config import MatchConfig
+from rlbot.training.training import Fail, FailDueToExerciseException, Pass
+from rlbot.utils.structures.game_data_struct import GameTickPacket, Physics
+
+from rlbottraining.common_graders.compound_grader import CompoundGrader
+from rlbottraining.common_graders.rl_graders import FailOnBallOnGround
+from rlbottraining.common_graders.timeout import FailOnTimeout
+from rlbottraining.grading.grader import Grader
+from rlbottraining.history.metric import Metric
+from rlbottraining.history.metric_json_encoder import MetricJsonEncoder
+
+from .test_result_log import make_result, start_time
+from .utils.example_metrics import ExampleMetric
+from .utils.reference_metric_json_encoder import ReferenceMetricJsonEncoder
+
+
+def make_game_tick_packet() -> GameTickPacket:
+    packet = GameTickPacket()
+    packet.num_cars = 2
+    for i in range(2):
+        car = packet.game_cars[i]
+        car.name = f'car {i}'
+        car.physics.location.x = 0.1 * i
+        car.physics.velocity.y = -1e20
+        car.has_wheel_contact = True
+        car.boost = 33
+    packet.game_ball.physics.location.z = 92.75
+    packet.game_ball.latest_touch.player_name = 'car 1'
+    packet.game_info.seconds_elapsed = 123.456
+    return packet
+
+
+class IntKeysMetric(Metric):
+    def to_json(self):
+        return {2: 'two', 10: 'ten', 1.5: 'float', True: 'bool', None: 'none'}
+
+@dataclass
+class GraderWithState(Grader):
+    counts: Dict[Any, Any] = field(default_factory=lambda: {10: 'a', 2: 'b', 1.5: [(1, 2), {3: None}]})
+    metric: Metric = field(default_factory=lambda: ExampleMetric(1.0, (float('nan'),)))
+    packet: GameTickPacket = field(default_factory=make_game_tick_packet)
+
+class FailWithDetails(Fail):
+    def __init__(self):
+        self.when = start_time
+        self.positions = np.arange(6, dtype=np.float32).reshape(2, 3)
+        self.example = ExampleMetric(2.5, (1.5, 2, 0))
+
+
+class SpecialInt(ctypes.c_int):
+    pass
+
+class Inner(ctypes.Structure):
+    _fields_ = [('a', ctypes.c_float), ('_private', ctypes.c_int)]
+
+class Either(ctypes.Union):
+    _fields_ = [('i', ctypes.c_int), ('f', ctypes.c_float)]
+
+class Unusual(ctypes.Structure):
+    _anonymous_ = ['inner']
+    _fields_ = [
+        ('inner', Inner),
+        ('special', SpecialInt),
+        ('names', (ctypes.c_wchar * 4) * 2),
+        ('matrix', (ctypes.c_double * 2) * 2),
+        ('pointer', ctypes.POINTER(Inner)),
+        ('null_pointer', ctypes.POINTER(Inner)),
+        ('either', Either),
+        ('void', ctypes.c_void_p),
+    ]
+
+
+class MetricJsonEncoderTest(unittest.TestCase):
+
+    def assertSameAsReference(self, obj, **kwargs):
+        self.assertEqual(
+            json.dumps(obj, cls=MetricJsonEncoder, **kwargs),
+            json.dumps(obj, cls=ReferenceMetricJsonEncoder, **kwargs),
+        )
+
+    def test_exercise_results(self):
+        for grade in [Pass(), FailWithDetails(), FailDueToExerciseException(ValueError('oops'), 'traceback')]:
+            result = make_result('result', start_time)
+            result.grade = grade
+            result.exercise.grader = CompoundGrader([GraderWithState(), FailOnBallOnGround(), FailOnTimeout(3)])
+            self.assertSameAsReference(result, sort_keys=True)
+            self.assertSameAsReference(result)
+
+    def test_non_string_keys(self):
+        # Keys of different types can only be encoded without sort_keys.
+        self.assertSameAsReference({'grader': GraderWithState(counts={None: IntKeysMetric(), False: 1})})
+
+    def test_game_tick_packet(self):
+        self.assertSameAsReference(make_game_tick_packet(), sort_keys=True)
+        self.assertSameAsReference({'physics': Physics(), 'when': datetime(2019, 3, 1, 12, 0, 0, 7000)}, indent=2)
+
+    def test_unusual_ctypes(self):
+        inner = Inner(a=1.5)
+        unusual = Unusual(special=SpecialInt(3), pointer=ctypes.pointer(inner), void=12)
+        unusual.names[1].value = 'ab'
+        unusual.matrix[1][0] = 0.25
+        self.assertSameAsReference(unusual)
+        self.assertSameAsReference(Either(i=5))
+
+    def test_fallbacks(self):
+        self.assertSameAsReference([MatchConfig(), {1, 2}, ZeroDivisionError('nope')], sort_keys=True)
+
+    def test_unsortable_keys(self):
+        with self.assertRaises(TypeError):
+            json.dumps({'grader': GraderWithState(counts={(1, 2): 'tuple'})}, cls=MetricJsonEncoder)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+import ctypes
+import unittest
+
+import numpy as np
+
+from rlbot.utils.structures.game_data_struct import GameTickPacket
+
+from rlbottraining.grading.packet_arrays import dtype_from_ctypes
+from rlbottraining.grading.training_tick_packet import TrainingTickPacket
+
+from .test_metric_json_encoder import make_game_tick_packet
+
+
+def fill_with_distinct_values(struct: ctypes.Structure, counter):
+    for name, field_type, *_ in struct._fields_:
+        value = getattr(struct, name)
+        if isinstance(value, ctypes.Structure):
+            fill_with_distinct_values(value, counter)
+        elif isinstance(value, ctypes.Array):
+            for element in value:
+                fill_with_distinct_values(element, counter)
+        elif field_type is ctypes.c_bool:
+            setattr(struct, name, next(counter) % 2 == 0)
+        elif field_type in (ctypes.c_int, ctypes.c_ubyte, ctypes.c_float):
+            setattr(struct, name, next(counter) % 200)
+
+
+class PacketArraysTest(unittest.TestCase):
+
+    def assertMatchesCtypes(self, array, value):
+        if isinstance(value, ctypes.Array):
+            for element_array, element in zip(array, value):
+                self.assertMatchesCtypes(element_array, element)
+        elif isinstance(value, ctypes.Structure) and array.dtype.names is None:  # A vector.
+            self.assertEqual(list(array), [getattr(value, name) for name, _ in value._fields_])
+        elif isinstance(value, ctypes.Structure):
+            for name, *_ in value._fields_:
+                if name in array.dtype.names:
+                    self.assertMatchesCtypes(array[name], getattr(value, name))
+                else:
+                    self.assertIsInstance(getattr(value, name), str)  # Only names are left out.
+        else:
+            self.assertEqual(array, value)
+
+    def test_layout_matches_ctypes(self):
+        self.assertEqual(dtype_from_ctypes(GameTickPacket).itemsize, ctypes.sizeof(GameTickPacket))
+        packet = GameTickPacket()
+        counter = iter(range(10**6))
+        fill_with_distinct_values(packet, counter)
+        tick = TrainingTickPacket()
+        tick.update(packet)
+        self.assertMatchesCtypes(tick.arrays.array, packet)
+
+    def test_views_are_live_and_read_only(self):
+        tick = TrainingTickPacket()
+        packet = make_game_tick_packet()
+        tick.update(packet)
+        arrays = tick.arrays
+        self.assertEqual(arrays.car_locations.shape, (2, 3))
+        np.testing.assert_allclose(arrays.car_distances_to_ball(), [92.75, np.hypot(0.1, 92.75)], rtol=1e-6)
+
+        packet.game_ball.physics.velocity.y = 500
+        packet.game_cars[1].score_info.goals = 2
+        self.assertEqual(arrays.ball_velocity[1], 500)
+        self.assertEqual(list(arrays.car_scores['goals']), [0, 2])
+        self.assertIs(tick.arrays, arrays)
+        with self.assertRaises(ValueError):
+            arrays.ball_location[0] = 1
+
+        tick.update(make_game_tick_packet())
+        self.assertIsNot(tick.arrays, arrays)
+
+
+if __name__ == '__main__':
+    unittest.main()
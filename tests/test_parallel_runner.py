@@ -0,0 +1,46 @@
+import unittest
+
+from rlbottraining.backends.headless_backend import HeadlessBackend
+from rlbottraining.common_exercises.bronze_striker import make_default_playlist as make_bronze_striker_playlist
+from rlbottraining.exercise_runner import run_playlist
+from rlbottraining.parallel_runner import run_playlist_in_parallel, shard_playlist_indices, merge_in_playlist_order
+
+
+class ParallelRunnerTest(unittest.TestCase):
+
+    def test_shards_cover_playlist(self):
+        for num_exercises in range(10):
+            for num_workers in range(1, 5):
+                shards = shard_playlist_indices(num_exercises, num_workers)
+                self.assertEqual(len(shards), num_workers)
+                self.assertEqual([i for shard in shards for i in shard], list(range(num_exercises)))
+                sizes = [len(shard) for shard in shards]
+                self.assertLessEqual(max(sizes) - min(sizes), 1)
+
+    def test_merge_in_playlist_order(self):
+        arrivals = [(2, 'c'), (0, 'a'), (3, 'd'), (1, 'b')]
+        self.assertEqual(list(merge_in_playlist_order(arrivals, 4)), ['a', 'b', 'c', 'd'])
+
+    def test_merge_yields_early(self):
+        def arrivals():
+            yield (0, 'a')
+            yield (1, 'b')
+            raise AssertionError('should not need to wait for more results')
+        merged = merge_in_playlist_order(arrivals(), 3)
+        self.assertEqual(next(merged), 'a')
+        self.assertEqual(next(merged), 'b')
+
+    def test_merge_missing_item(self):
+        with self.assertRaises(AssertionError):
+            list(merge_in_playlist_order([(1, 'b')], 2))
+
+    def test_headless_matches_serial(self):
+        # Exercises may only be run once so each run gets a fresh playlist.
+        serial = [repr(result.grade) for result in run_playlist(make_bronze_striker_playlist(), backend=HeadlessBackend())]
+        results = list(run_playlist_in_parallel(make_bronze_striker_playlist(), num_workers=3, backend_factory=HeadlessBackend))
+        self.assertEqual([repr(result.grade) for result in results], serial)
+        self.assertEqual([result.reproduction_info.playlist_index for result in results], list(range(len(serial))))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+from dataclasses import dataclass, field
+from random import Random
+from typing import List
+import threading
+import unittest
+
+from rlbot.utils.game_state_util import GameState, BallState, Physics, Vector3
+
+from rlbottraining.backends.headless_backend import HeadlessBackend
+from rlbottraining.common_exercises.bronze_striker import make_default_playlist as make_bronze_striker_playlist
+from rlbottraining.common_exercises.common_base_exercises import StrikerExercise
+from rlbottraining.exercise_runner import run_playlist
+from rlbottraining.prefetch import game_state_prefetcher
+from rlbottraining.rng import SeededRandomNumberGenerator
+from rlbottraining.training_exercise_adapter import TrainingExerciseAdapter
+
+
+@dataclass
+class RandomBallHeight(StrikerExercise):
+    max_height: float = 1000
+    threads: List[str] = field(default_factory=list)  # Where make_game_state() was called.
+
+    def make_game_state(self, rng: SeededRandomNumberGenerator) -> GameState:
+        self.threads.append(threading.current_thread().name)
+        return GameState(ball=BallState(physics=Physics(location=Vector3(0, 0, rng.uniform(100, self.max_height)))))
+
+@dataclass
+class NotPrefetchable(RandomBallHeight):
+    prefetch_game_state = False
+
+@dataclass
+class FailsInBackground(RandomBallHeight):
+    def make_game_state(self, rng: SeededRandomNumberGenerator) -> GameState:
+        game_state = super().make_game_state(rng)
+        assert threading.current_thread() is threading.main_thread()
+        return game_state
+
+def seeded_rng(seed: int) -> Random:
+    rng = Random()
+    rng.seed(seed)  # Like rlbot does.
+    return rng
+
+def ball_height(game_state: GameState) -> float:
+    return game_state.ball.physics.location.z
+
+
+class PrefetchTest(unittest.TestCase):
+
+    def test_like_without_prefetch(self):
+        def grades(prefetch_depth: int):
+            results = run_playlist(make_bronze_striker_playlist(), seed=5, backend=HeadlessBackend(), prefetch_depth=prefetch_depth)
+            return [repr(result.grade) for result in results]
+        self.assertEqual(grades(prefetch_depth=2), grades(prefetch_depth=0))
+
+    def test_setup(self):
+        exercises = [RandomBallHeight(f'{i}') for i in range(3)] + [NotPrefetchable('not'), FailsInBackground('fails')]
+        adapters = [TrainingExerciseAdapter(exercise) for exercise in exercises]
+        expected = [ball_height(exercise.make_game_state(SeededRandomNumberGenerator(seeded_rng(7)))) for exercise in exercises]
+        for exercise in exercises:
+            exercise.threads.clear()
+
+        with game_state_prefetcher(adapters, seed=7, depth=2):
+            self.assertEqual([ball_height(adapter.setup(seeded_rng(7))) for adapter in adapters], expected)
+        self.assertIsNone(adapters[0].game_state_prefetcher)
+        main = threading.current_thread().name
+        self.assertNotEqual(exercises[0].threads, [main])
+        self.assertEqual(len(exercises[0].threads), 1)
+        self.assertEqual(exercises[3].threads, [main])
+        self.assertEqual(exercises[4].threads[-1], main)  # Made again after failing in the background.
+
+    def test_differently_seeded_rng(self):
+        exercise = RandomBallHeight('ex')
+        adapter = TrainingExerciseAdapter(exercise)
+        with game_state_prefetcher([adapter], seed=7, depth=1):
+            height = ball_height(adapter.setup(seeded_rng(8)))
+        self.assertEqual(height, ball_height(exercise.make_game_state(SeededRandomNumberGenerator(seeded_rng(8)))))
+        self.assertEqual(exercise.threads.count(threading.current_thread().name), 2)  # Made on the spot.
+
+    def test_invalidate(self):
+        exercises = [RandomBallHeight('first'), RandomBallHeight('second')]
+        adapters = [TrainingExerciseAdapter(exercise) for exercise in exercises]
+        with game_state_prefetcher(adapters, seed=7, depth=2) as prefetcher:
+            adapters[0].setup(seeded_rng(7))
+            exercises[1].max_height = 100  # e.g. hot swapped.
+            prefetcher.invalidate(exercises[1])
+            self.assertEqual(ball_height(adapters[1].setup(seeded_rng(7))), 100)
+
+    def test_disabled(self):
+        adapter = TrainingExerciseAdapter(RandomBallHeight('ex'))
+        with game_state_prefetcher([adapter], seed=7, depth=0) as prefetcher:
+            self.assertIsNone(prefetcher)
+            self.assertIsNone(adapter.game_state_prefetcher)
+
+
+if __name__ == '__main__':
+    unittest.main()
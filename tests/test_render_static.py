@@ -0,0 +1,72 @@
+from pathlib import Path
+from tempfile import TemporaryDirectory
+import unittest
+
+from rlbottraining.history.exercise_result import store_result
+from rlbottraining.history.website.server import Server
+from rlbottraining.paths import HistoryPaths
+
+from .test_result_log import make_result, start_time
+
+
+class WriteRecordingServer(Server):
+    def __init__(self, *args, **kwargs):
+        self.written = []
+        super().__init__(*args, **kwargs)
+
+    def _write_file(self, file_path: Path, content: bytes):
+        self.written.append(file_path.relative_to(self.out_dir).as_posix())
+        super()._write_file(file_path, content)
+
+
+class RenderStaticTest(unittest.TestCase):
+
+    def test_only_changed_pages_are_written(self):
+        with TemporaryDirectory() as tmpdir:
+            history_dir = Path(tmpdir)
+            store_result(make_result('first', start_time), history_dir)
+            server = WriteRecordingServer(history_dir)
+            server.render_static_website()
+            self.assertEqual(len(server.written), len(server.url_map))
+
+            server = WriteRecordingServer(history_dir)
+            server.render_static_website()
+            self.assertEqual(server.written, [])
+
+            second = make_result('second', start_time)
+            store_result(second, history_dir)
+            server = WriteRecordingServer(history_dir)
+            server.render_static_website()
+            self.assertCountEqual(server.written, [
+                'data/slim_results.json',
+                'data/slim_results/index.json',
+                'data/slim_results/page_0.json',
+                f'data/results/{second.run_id}.json',
+            ])
+
+    def test_stale_pages_are_removed(self):
+        with TemporaryDirectory() as tmpdir:
+            history_dir = Path(tmpdir)
+            result = make_result('deleted later', start_time)
+            store_result(result, history_dir)
+            Server(history_dir).render_static_website()
+            result_page = history_dir / HistoryPaths.Website._website_dir / 'data' / 'results' / f'{result.run_id}.json'
+            self.assertTrue(result_page.exists())
+
+            (history_dir / HistoryPaths.exercise_results / f'{result.run_id}.json').unlink()
+            Server(history_dir).render_static_website()
+            self.assertFalse(result_page.exists())
+
+    def test_missing_files_are_rewritten(self):
+        with TemporaryDirectory() as tmpdir:
+            history_dir = Path(tmpdir)
+            store_result(make_result('first', start_time), history_dir)
+            Server(history_dir).render_static_website()
+            (history_dir / HistoryPaths.Website._website_dir / 'index.html').unlink()
+            server = WriteRecordingServer(history_dir)
+            server.render_static_website()
+            self.assertEqual(server.written, ['index.html'])
+
+
+if __name__ == '__main__':
+    unittest.main()
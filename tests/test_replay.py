@@ -0,0 +1,85 @@
+import unittest
+from dataclasses import dataclass, field
+from typing import Optional
+
+from rlbot.matchconfig.match_config import MatchConfig
+from rlbot.training.training import FailDueToExerciseException, Grade
+from rlbot.utils.game_state_util import GameState
+from rlbot.utils.structures.game_data_struct import GameTickPacket, GameInfo
+
+from rlbottraining.common_graders.compound_grader import CompoundGrader
+from rlbottraining.common_graders.timeout import FailOnTimeout, PassOnTimeout
+from rlbottraining.grading.grader import Grader
+from rlbottraining.replay.replay_runner import grade_replay, grade_ticks, run_replayed_playlist, FailDueToEndOfReplay
+from rlbottraining.rng import SeededRandomNumberGenerator
+from rlbottraining.training_exercise import TrainingExercise
+
+"""
+Tests grading of recorded ticks which does not require RocketLeague to run.
+"""
+
+test_match_config = MatchConfig()
+
+@dataclass
+class TimeoutExercise(TrainingExercise):
+    grader: Grader = field(
+        default_factory=lambda: CompoundGrader([FailOnTimeout(3.5)])
+    )
+    match_config: MatchConfig = test_match_config
+    def make_game_state(self, rng: SeededRandomNumberGenerator) -> GameState:
+        return GameState()
+
+@dataclass
+class BrokenSetupExercise(TimeoutExercise):
+    def make_game_state(self, rng: SeededRandomNumberGenerator) -> GameState:
+        raise ValueError('no game state for you')
+
+
+def packet_with_time(time: float) -> GameTickPacket:
+    return GameTickPacket(game_info=GameInfo(seconds_elapsed=time))
+
+
+class ReplayTest(unittest.TestCase):
+
+    def test_timeout(self):
+        ticks = [packet_with_time(t) for t in [10, 11, 13.2, 13.75, 14]]
+        grade = grade_replay(TimeoutExercise(name='timeout'), ticks)
+        self.assertIsInstance(grade, FailOnTimeout.FailDueToTimeout)
+
+    def test_end_of_replay(self):
+        ticks = [packet_with_time(t) for t in [10, 11]]
+        grade = grade_replay(TimeoutExercise(name='timeout'), ticks)
+        self.assertIsInstance(grade, FailDueToEndOfReplay)
+
+    def test_repeated_ticks_are_graded(self):
+        ticks = [packet_with_time(10)] * 5 + [packet_with_time(10.5)]
+        graded = []
+        def on_tick(game_tick_packet: GameTickPacket) -> Optional[Grade]:
+            graded.append(game_tick_packet.game_info.seconds_elapsed)
+            return None
+        self.assertIsInstance(grade_ticks(on_tick, ticks), FailDueToEndOfReplay)
+        self.assertEqual(graded, [10] * 5 + [10.5])
+
+        exercise = TimeoutExercise(name='survive', grader=PassOnTimeout(.4))
+        self.assertIsInstance(grade_replay(exercise, ticks), PassOnTimeout.PassDueToTimeout)
+
+    def test_setup_exception(self):
+        grade = grade_replay(BrokenSetupExercise(name='broken'), [packet_with_time(10)])
+        self.assertIsInstance(grade, FailDueToExerciseException)
+
+    def test_playlist(self):
+        playlist = [TimeoutExercise(name='a'), TimeoutExercise(name='b')]
+        tick_streams = [
+            [packet_with_time(t) for t in [0, 4]],
+            [packet_with_time(t) for t in [0, 1]],
+        ]
+        results = list(run_replayed_playlist(playlist, tick_streams, seed=7))
+        self.assertEqual([r.exercise.name for r in results], ['a', 'b'])
+        self.assertEqual([r.reproduction_info.playlist_index for r in results], [0, 1])
+        self.assertEqual([r.reproduction_info.seed for r in results], [7, 7])
+        self.assertIsInstance(results[0].grade, FailOnTimeout.FailDueToTimeout)
+        self.assertIsInstance(results[1].grade, FailDueToEndOfReplay)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,58 @@
+from datetime import timedelta
+from pathlib import Path
+import json
+import unittest
+
+from rlbottraining.history.exercise_result import ExerciseResult
+from rlbottraining.history.metric_json_encoder import MetricJsonEncoder
+from rlbottraining.history.website.common_views.result_list import ResultListAggregator
+
+from .test_result_log import make_result, start_time
+
+
+def to_json(result: ExerciseResult):
+    return json.loads(json.dumps(result, cls=MetricJsonEncoder))
+
+def render(url_map, path: str):
+    return json.loads(url_map[Path(path)].render())
+
+
+class ResultListPagesTest(unittest.TestCase):
+
+    def test_pages_and_index(self):
+        url_map = {}
+        aggregator = ResultListAggregator(shared_url_map=url_map, page_size=2)
+        for seconds in [1, 0, 2, 3, 4]:
+            aggregator.add_exercise_result(to_json(make_result(str(seconds), start_time + timedelta(seconds=seconds))))
+
+        index = render(url_map, 'data/slim_results/index.json')
+        self.assertEqual(index['num_results'], 5)
+        self.assertEqual([page['num_results'] for page in index['pages']], [2, 2, 1])
+        self.assertEqual(index['pages'][0]['first_create_time'], to_json(make_result('', start_time))['create_time']['iso8601'])
+        self.assertEqual(index['pages'][0]['last_create_time'], to_json(make_result('', start_time + timedelta(seconds=1)))['create_time']['iso8601'])
+        self.assertEqual([result['exercise']['name'] for result in render(url_map, 'data/slim_results/page_2.json')], ['4'])
+        self.assertEqual(len(render(url_map, 'data/slim_results.json')), 5)
+
+        full_page = url_map[Path('data/slim_results/page_1.json')]
+        last_page = url_map[Path('data/slim_results/page_2.json')]
+        full_page_fingerprint = full_page.fingerprint()
+        last_page_fingerprint = last_page.fingerprint()
+        aggregator.add_exercise_result(to_json(make_result('5', start_time + timedelta(seconds=5))))
+        self.assertEqual(full_page.fingerprint(), full_page_fingerprint)
+        self.assertNotEqual(last_page.fingerprint(), last_page_fingerprint)
+
+    def test_snapshot(self):
+        url_map = {}
+        aggregator = ResultListAggregator(shared_url_map=url_map, page_size=2)
+        for seconds in range(3):
+            aggregator.add_exercise_result(to_json(make_result(str(seconds), start_time + timedelta(seconds=seconds))))
+        restored_url_map = {}
+        ResultListAggregator(shared_url_map=restored_url_map, page_size=2).restore_snapshot(
+            json.loads(json.dumps(aggregator.get_snapshot())))
+        self.assertEqual(set(restored_url_map), set(url_map))
+        for path, renderer in url_map.items():
+            self.assertEqual(restored_url_map[path].render(), renderer.render())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,108 @@
+from datetime import datetime, timedelta
+from pathlib import Path
+from tempfile import TemporaryDirectory
+import json
+import unittest
+
+from rlbot.training.training import Pass
+
+from rlbottraining.history.exercise_result import ExerciseResult, ReproductionInfo, StorageMode, store_result
+from rlbottraining.history.result_log import (
+    ResultLogTailer, ResultLogWriter, close_result_log_writers, list_segments,
+    migrate_result_files_to_log, create_time_sort_key
+)
+from rlbottraining.history.stored_results import iterate_stored_results
+from rlbottraining.history.website.server import Server
+from rlbottraining.paths import HistoryPaths
+
+from .test_replay import TimeoutExercise
+
+
+def make_result(name: str, create_time: datetime) -> ExerciseResult:
+    return ExerciseResult(
+        grade=Pass(),
+        exercise=TimeoutExercise(name=name),
+        reproduction_info=ReproductionInfo(seed=4),
+        create_time=create_time,
+    )
+
+start_time = datetime(2019, 3, 1, 12, 0, 0)
+
+def names(results):
+    return [result['exercise']['name'] for result in results]
+
+
+class ResultLogTest(unittest.TestCase):
+
+    def tearDown(self):
+        close_result_log_writers()
+
+    def test_store_and_read_in_order(self):
+        with TemporaryDirectory() as tmpdir:
+            history_dir = Path(tmpdir)
+            # Out of order, like the parallel runner can produce, and across both storage modes.
+            store_result(make_result('b', start_time + timedelta(milliseconds=50)), history_dir, StorageMode.RESULT_LOG)
+            store_result(make_result('a', start_time + timedelta(milliseconds=5)), history_dir, StorageMode.RESULT_LOG)
+            store_result(make_result('d', start_time + timedelta(seconds=2)), history_dir, StorageMode.RESULT_LOG)
+            store_result(make_result('c', start_time + timedelta(seconds=1)), history_dir, StorageMode.JSON_FILES)
+            close_result_log_writers()
+
+            self.assertEqual(names(iterate_stored_results(history_dir)), ['a', 'b', 'c', 'd'])
+            self.assertEqual(len(list_segments(history_dir / HistoryPaths.result_log)), 2)
+
+    def test_segment_rotation(self):
+        with TemporaryDirectory() as tmpdir:
+            log_dir = Path(tmpdir)
+            writer = ResultLogWriter(log_dir, max_segment_bytes=200, fsync_every_records=3)
+            for i in range(10):
+                result = {'run_id': str(i), 'create_time': {'iso8601': f'2019-03-01T12:00:00.{i}Z'}, 'padding': 'x' * 50}
+                writer.append(json.dumps(result), create_time_sort_key(result))
+            writer.close()
+            segments = list_segments(log_dir)
+            self.assertGreater(len(segments), 1)
+            for segment in segments:
+                self.assertLessEqual(segment.stat().st_size, 200)
+
+    def test_partial_last_line_is_ignored(self):
+        with TemporaryDirectory() as tmpdir:
+            history_dir = Path(tmpdir)
+            store_result(make_result('a', start_time), history_dir, StorageMode.RESULT_LOG)
+            close_result_log_writers()
+            segment, = list_segments(history_dir / HistoryPaths.result_log)
+            with open(segment, 'a') as f:
+                f.write('{"run_id": "crashed while wri')
+            self.assertEqual(names(iterate_stored_results(history_dir)), ['a'])
+
+    def test_tailer(self):
+        with TemporaryDirectory() as tmpdir:
+            history_dir = Path(tmpdir)
+            store_result(make_result('old', start_time), history_dir, StorageMode.RESULT_LOG)
+            tailer = ResultLogTailer(history_dir / HistoryPaths.result_log)
+            tailer.skip_existing()
+            store_result(make_result('new', start_time + timedelta(seconds=1)), history_dir, StorageMode.RESULT_LOG)
+            segment, = list_segments(history_dir / HistoryPaths.result_log)
+            self.assertEqual(names(tailer.read_new_results(segment)), ['new'])
+            self.assertEqual(tailer.read_new_results(segment), [])
+
+    def test_migration(self):
+        with TemporaryDirectory() as tmpdir:
+            history_dir = Path(tmpdir)
+            for i, name in enumerate('cab'):
+                store_result(make_result(name, start_time + timedelta(seconds=i)), history_dir)
+            self.assertEqual(migrate_result_files_to_log(history_dir), 3)
+            self.assertEqual(list((history_dir / HistoryPaths.exercise_results).iterdir()), [])
+            self.assertEqual(migrate_result_files_to_log(history_dir), 0)
+            self.assertEqual(names(iterate_stored_results(history_dir)), ['c', 'a', 'b'])
+
+    def test_server_reads_result_log(self):
+        with TemporaryDirectory() as tmpdir:
+            history_dir = Path(tmpdir)
+            result = make_result('a', start_time)
+            store_result(result, history_dir, StorageMode.RESULT_LOG)
+            close_result_log_writers()
+            server = Server(history_dir)
+            self.assertIn(result.run_id, ' '.join(str(path) for path in server.url_map))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -8,8 +8,10 @@ import unittest
 
 from rlbot.setup_manager import SetupManager
 from rlbot.training.training import Exercise as RLBotExercise, Grade, Result as RLBotResult, Pass, Fail
+from rlbot.utils.structures.game_data_struct import GameInfo, GameTickPacket
 
 import rlbottraining.exercise_runner as exercise_runner
+import rlbottraining.backends.simulation_backend as simulation_backend
 from rlbottraining.paths import HistoryPaths
 
 
@@ -47,18 +49,18 @@ def stub_out_rlbot(fake_rlbot_run_exercises: Callable) -> List[FakeLogMessage]:
     TODO: stub out logging
     returns
     """
-    tmp_rlbot_run_exercises = exercise_runner.rlbot_run_exercises
+    tmp_rlbot_run_exercises = simulation_backend.rlbot_run_exercises
     tmp_setup_manager_context = exercise_runner.setup_manager_context
     tmp_get_logger = exercise_runner.get_logger
     exercise_runner.setup_manager_context = fake_setup_manager_context
-    exercise_runner.rlbot_run_exercises = fake_rlbot_run_exercises
+    simulation_backend.rlbot_run_exercises = fake_rlbot_run_exercises
     log_messages = []
     exercise_runner.get_logger = lambda logger_name: FakeLogger(logger_name, log_messages)
     try:
         yield log_messages
     finally:
         exercise_runner.setup_manager_context = tmp_setup_manager_context
-        exercise_runner.rlbot_run_exercises = tmp_rlbot_run_exercises
+        simulation_backend.rlbot_run_exercises = tmp_rlbot_run_exercises
         exercise_runner.get_logger = tmp_get_logger
 
 
@@ -78,7 +80,7 @@ class RunModuleTest(unittest.TestCase):
                 f.write(testdata_module_v1.read_text())
 
             num_run_calls = 0
-            def fake_rlbot_run_exercises(setup_manager: SetupManager, exercises: Iterable[RLBotExercise], seed: int) -> Iterator[RLBotResult]:
+            def fake_rlbot_run_exercises(setup_manager: SetupManager, exercises: Iterable[RLBotExercise], seed: int, reload_agent: bool=True) -> Iterator[RLBotResult]:
                 nonlocal num_run_calls
                 num_run_calls += 1
                 if num_run_calls > 1:
@@ -128,9 +130,77 @@ class RunModuleTest(unittest.TestCase):
                 log_messages,
                 [
                     FakeLogMessage(logger_name='training', verbosity='info', message='Facing away from ball [0]: PASS'),
+                    FakeLogMessage(logger_name='training', verbosity='info', message='Facing away from ball [0]: hot swapped car_start_x'),
+                    FakeLogMessage(logger_name='training', verbosity='info', message='Facing away from ball [1]: hot swapped car_start_x'),
                     FakeLogMessage(logger_name='training', verbosity='warning', message='Facing away from ball [1]: FAIL')
                 ]
             )
 
+    def test_reload_on_file_change_skips_unchanged_module(self):
+        class DeliberateExit(KeyboardInterrupt):
+            pass
+
+        with TemporaryDirectory(prefix='test_history_dir') as tmpdir:
+            python_file_with_playlist = Path(tmpdir) / 'module_to_be_reloaded.py'
+            python_file_with_playlist.write_text(testdata_module_v1.read_text())
+
+            num_run_calls = 0
+            def fake_rlbot_run_exercises(setup_manager: SetupManager, exercises: Iterable[RLBotExercise], seed: int, reload_agent: bool=True) -> Iterator[RLBotResult]:
+                nonlocal num_run_calls
+                num_run_calls += 1
+                if num_run_calls > 1:
+                    raise DeliberateExit()
+                for exercise in exercises:
+                    yield RLBotResult(exercise, seed, Pass())
+
+            num_loads = 0
+            load_default_playlist = exercise_runner.load_default_playlist
+            def counting_load_default_playlist(python_file_with_playlist: Path):
+                nonlocal num_loads
+                num_loads += 1
+                return load_default_playlist(python_file_with_playlist)
+
+            exercise_runner.load_default_playlist = counting_load_default_playlist
+            try:
+                with stub_out_rlbot(fake_rlbot_run_exercises) as log_messages:
+                    with self.assertRaises(DeliberateExit):
+                        exercise_runner.run_module(
+                            python_file_with_playlist,
+                            reload_policy=exercise_runner.ReloadPolicy.ON_FILE_CHANGE,
+                        )
+            finally:
+                exercise_runner.load_default_playlist = load_default_playlist
+
+            self.assertEqual(num_loads, 1)
+            self.assertEqual(len(log_messages), 2)
+
+    def test_reload_without_changes_swaps_nothing(self):
+        class DeliberateExit(KeyboardInterrupt):
+            pass
+
+        with TemporaryDirectory(prefix='test_history_dir') as tmpdir:
+            python_file_with_playlist = Path(tmpdir) / 'module_to_be_reloaded.py'
+            python_file_with_playlist.write_text(testdata_module_v1.read_text())
+
+            num_run_calls = 0
+            graders = []
+            def fake_rlbot_run_exercises(setup_manager: SetupManager, exercises: Iterable[RLBotExercise], seed: int, reload_agent: bool=True) -> Iterator[RLBotResult]:
+                nonlocal num_run_calls
+                num_run_calls += 1
+                if num_run_calls > 2:
+                    raise DeliberateExit()
+                for exercise in exercises:
+                    # Gives the graders some runtime state, which is not part of the definition.
+                    exercise.on_tick(GameTickPacket(game_info=GameInfo(seconds_elapsed=10.)))
+                    graders.append(exercise.exercise.grader)
+                    yield RLBotResult(exercise, seed, Pass())
+
+            with stub_out_rlbot(fake_rlbot_run_exercises) as log_messages:
+                with self.assertRaises(DeliberateExit):
+                    exercise_runner.run_module(python_file_with_playlist)
+
+            self.assertEqual(len(graders), 4)
+            self.assertEqual([message.message for message in log_messages if 'hot swapped' in message.message], [])
+
 if __name__ == '__main__':
     unittest.main()
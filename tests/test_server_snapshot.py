@@ -0,0 +1,71 @@
+from pathlib import Path
+from tempfile import TemporaryDirectory
+import sqlite3
+import unittest
+
+from rlbottraining.history.sqlite_store import close_history_stores
+from rlbottraining.history.website.common_views.result_full_json import StoredFullJsonRenderer
+from rlbottraining.history.website.common_views.result_list import ResultListAggregator
+from rlbottraining.history.website.server import Server
+from rlbottraining.paths import HistoryPaths
+
+from .test_sqlite_store import store_results as store_results_without_closing
+
+
+class CountingServer(Server):
+    num_added = 0
+    def add_exercise_result(self, result_json):
+        self.num_added += 1
+        super().add_exercise_result(result_json)
+
+
+def slim_results(server: Server):
+    return server.url_map[ResultListAggregator(shared_url_map={}).path].slim_results
+
+def store_results(history_dir: Path, num_results: int, first_index: int = 0):
+    store_results_without_closing(history_dir, num_results, first_index=first_index)
+    close_history_stores()
+
+
+class ServerSnapshotTest(unittest.TestCase):
+
+    def test_restart_only_adds_new_results(self):
+        with TemporaryDirectory() as tmpdir:
+            history_dir = Path(tmpdir)
+            store_results(history_dir, 5)
+            server = CountingServer(history_dir)
+            self.assertEqual(server.num_added, 5)
+            self.assertTrue((history_dir / HistoryPaths.aggregator_snapshot).exists())
+
+            store_results(history_dir, 3, first_index=5)
+            restarted = CountingServer(history_dir)
+            self.assertEqual(restarted.num_added, 3)
+            fresh = CountingServer(history_dir, use_snapshot=False)
+            self.assertEqual(fresh.num_added, 8)
+            self.assertEqual(slim_results(restarted), slim_results(fresh))
+            self.assertEqual(set(restarted.url_map), set(fresh.url_map))
+
+    def test_deleted_results_invalidate_snapshot(self):
+        with TemporaryDirectory() as tmpdir:
+            history_dir = Path(tmpdir)
+            store_results(history_dir, 5)
+            CountingServer(history_dir)
+            with sqlite3.connect(str(history_dir / HistoryPaths.sqlite_store)) as connection:
+                connection.execute('DELETE FROM exercise_results WHERE playlist_index = 2')
+            server = CountingServer(history_dir)
+            self.assertEqual(server.num_added, 4)
+            self.assertEqual(len(slim_results(server)), 4)
+
+    def test_full_json_is_loaded_lazily(self):
+        with TemporaryDirectory() as tmpdir:
+            history_dir = Path(tmpdir)
+            store_results(history_dir, 1)
+            server = Server(history_dir)
+            run_id = slim_results(server)[0]['run_id']
+            renderer = server.url_map[HistoryPaths.Website.data_dir / 'results' / f'{run_id}.json']
+            self.assertIsInstance(renderer, StoredFullJsonRenderer)
+            self.assertIn(run_id, renderer.render())
+
+
+if __name__ == '__main__':
+    unittest.main()
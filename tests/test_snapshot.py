@@ -0,0 +1,42 @@
+from copy import deepcopy
+import pickle
+import unittest
+
+from rlbot.utils.structures.game_data_struct import GameTickPacket, Touch
+
+from rlbottraining.grading.snapshot import SnapshotPool, snapshot
+
+from .test_tick_history import make_packet
+
+
+class SnapshotTest(unittest.TestCase):
+
+    def test_independent_copy(self):
+        packet = make_packet(1.0, num_cars=8)
+        packet.game_cars[7].boost = 42
+        copy = snapshot(packet)
+        self.assertIsInstance(copy, GameTickPacket)
+        self.assertEqual(bytes(copy), bytes(deepcopy(packet)))
+        packet.game_cars[7].boost = 0
+        packet.game_info.seconds_elapsed = 2.0
+        self.assertEqual(copy.game_cars[7].boost, 42)
+        self.assertEqual(copy.game_info.seconds_elapsed, 1.0)
+        self.assertEqual(bytes(pickle.loads(pickle.dumps(copy))), bytes(copy))
+
+    def test_pool_reuses_released_snapshots(self):
+        pool = SnapshotPool(Touch, chunk_size=2)
+        touch = Touch(time_seconds=3.0, player_index=1)
+        snapshots = [pool.snapshot(touch) for _ in range(3)]
+        self.assertEqual(pool.num_allocated, 4)
+        self.assertEqual(len({id(s) for s in snapshots}), 3)
+        pool.release(snapshots[0])
+        touch.time_seconds = 4.0
+        reused = pool.snapshot(touch)
+        self.assertIs(reused, snapshots[0])
+        self.assertEqual(reused.time_seconds, 4.0)
+        self.assertEqual(snapshots[1].time_seconds, 3.0)
+        self.assertEqual(pool.num_allocated, 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
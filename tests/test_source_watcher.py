@@ -0,0 +1,62 @@
+from pathlib import Path
+from tempfile import TemporaryDirectory
+import time
+import unittest
+
+from watchdog.events import DirModifiedEvent, FileCreatedEvent, FileModifiedEvent, FileMovedEvent
+
+from rlbottraining.source_watcher import SourceChangeWatcher
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+    def __call__(self) -> float:
+        return self.now
+
+
+class SourceChangeWatcherTest(unittest.TestCase):
+
+    def test_debounce(self):
+        clock = FakeClock()
+        watcher = SourceChangeWatcher(Path('.'), debounce_seconds=0.5, clock=clock)
+        self.assertFalse(watcher.take_changes())
+
+        watcher.on_any_event(FileModifiedEvent('exercises/playlist.py'))
+        clock.now = 0.4
+        watcher.on_any_event(FileModifiedEvent('exercises/playlist.py'))  # Still being written.
+        clock.now = 0.8
+        self.assertFalse(watcher.take_changes())
+        clock.now = 0.9
+        self.assertTrue(watcher.take_changes())
+        self.assertFalse(watcher.take_changes())  # Taken already.
+
+    def test_ignored_events(self):
+        clock = FakeClock()
+        watcher = SourceChangeWatcher(Path('.'), debounce_seconds=0, clock=clock)
+        for event in [
+            FileModifiedEvent('exercises/data.json'),
+            FileModifiedEvent('exercises/__pycache__/playlist.cpython-37.pyc'),
+            FileCreatedEvent('exercises/__pycache__/playlist.py'),
+            DirModifiedEvent('exercises/sub.py'),
+        ]:
+            watcher.on_any_event(event)
+        self.assertFalse(watcher.take_changes())
+        watcher.on_any_event(FileMovedEvent('exercises/playlist.py.tmp', 'exercises/playlist.py'))
+        self.assertTrue(watcher.take_changes())
+
+    def test_watches_subdirectories(self):
+        with TemporaryDirectory() as tmpdir:
+            subdir = Path(tmpdir) / 'sub'
+            subdir.mkdir()
+            with SourceChangeWatcher(Path(tmpdir), debounce_seconds=0) as watcher:
+                (Path(tmpdir) / 'notes.txt').write_text('not python')
+                (subdir / 'helpers.py').write_text('x = 1')
+                deadline = time.monotonic() + 5
+                while not watcher.take_changes():
+                    self.assertLess(time.monotonic(), deadline, 'The change was not noticed.')
+                    time.sleep(0.01)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,116 @@
+from datetime import timedelta
+from pathlib import Path
+from tempfile import TemporaryDirectory
+import json
+import threading
+import unittest
+
+from rlbot.training.training import Fail
+
+from rlbottraining.history.exercise_result import StorageMode, store_result
+from rlbottraining.history.metric_json_encoder import MetricJsonEncoder
+from rlbottraining.history.result_log import close_result_log_writers
+from rlbottraining.history.sqlite_store import (
+    SqliteHistoryStore, SqliteHistoryTailer, close_history_stores, migrate_to_sqlite_store, sortable_iso8601
+)
+from rlbottraining.history.stored_results import iterate_stored_results
+from rlbottraining.history.website.server import Server
+from rlbottraining.paths import HistoryPaths
+
+from .test_result_log import make_result, names, start_time
+
+
+def store_results(history_dir: Path, num_results: int, storage_mode=StorageMode.SQLITE, first_index: int = 0):
+    for i in range(first_index, first_index + num_results):
+        result = make_result(f'exercise {i % 3}', start_time + timedelta(seconds=i))
+        result.reproduction_info.playlist_index = i
+        if i % 2:
+            result.grade = Fail()
+        store_result(result, history_dir, storage_mode)
+
+
+class SqliteStoreTest(unittest.TestCase):
+
+    def tearDown(self):
+        close_history_stores()
+
+    def test_query(self):
+        with TemporaryDirectory() as tmpdir:
+            history_dir = Path(tmpdir)
+            store_results(history_dir, 20)
+            store = SqliteHistoryStore(history_dir / HistoryPaths.sqlite_store)
+            self.assertEqual(store.count(), 0)  # Still batched in the writer.
+            close_history_stores()
+
+            self.assertEqual(store.count(), 20)
+            last_fails = store.query(exercise_name='exercise 1', passed=False, limit=2)
+            self.assertEqual([result.playlist_index for result in last_fails], [19, 13])
+            self.assertTrue(all(result.passed is False for result in last_fails))
+            self.assertEqual(last_fails[0].exercise_class, 'tests.test_replay.TimeoutExercise')
+            self.assertEqual(last_fails[0].grader_class, 'rlbottraining.common_graders.compound_grader.CompoundGrader')
+            oldest, = store.query_json(newest_first=False, limit=1)
+            self.assertEqual(oldest['reproduction_info']['playlist_index'], 0)
+            self.assertEqual(store.count(since=start_time + timedelta(seconds=15)), 5)
+            store.close()
+
+    def test_concurrent_use(self):
+        with TemporaryDirectory() as tmpdir:
+            store = SqliteHistoryStore(Path(tmpdir) / HistoryPaths.sqlite_store, batch_size=7)
+            def add_results(thread_index: int):
+                for i in range(200):
+                    result = make_result(f'exercise {thread_index}', start_time + timedelta(seconds=i))
+                    store.add(json.loads(json.dumps(result, cls=MetricJsonEncoder)))
+            errors = []
+            def flush_and_query_repeatedly():
+                try:
+                    for _ in range(100):
+                        store.flush()
+                        list(store.run_ids())
+                        store.query(limit=5)
+                except Exception as e:
+                    errors.append(e)
+            threads = [threading.Thread(target=add_results, args=(i,)) for i in range(3)]
+            threads.append(threading.Thread(target=flush_and_query_repeatedly))
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            self.assertEqual(errors, [])
+            store.flush()
+            self.assertEqual(store.count(), 600)
+            store.close()
+
+    def test_server_and_tailer(self):
+        with TemporaryDirectory() as tmpdir:
+            history_dir = Path(tmpdir)
+            store_results(history_dir, 3)
+            close_history_stores()
+            tailer = SqliteHistoryTailer(history_dir / HistoryPaths.sqlite_store)
+            tailer.skip_existing()
+            server = Server(history_dir)
+            self.assertEqual(server.aggregators[0].history_store.count(), 3)
+
+            store_result(make_result('new', start_time + timedelta(days=1)), history_dir, StorageMode.SQLITE)
+            close_history_stores()
+            self.assertEqual(names(tailer.read_new_results()), ['new'])
+            self.assertEqual(tailer.read_new_results(), [])
+            server.history_store.close()
+
+    def test_migration(self):
+        with TemporaryDirectory() as tmpdir:
+            history_dir = Path(tmpdir)
+            store_results(history_dir, 2, StorageMode.JSON_FILES)
+            store_result(make_result('logged', start_time + timedelta(days=1)), history_dir, StorageMode.RESULT_LOG)
+            close_result_log_writers()
+
+            self.assertEqual(migrate_to_sqlite_store(history_dir), 3)
+            self.assertEqual(migrate_to_sqlite_store(history_dir), 0)
+            self.assertEqual(names(iterate_stored_results(history_dir)), ['exercise 0', 'exercise 1', 'logged'])
+
+    def test_sortable_iso8601(self):
+        self.assertEqual(sortable_iso8601('2019-03-01T12:00:00.5Z'), '2019-03-01T12:00:00.005Z')
+        self.assertEqual(sortable_iso8601('2019-03-01T12:00:59.1000Z'), '2019-03-01T12:01:00.000Z')
+
+
+if __name__ == '__main__':
+    unittest.main()
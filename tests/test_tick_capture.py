@@ -0,0 +1,71 @@
+from pathlib import Path
+from tempfile import TemporaryDirectory
+import unittest
+
+from rlbot.utils.structures.game_data_struct import GameTickPacket, GameInfo
+
+from rlbottraining.common_graders.timeout import FailOnTimeout
+from rlbottraining.replay.replay_runner import grade_replay
+from rlbottraining.replay.tick_capture import TickRecorder, read_tick_capture
+from rlbottraining.training_exercise_adapter import TrainingExerciseAdapter
+
+from .test_replay import TimeoutExercise
+
+
+def packet_with_time(time: float) -> GameTickPacket:
+    return GameTickPacket(game_info=GameInfo(seconds_elapsed=time))
+
+
+class TickCaptureTest(unittest.TestCase):
+
+    def test_round_trip_across_chunks(self):
+        with TemporaryDirectory() as tmpdir:
+            recorder = TickRecorder(Path(tmpdir) / 'captures', ticks_per_chunk=3)
+            packet = GameTickPacket()  # Deliberately reused, like rlbot does.
+            for i in range(8):
+                packet.game_info.seconds_elapsed = i / 2
+                packet.num_cars = 2
+                packet.game_cars[1].physics.location.x = i * 10
+                recorder.record(packet)
+            capture_path = Path(tmpdir) / 'run.ticks'
+            recorder.save(capture_path)
+
+            self.assertFalse(recorder.partial_file_path.exists())
+            ticks = list(read_tick_capture(capture_path))
+            self.assertEqual(len(ticks), 8)
+            self.assertEqual([t.game_info.seconds_elapsed for t in ticks], [i / 2 for i in range(8)])
+            self.assertEqual([t.game_cars[1].physics.location.x for t in ticks], [i * 10 for i in range(8)])
+            self.assertTrue(all(t.num_cars == 2 for t in ticks))
+
+    def test_nothing_recorded(self):
+        with TemporaryDirectory() as tmpdir:
+            recorder = TickRecorder(Path(tmpdir))
+            recorder.save(Path(tmpdir) / 'run.ticks')
+            self.assertEqual(list(Path(tmpdir).iterdir()), [])
+
+    def test_discard(self):
+        with TemporaryDirectory() as tmpdir:
+            recorder = TickRecorder(Path(tmpdir))
+            recorder.record(packet_with_time(1))
+            recorder.discard()
+            self.assertEqual(list(Path(tmpdir).iterdir()), [])
+
+    def test_record_and_replay_exercise(self):
+        with TemporaryDirectory() as tmpdir:
+            recorder = TickRecorder(Path(tmpdir))
+            adapter = TrainingExerciseAdapter(TimeoutExercise(name='recorded'), tick_recorder=recorder)
+            grade = None
+            time = 10
+            while grade is None:
+                grade = adapter.on_tick(packet_with_time(time))
+                time += .5
+            capture_path = Path(tmpdir) / 'run.ticks'
+            recorder.save(capture_path)
+
+            self.assertEqual(recorder.num_records, 9)
+            replayed_grade = grade_replay(TimeoutExercise(name='replayed'), read_tick_capture(capture_path))
+            self.assertIsInstance(replayed_grade, FailOnTimeout.FailDueToTimeout)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,197 @@
+from pathlib import Path
+from tempfile import TemporaryDirectory
+import json
+import random
+import unittest
+
+from rlbot.utils.structures.game_data_struct import GameTickPacket, Touch
+
+from rlbottraining.common_graders.ball_touches import RecordBallTouches, TouchSummary, read_spilled_touches
+from rlbottraining.example_bots.line_goalie.line_goalie import StateDiscontinuityDetector
+from rlbottraining.grading.event_detector import PlayerEventDetector, PlayerEventType
+from rlbottraining.grading.packet_arrays import PacketArrays
+from rlbottraining.grading.snapshot import snapshot_pool
+from rlbottraining.grading.tick_history import TickHistory
+from rlbottraining.grading.training_tick_packet import TrainingTickPacket
+from rlbottraining.history.metric_json_encoder import MetricJsonEncoder
+
+from .utils.reference_event_detector import ReferencePlayerEventDetector
+
+
+def make_packet(seconds_elapsed: float, num_cars: int = 2) -> GameTickPacket:
+    packet = GameTickPacket()
+    packet.num_cars = num_cars
+    packet.game_info.seconds_elapsed = seconds_elapsed
+    packet.game_ball.physics.location.y = seconds_elapsed * 100
+    return packet
+
+def score_changing_packets(num_ticks: int, num_cars: int, seed: int = 0):
+    """ Yields the same packet (like rlbot does) with a few random score changes per tick. """
+    rng = random.Random(seed)
+    packet = make_packet(0.0, num_cars)
+    for i in range(num_ticks):
+        packet.game_info.seconds_elapsed = i / 60
+        packet.num_cars = rng.choice([num_cars, num_cars, num_cars - 1])
+        for _ in range(rng.choice([0, 0, 0, 1, 3])):
+            score_info = packet.game_cars[rng.randrange(num_cars)].score_info
+            name = rng.choice(score_info._fields_)[0]
+            setattr(score_info, name, getattr(score_info, name) + 1)
+        yield packet
+
+def record_touches(grader: RecordBallTouches, touches) -> RecordBallTouches:
+    """ Runs the grader on a tick per (seconds_elapsed, latest_touch.time_seconds). """
+    tick = TrainingTickPacket()
+    packet = make_packet(touches[0][0])
+    for seconds_elapsed, touch_time in touches:
+        packet.game_info.seconds_elapsed = seconds_elapsed
+        packet.game_ball.latest_touch.time_seconds = touch_time
+        tick.update(packet)
+        grader.on_tick(tick)
+    return grader
+
+
+class TickHistoryTest(unittest.TestCase):
+
+    def test_last_ticks_in_order(self):
+        history = TickHistory(capacity=3)
+        self.assertEqual(len(history), 0)
+        self.assertEqual(history.ball(2).shape, (0,))
+        for i in range(10):
+            history.record(PacketArrays(make_packet(float(i))))
+            self.assertEqual(list(history.game_info(3)['seconds_elapsed']), list(range(max(0, i - 2), i + 1)))
+        self.assertEqual(len(history), 3)
+        self.assertEqual(list(history.ball(5)['physics']['location'][:, 1]), [700, 800, 900])
+        self.assertEqual(history.cars(2).shape, (2, 64))
+        self.assertEqual(list(history.num_cars(1)), [2])
+        self.assertEqual(history.car_scores(2).shape, (2, 64, 7))
+        packet = make_packet(10.0)
+        packet.game_cars[1].score_info.shots = 3
+        history.record(PacketArrays(packet))
+        self.assertEqual(history.car_scores(1)[0, 1].tolist(), [0, 0, 0, 0, 0, 3, 0])
+
+    def test_shared_history(self):
+        history = TickHistory(capacity=3)
+        self.assertEqual(history._packets.nbytes, 0)  # Allocated by the first record().
+        first, second = TrainingTickPacket(history), TrainingTickPacket(history)
+        for i in range(5):
+            first.update(make_packet(float(i)))
+        self.assertEqual(len(history), 3)
+        packet = make_packet(7.0)
+        packet.game_cars[0].score_info.goals = 1
+        second.update(packet)  # Does not compare to the ticks of the previous run.
+        self.assertEqual(len(history), 1)
+        self.assertEqual(second.player_events, [])
+        self.assertEqual(list(history.game_info(3)['seconds_elapsed']), [7.0])
+
+    def test_player_events(self):
+        tick = TrainingTickPacket()
+        packet = make_packet(1.0)
+        tick.update(packet)
+        self.assertEqual(tick.player_events, [])
+
+        packet.game_cars[1].score_info.saves = 1
+        packet.game_cars[1].score_info.score = 50
+        packet.game_cars[0].score_info.demolitions = 1
+        packet.game_info.seconds_elapsed = 2.0
+        tick.update(packet)
+        self.assertEqual(
+            [(event.type, event.player.score_info.score, event.seconds_elapsed) for event in tick.player_events],
+            [(PlayerEventType.DEMOLITIONS, 0, 2.0), (PlayerEventType.SCORE, 50, 2.0), (PlayerEventType.SAVES, 50, 2.0)]
+        )
+        tick.update(packet)
+        self.assertEqual(tick.player_events, [])
+
+    def test_car_and_ball_events(self):
+        tick = TrainingTickPacket()
+        packet = make_packet(1.0, num_cars=3)
+        packet.game_cars[0].has_wheel_contact = True
+        packet.game_cars[1].boost = 50
+        tick.update(packet)
+        self.assertEqual(tick.player_events, [])
+
+        packet.game_info.seconds_elapsed = 2.0
+        packet.game_cars[0].has_wheel_contact = False
+        packet.game_cars[0].jumped = True
+        packet.game_cars[1].boost = 62
+        packet.game_cars[2].is_demolished = True
+        packet.game_cars[2].boost = 33  # Not a pickup.
+        packet.game_ball.latest_touch.time_seconds = 2.0
+        packet.game_ball.latest_touch.player_index = 1
+        tick.update(packet)
+        self.assertEqual(
+            [(event.type, event.player.boost) for event in tick.player_events],
+            [
+                (PlayerEventType.WHEEL_CONTACT_LOST, 0),
+                (PlayerEventType.JUMP, 0),
+                (PlayerEventType.DEMOLISHED, 33),
+                (PlayerEventType.BOOST_PICKUP, 62),
+                (PlayerEventType.BALL_TOUCH, 62),
+            ]
+        )
+        self.assertEqual([event.type for event in tick.player_events_of_type(PlayerEventType.JUMP)], [PlayerEventType.JUMP])
+
+        packet.game_info.seconds_elapsed = 3.0
+        tick.update(packet)
+        self.assertEqual(tick.player_events, [])
+
+    def test_record_ball_touches(self):
+        grader = record_touches(RecordBallTouches(), [(1.0, 0.5), (1.25, 1.25), (1.5, 1.25), (1.75, 1.25), (2.0, 2.0)])
+        self.assertEqual([touch.time_seconds for touch in grader.touches], [1.25, 2.0])
+        self.assertEqual(grader.summary, TouchSummary(count=2, first_seconds=1.25, last_seconds=2.0, touches_per_player={0: 2}))
+
+    def test_record_ball_touches_bounded(self):
+        touches = [(t / 4, t / 4) for t in range(4, 400)]
+        pool = snapshot_pool(Touch)
+        num_allocated = pool.num_allocated
+        grader = record_touches(RecordBallTouches(max_touches=3), touches)
+        self.assertLessEqual(pool.num_allocated - num_allocated, pool.chunk_size)  # Evicted touches are reused.
+        self.assertEqual([touch.time_seconds for touch in grader.touches], [99.25, 99.5, 99.75])
+        self.assertEqual(grader.summary, TouchSummary(count=396, first_seconds=1.0, last_seconds=99.75, touches_per_player={0: 396}))
+        self.assertEqual(len(json.loads(json.dumps(grader, cls=MetricJsonEncoder))['touches']), 3)
+
+    def test_record_ball_touches_spilled(self):
+        with TemporaryDirectory() as tmpdir:
+            grader = record_touches(RecordBallTouches(spill_dir=Path(tmpdir) / 'spills'), [(1.0, 1.0), (1.5, 1.5), (2.0, 2.0)])
+            self.assertEqual(len(grader.touches), 0)
+            self.assertEqual(grader.summary.count, 3)
+            grader_json = json.loads(json.dumps(grader, cls=MetricJsonEncoder))
+            self.assertEqual(grader_json['touches'], [])
+            spilled = read_spilled_touches(Path(grader_json['spill_path']))
+        self.assertEqual([touch['time_seconds'] for touch in spilled], [1.0, 1.5, 2.0])
+        self.assertEqual(read_spilled_touches(Path(tmpdir) / 'missing.touches.jsonl'), [])
+
+    def test_standalone_event_detector(self):
+        detector = PlayerEventDetector()
+        packet = make_packet(1.0, num_cars=1)
+        self.assertEqual(detector.detect_events(packet), [])
+        packet.game_cars[0].score_info.goals = 1
+        event, = detector.detect_events(packet)
+        self.assertEqual(event.type, PlayerEventType.GOALS)
+
+    def test_events_like_reference_detector(self):
+        detectors = [ReferencePlayerEventDetector(), PlayerEventDetector()]
+        tick = TrainingTickPacket()
+        num_events = 0
+        for packet in score_changing_packets(300, num_cars=8):
+            tick.update(packet)
+            expected, standalone = [
+                [(event.type, event.player.score_info.score, event.seconds_elapsed) for event in detector.detect_events(packet)]
+                for detector in detectors
+            ]
+            shared = [(event.type, event.player.score_info.score, event.seconds_elapsed) for event in tick.player_events]
+            self.assertEqual(standalone, expected)
+            self.assertEqual(shared, expected)
+            num_events += len(expected)
+        self.assertGreater(num_events, 100)
+
+    def test_state_discontinuity(self):
+        detector = StateDiscontinuityDetector()
+        self.assertFalse(detector.is_discontinuous(make_packet(1.0)))
+        self.assertFalse(detector.is_discontinuous(make_packet(1.1)))  # 1000 uu/s
+        teleported = make_packet(1.2)
+        teleported.game_ball.physics.location.x = 5000
+        self.assertTrue(detector.is_discontinuous(teleported))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+import ctypes
+import json
+from datetime import datetime
+
+from rlbot.matchconfig.conversions import ConfigJsonEncoder
+from rlbot.training.training import Pass, Fail, Result
+
+from rlbottraining.grading.grader import Grader
+from rlbottraining.history.metric import Metric
+from rlbottraining.history.metric_json_encoder import (
+    CtypesEncoder, full_class_name_of, iso_format, jsonify_exception, make_encode_error
+)
+
+"""
+The straightforward MetricJsonEncoder which the optimized one has to produce identical output to.
+"""
+
+class ReferenceMetricJsonEncoder(json.JSONEncoder):
+    def default(self, obj):
+        # Metric
+        if isinstance(obj, Metric):
+            assert type(obj) != Metric, 'Must subclass Metric, not use it directly'
+            json_dict = obj.to_json()
+            # Tag our Metrics such that we can write specialized code to visualize them.
+            assert '__class__' not in json_dict
+            json_dict['__class__'] = full_class_name_of(obj)
+            return json_dict
+
+        # Best-effort encoding of some well known types which could get subclassed.
+        well_known_types = [Pass, Fail, Result, Grader]
+        for cls in well_known_types:
+            if not isinstance(obj, cls):
+                continue
+            json_dict = json.loads(self.encode(obj.__dict__))
+            json_dict['__class__'] = full_class_name_of(obj)
+            json_dict[f'__isinstance_{cls.__name__}__'] = True
+            return json_dict
+
+        if isinstance(obj, ctypes.Structure):
+            json_dict = json.loads(CtypesEncoder().encode(obj))
+            json_dict['__class__'] = full_class_name_of(obj)
+            return json_dict
+
+        if isinstance(obj, datetime):
+            return {
+                '__class__': 'datetime.datetime',
+                'iso8601': iso_format(obj),
+            }
+
+        # Numpy array. Not using isinstance to keep dependencies lean.
+        if 'ndarray' in obj.__class__.__name__:
+            return obj.tolist()
+
+        # Exception (note: this is a thing they want to propagate, rather than an accident)
+        if isinstance(obj, Exception):
+            return jsonify_exception(obj)
+
+        if not hasattr(self, 'default_encoder'):
+            self.default_encoder = ConfigJsonEncoder()
+        try:
+            return self.default_encoder.default(obj)
+        except Exception as e:
+            return make_encode_error(e)